@@ -1,13 +1,115 @@
 # backend/app/config.py
 import os
 
-# Define a directory to temporarily store uploaded files
-# Ensure this directory exists or is created when the app starts
-UPLOAD_DIR = os.path.join(os.getcwd(), "uploaded_files")
-
-# Create the upload directory if it doesn't exist
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 # You can add other configurations here, e.g., default number of questions, etc.
 DEFAULT_NUM_QUESTIONS = 5
-DEFAULT_QUESTION_TYPE = "multiple_choice"
\ No newline at end of file
+DEFAULT_QUESTION_TYPE = "multiple_choice"
+
+# Log level for the "app" loggers: DEBUG, INFO, WARNING, ERROR, CRITICAL or OFF.
+# Per-request parameter logging is DEBUG, so it costs nothing at the default level.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+# Result cache: "memory" (per-worker LRU), "sqlite" (shared on-disk store) or "none"
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "512"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "86400"))  # 0 disables expiry
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", os.path.join(os.getcwd(), "cache", "results.sqlite3"))
+
+# Gemini calls: maximum in-flight requests per worker and per-call timeout
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+
+# LLM call resilience: retries of timeouts, 429s and 5xx with exponential backoff and full
+# jitter; an optional hedged duplicate request when the first is slower than the hedge delay
+# (0 disables); a client-side rate limit matched to the provider quota (0 disables); and a
+# circuit breaker that fails fast after consecutive failures (threshold 0 disables)
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "0.5"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "8"))
+LLM_HEDGE_AFTER_SECONDS = float(os.getenv("LLM_HEDGE_AFTER_SECONDS", "0"))
+LLM_RATE_LIMIT_PER_MINUTE = float(os.getenv("LLM_RATE_LIMIT_PER_MINUTE", "0"))
+LLM_RATE_LIMIT_BURST = int(os.getenv("LLM_RATE_LIMIT_BURST", "10"))
+LLM_BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+
+# LLM provider: "gemini" (Google Generative AI) or "stub" (local, deterministic, no network;
+# for tests, benchmarks and load tests). The stub's simulated latency per call, extra
+# random latency on top of it, share of calls that fail, and random seed are configurable.
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")
+LLM_STUB_LATENCY_SECONDS = float(os.getenv("LLM_STUB_LATENCY_SECONDS", "0"))
+LLM_STUB_JITTER_SECONDS = float(os.getenv("LLM_STUB_JITTER_SECONDS", "0"))
+LLM_STUB_FAILURE_RATE = float(os.getenv("LLM_STUB_FAILURE_RATE", "0"))
+LLM_STUB_SEED = int(os.getenv("LLM_STUB_SEED", "0"))
+
+# Combined deadline for the concurrent quiz + vocabulary stages of /generate-quiz/
+QUIZ_DEADLINE_SECONDS = float(os.getenv("QUIZ_DEADLINE_SECONDS", "90"))
+
+# Upload limits, enforced before any text is extracted
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+MAX_UPLOAD_PAGES = int(os.getenv("MAX_UPLOAD_PAGES", "1000"))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Executors: worker processes for CPU-bound stages (PDF extraction, text normalization,
+# tokenization; 0 = one per CPU, PDF_EXTRACT_WORKERS is the old name), threads for
+# blocking I/O, seconds a caller waits for a task (0 waits indefinitely), tasks allowed to
+# wait per pool before requests get 503, and whether the worker processes are started and
+# warmed up (NLTK data, lemmatizer) at startup instead of on first use
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", os.getenv("PDF_EXTRACT_WORKERS", "0")))
+IO_WORKERS = int(os.getenv("IO_WORKERS", "8"))
+EXECUTOR_TASK_TIMEOUT_SECONDS = float(os.getenv("EXECUTOR_TASK_TIMEOUT_SECONDS", "120"))
+EXECUTOR_MAX_QUEUE = int(os.getenv("EXECUTOR_MAX_QUEUE", "64"))
+EXECUTOR_WARMUP = os.getenv("EXECUTOR_WARMUP", "true").lower() in ("1", "true", "yes")
+
+# PDF extraction: the page count above which one document is split into page ranges
+# extracted by several CPU workers
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+
+# Prompt token budgets for document text, as comma-separated "model=tokens" or
+# "purpose:model=tokens" entries (purposes: quiz, summary, vocabulary, study_pack), e.g.
+# "gemini-2.0-flash=4000,quiz:gemini-1.5-pro=1500". Unlisted prompts keep their defaults.
+PROMPT_TOKEN_BUDGETS = os.getenv("PROMPT_TOKEN_BUDGETS", "")
+
+# Model of the combined study pack call. The default flash model keeps vocabulary and
+# summaries on their usual model and makes the pack cheaper than three calls; set it to
+# the quiz model (gemini-1.5-pro) for pro-quality questions at pro prices for every section.
+STUDY_PACK_MODEL = os.getenv("STUDY_PACK_MODEL", "gemini-2.0-flash")
+
+# Page preprocessing: with PAGE_DEDUP (off by default, as it changes every operation's
+# text), strip header/footer lines repeated across pages and drop near-duplicate pages
+# before the text is used; and for documents with more than PAGE_SAMPLE_MAX_PAGES pages,
+# read only that many evenly spread pages for whole-document operations (0 disables sampling)
+PAGE_DEDUP = os.getenv("PAGE_DEDUP", "false").lower() in ("1", "true", "yes")
+PAGE_SAMPLE_MAX_PAGES = int(os.getenv("PAGE_SAMPLE_MAX_PAGES", "0"))
+
+# Hierarchical summarization: approximate tokens per chunk and concurrent chunk summaries
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "2000"))
+SUMMARY_MAX_CONCURRENCY = int(os.getenv("SUMMARY_MAX_CONCURRENCY", "4"))
+
+# Coverage-mode quiz generation: maximum number of document segments (one LLM call each)
+QUIZ_MAX_SEGMENTS = int(os.getenv("QUIZ_MAX_SEGMENTS", "8"))
+
+# Vocabulary extraction: number of distinct words whose lemma is memoized
+LEMMA_CACHE_SIZE = int(os.getenv("LEMMA_CACHE_SIZE", "50000"))
+
+# Prebuilt NLTK data directory; populated at build time, never downloaded at runtime
+NLTK_DATA_DIR = os.getenv("NLTK_DATA_DIR", os.path.join(os.getcwd(), "nltk_data"))
+
+# Background jobs: worker tasks per process, maximum waiting jobs before 503, job store
+# ("memory" or "sqlite", which lets every worker process answer status requests)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_QUEUE_DEPTH = int(os.getenv("JOB_MAX_QUEUE_DEPTH", "32"))
+JOB_STORE = os.getenv("JOB_STORE", "memory")
+JOB_SQLITE_PATH = os.getenv("JOB_SQLITE_PATH", os.path.join(os.getcwd(), "cache", "jobs.sqlite3"))
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+
+# Batch processing: files accepted per request and distinct documents processed at once
+# (their Gemini calls also share the LLM_MAX_CONCURRENCY budget)
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "50"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+
+# Document store (POST /api/documents): SQLite file holding each ingested document's
+# cleaned text, page offsets and token counts, and the budget for their stored size
+# above which the least recently used documents are evicted (0 disables eviction)
+DOCUMENT_STORE_PATH = os.getenv("DOCUMENT_STORE_PATH", os.path.join(os.getcwd(), "cache", "documents.sqlite3"))
+DOCUMENT_STORE_MAX_BYTES = int(os.getenv("DOCUMENT_STORE_MAX_BYTES", str(512 * 1024 * 1024)))
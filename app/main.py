@@ -1,21 +1,25 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from starlette.routing import Match
 from dotenv import load_dotenv
 import os
 import sys
-import nltk
-
-# Print the Python version that is running this script
-print(f"--- Backend Running with Python: {sys.version} ---") # ADD THIS LINE
-print(f"--- Executable path: {sys.executable} ---") # ADD THIS LINE
-
-
-# Import your routers
-from .routes import process
+import time
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Import your routers
+from .routes import batch, documents, jobs, process
+from .config import EXECUTOR_WARMUP
+from .services.cache import get_cache
+from .services import executors, metrics
+from .services.jobs import get_job_queue
+from .services.nlp_resources import NLTK_DATA_DIR, load_nltk_resources
+from .utils.log import get_logger
+
+logger = get_logger(__name__)
 
 
 app = FastAPI(
@@ -43,8 +47,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def endpoint_label(request: Request) -> str:
+    """The route template of the request (e.g. /api/jobs/{job_id}), keeping metric labels bounded."""
+    for route in app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    endpoint = endpoint_label(request)
+    metrics.HTTP_IN_FLIGHT.inc(endpoint=endpoint)
+    started = time.perf_counter()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        metrics.HTTP_IN_FLIGHT.dec(endpoint=endpoint)
+        metrics.HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint, method=request.method)
+        metrics.HTTP_REQUESTS.inc(endpoint=endpoint, method=request.method, status=status)
+
 # Include your API routers
 app.include_router(process.router, prefix="/api", tags=["generation"])
+app.include_router(jobs.router, prefix="/api", tags=["jobs"])
+app.include_router(batch.router, prefix="/api", tags=["batch"])
+app.include_router(documents.router, prefix="/api", tags=["documents"])
 
 @app.get("/api/health")
 async def health_check():
@@ -53,18 +84,44 @@ async def health_check():
     """
     return {"status": "ok", "message": "Backend is running!"}
 
-# 👇 ADD THIS FASTAPI STARTUP HANDLER
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """
+    Reports result-cache hit/miss counters for monitoring.
+    """
+    return await get_cache().astats()
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """
+    Request, pipeline-stage, LLM, executor and cache metrics in the Prometheus text format.
+    """
+    job_queue_depth = ("Background jobs waiting for a worker.", get_job_queue().depth())
+    return PlainTextResponse(
+        metrics.render(await get_cache().astats(), {"job_queue_depth": job_queue_depth}),
+        media_type="text/plain; version=0.0.4",
+    )
+
 @app.on_event("startup")
-async def download_nltk_data():
-    print("--- Checking for required NLTK resources ---")
-    nltk.data.path.append("/opt/render/nltk_data")
-    for resource in ["punkt", "wordnet", "omw-1.4"]:
-        try:
-            nltk.data.find(resource)
-            print(f"✓ Found: {resource}")
-        except LookupError:
-            print(f"⬇ Downloading: {resource}")
-            nltk.download(resource, download_dir="/opt/render/nltk_data")
+async def load_nltk_data():
+    """
+    Loads NLTK resources from the local data directory. Never downloads: run
+    `python -m app.services.nlp_resources --download` at build time instead.
+    """
+    logger.info("Backend running with Python %s (%s)", sys.version.split()[0], sys.executable)
+    missing = load_nltk_resources()
+    if missing:
+        logger.error("Missing NLTK resources in %s: %s. Vocabulary extraction will fail until they are installed.", NLTK_DATA_DIR, ", ".join(missing))
+    else:
+        logger.info("NLTK resources loaded")
+    if EXECUTOR_WARMUP:
+        # Each CPU worker process loads the NLTK data and the lemmatizer as it starts
+        await executors.warm_up()
+
+@app.on_event("shutdown")
+async def stop_workers():
+    await get_job_queue().stop()
+    executors.shutdown_executors()
 
 if __name__ == "__main__":
     import uvicorn
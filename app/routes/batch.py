@@ -0,0 +1,115 @@
+# backend/app/routes/batch.py
+import json
+import time
+from typing import List
+
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from ..config import BATCH_MAX_FILES
+from ..services.batch import BATCH_OPERATIONS, BatchItem, run_batch
+from ..services.pdf_ingest import InvalidPDFError, UploadTooLargeError, read_upload
+from ..services.pipeline import DEFAULT_NUM_WORDS
+from ..services.question_gen import QUESTION_TYPES
+from ..services.text_summarizer import SUMMARY_MODES
+
+router = APIRouter()
+
+
+def parse_operations(value) -> list:
+    """
+    Parses a comma-separated string (or list) of operations, keeping the first occurrence
+    of each.
+
+    Raises:
+        HTTPException: If the list is empty or names an unknown operation.
+    """
+    items = value.split(",") if isinstance(value, str) else value
+    requested = [str(op).strip() for op in items if str(op).strip()]
+    if not requested or any(op not in BATCH_OPERATIONS for op in requested):
+        raise HTTPException(status_code=400, detail=f"operations must be a non-empty subset of: {', '.join(BATCH_OPERATIONS)}.")
+    return list(dict.fromkeys(requested))
+
+
+@router.post("/batch")
+async def batch_endpoint(
+    files: List[UploadFile] = File(...),
+    operations: str = Form(",".join(BATCH_OPERATIONS)),
+    file_operations: str = Form(None),
+    num_questions: int = Form(5),
+    question_type: str = Form("multiple_choice"),
+    coverage: bool = Form(False),
+    num_words: int = Form(DEFAULT_NUM_WORDS),
+    num_sentences: int = Form(3),
+    summary_mode: str = Form("truncate"),
+    combined: bool = Form(False),
+    stream: bool = Form(False),
+):
+    """
+    Processes several PDFs in one request.
+
+    `operations` applies to every file; `file_operations` is an optional JSON object
+    mapping a filename to its own operations (a list or comma-separated string).
+    Identical files are processed once, and with `combined` each document's operations
+    share one model call. With `stream`, one NDJSON line is sent per file
+    as soon as it finishes, followed by a summary line; otherwise all results are
+    returned together, in upload order.
+    """
+    if len(files) > BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"A batch can contain at most {BATCH_MAX_FILES} files.")
+    if question_type not in QUESTION_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported question type. Supported types: {', '.join(QUESTION_TYPES)}.")
+    if summary_mode not in SUMMARY_MODES:
+        raise HTTPException(status_code=400, detail=f"Unsupported summary mode. Supported modes: {', '.join(SUMMARY_MODES)}.")
+
+    default_operations = parse_operations(operations)
+    overrides = {}
+    if file_operations:
+        try:
+            overrides = json.loads(file_operations)
+        except json.JSONDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"file_operations must be a JSON object: {e}")
+        if not isinstance(overrides, dict):
+            raise HTTPException(status_code=400, detail="file_operations must be a JSON object mapping filenames to operations.")
+        overrides = {filename: parse_operations(ops) for filename, ops in overrides.items()}
+
+    started = time.perf_counter()
+    items = []
+    for file in files:
+        item = BatchItem(filename=file.filename, operations=overrides.get(file.filename, default_operations))
+        try:
+            item.upload = await read_upload(file)
+        except (UploadTooLargeError, InvalidPDFError) as e:
+            item.error = str(e)
+        items.append(item)
+
+    params = {
+        "num_questions": num_questions,
+        "question_type": question_type,
+        "coverage": coverage,
+        "num_words": num_words,
+        "num_sentences": num_sentences,
+        "summary_mode": summary_mode,
+        "combined": combined,
+    }
+    unique_documents = len({item.upload.sha256 for item in items if item.upload is not None})
+
+    def summary(count):
+        return {
+            "count": count,
+            "unique_documents": unique_documents,
+            "timings": {"total": round(time.perf_counter() - started, 3)},
+        }
+
+    if stream:
+        async def lines():
+            count = 0
+            async for result in run_batch(items, params):
+                count += 1
+                yield json.dumps(result) + "\n"
+            yield json.dumps({"done": True, **summary(count)}) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    results = [result async for result in run_batch(items, params)]
+    results.sort(key=lambda result: result["index"])
+    return JSONResponse(content={"results": results, **summary(len(results))})
@@ -0,0 +1,43 @@
+# backend/app/routes/documents.py
+from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.responses import JSONResponse
+from ..services.documents import DocumentNotFoundError, get_document_store
+from ..services.executors import ExecutorBusyError, ExecutorTimeoutError, run_io
+from ..services.pipeline import EmptyDocumentError, ingest_document
+from ..utils.log import get_logger
+from .process import executor_error, ingest_upload
+
+router = APIRouter()
+logger = get_logger(__name__)
+
+
+@router.post("/documents")
+async def create_document_endpoint(file: UploadFile = File(...)):
+    """
+    Ingests a PDF once: its cleaned page texts and token counts are stored, and the
+    returned `document_id` can replace the file in every processing endpoint.
+    Uploading a stored PDF again returns the existing document with status 200.
+    """
+    upload = await ingest_upload(file)
+    try:
+        document, created = await ingest_document(upload)
+    except EmptyDocumentError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorBusyError, ExecutorTimeoutError) as e:
+        raise executor_error(e)
+    logger.debug("Document %s %s", document.id, "stored" if created else "already stored")
+    return JSONResponse(status_code=201 if created else 200, content=document.to_dict())
+
+
+@router.get("/documents/{document_id}")
+async def get_document_endpoint(document_id: str):
+    try:
+        return (await run_io(get_document_store().get, document_id)).to_dict()
+    except DocumentNotFoundError:
+        raise HTTPException(status_code=404, detail="Document not found.")
+
+
+@router.delete("/documents/{document_id}", status_code=204)
+async def delete_document_endpoint(document_id: str):
+    if not await run_io(get_document_store().delete, document_id):
+        raise HTTPException(status_code=404, detail="Document not found.")
@@ -0,0 +1,76 @@
+# backend/app/routes/jobs.py
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.responses import JSONResponse
+from ..services.jobs import JOB_OPERATIONS, QueueFullError, get_job_queue
+from ..services.pipeline import DEFAULT_NUM_WORDS
+from ..services.question_gen import QUESTION_TYPES
+from ..services.text_summarizer import SUMMARY_MODES
+from ..services.executors import ExecutorBusyError, ExecutorTimeoutError
+from .process import executor_error, resolve_document
+
+router = APIRouter()
+
+
+@router.post("/jobs", status_code=202)
+async def create_job_endpoint(
+    file: UploadFile = File(None),
+    document_id: str = Form(None),
+    operations: str = Form(",".join(JOB_OPERATIONS)),
+    num_questions: int = Form(5),
+    question_type: str = Form("multiple_choice"),
+    coverage: bool = Form(False),
+    num_words: int = Form(DEFAULT_NUM_WORDS),
+    num_sentences: int = Form(3),
+    summary_mode: str = Form("truncate"),
+    combined: bool = Form(False),
+):
+    """
+    Queues a PDF, or a stored document named by `document_id`, for background processing
+    and returns its job id immediately.
+    `operations` is a comma-separated subset of "quiz", "vocabulary" and "summary";
+    with `combined`, they share one model call.
+    """
+    requested = [op.strip() for op in operations.split(",") if op.strip()]
+    unknown = [op for op in requested if op not in JOB_OPERATIONS]
+    if not requested or unknown:
+        raise HTTPException(status_code=400, detail=f"operations must be a comma-separated subset of: {', '.join(JOB_OPERATIONS)}.")
+    if question_type not in QUESTION_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported question type. Supported types: {', '.join(QUESTION_TYPES)}.")
+    if summary_mode not in SUMMARY_MODES:
+        raise HTTPException(status_code=400, detail=f"Unsupported summary mode. Supported modes: {', '.join(SUMMARY_MODES)}.")
+
+    try:
+        upload = await resolve_document(file, document_id)
+    except (ExecutorBusyError, ExecutorTimeoutError) as e:
+        raise executor_error(e)
+    params = {
+        "num_questions": num_questions,
+        "question_type": question_type,
+        "coverage": coverage,
+        "num_words": num_words,
+        "num_sentences": num_sentences,
+        "summary_mode": summary_mode,
+        "combined": combined,
+    }
+    try:
+        job = await get_job_queue().submit(upload, list(dict.fromkeys(requested)), params)
+    except QueueFullError as e:
+        return JSONResponse(status_code=503, content={"detail": str(e)}, headers={"Retry-After": "30"})
+    except (ExecutorBusyError, ExecutorTimeoutError) as e:
+        raise executor_error(e)
+
+    return {"job_id": job.id, "status": job.status, "status_url": f"/api/jobs/{job.id}"}
+
+
+@router.get("/jobs/{job_id}")
+async def get_job_endpoint(job_id: str):
+    """
+    Reports a job's status, per-operation progress and, once finished, its results.
+    """
+    try:
+        job = await get_job_queue().get(job_id)
+    except (ExecutorBusyError, ExecutorTimeoutError) as e:
+        raise executor_error(e)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job.to_dict()
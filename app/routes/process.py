@@ -1,148 +1,278 @@
 # backend/app/routes/process.py
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
-import os
-import shutil
-import fitz # PyMuPDF
-from ..services.question_gen import generate_quiz_questions
-from ..services.vocab_extractor import extract_vocabulary
-from ..services.text_summarizer import summarize_text # Make sure this is imported
+from fastapi.responses import JSONResponse, StreamingResponse
+import json
+import time
+from ..config import QUIZ_DEADLINE_SECONDS
+from ..services.documents import DocumentNotFoundError, get_document_store
+from ..services.executors import ExecutorBusyError, ExecutorTimeoutError, run_io
+from ..services.pdf_ingest import InvalidPDFError, UploadTooLargeError, read_upload
+from ..services import question_gen
+from ..services.pipeline import DEFAULT_NUM_WORDS, EmptyDocumentError, load_text, quiz_for, quiz_stream_for, run_stages, study_pack_for, summary_for, vocabulary_for
+from ..services.study_pack import STUDY_PACK_SECTIONS
+from ..services.text_summarizer import SUMMARY_MODES
+from ..utils.log import get_logger
 
 router = APIRouter()
+logger = get_logger(__name__)
+
+
+async def ingest_upload(file: UploadFile):
+    """
+    Reads and validates the upload, translating ingestion errors into HTTP errors.
+    """
+    try:
+        return await read_upload(file)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidPDFError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def executor_error(e: Exception) -> HTTPException:
+    """
+    Translates executor errors: 503 with Retry-After when the workers' queue is full,
+    504 when a stage did not finish in time.
+    """
+    if isinstance(e, ExecutorBusyError):
+        return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return HTTPException(status_code=504, detail=str(e))
+
+
+async def resolve_document(file: UploadFile = None, document_id: str = None):
+    """
+    Returns the stored document named by `document_id`, or else the ingested upload,
+    translating lookup and ingestion errors into HTTP errors.
+    """
+    if document_id:
+        try:
+            return await run_io(get_document_store().get, document_id)
+        except DocumentNotFoundError:
+            raise HTTPException(status_code=404, detail="Document not found. It may have been evicted; upload it again.")
+    if file is None:
+        raise HTTPException(status_code=400, detail="Provide either a PDF file or a document_id.")
+    return await ingest_upload(file)
 
-UPLOAD_DIR = "uploaded_pdfs"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 @router.post("/generate-quiz/")
 async def generate_quiz_endpoint(
-    file: UploadFile = File(...),
+    file: UploadFile = File(None),
+    document_id: str = Form(None),
     num_questions: int = Form(5),
     question_type: str = Form("multiple_choice"),
+    coverage: bool = Form(False),
 ):
-    print("--- Backend Debug: /generate-quiz/ endpoint received request ---")
-    print(f"  Received file.filename: {file.filename}")
-    print(f"  Received num_questions: {num_questions} (type: {type(num_questions)})")
-    print(f"  Received question_type: {question_type} (type: {type(question_type)})")
-    print("----------------------------------------------------")
-
-    file_location = os.path.join(UPLOAD_DIR, file.filename)
-    try:
-        # Save the uploaded PDF
-        with open(file_location, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        # Extract text from PDF
-        doc = fitz.open(file_location)
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        doc.close()
-
-        if not text.strip():
-            raise HTTPException(status_code=400, detail="Could not extract text from PDF. The PDF might be image-based or empty.")
+    logger.debug(
+        "/generate-quiz/ request: file=%s document_id=%s num_questions=%s question_type=%s coverage=%s",
+        getattr(file, "filename", None), document_id, num_questions, question_type, coverage,
+    )
 
-        # Clean text (you might want to enhance this for better LLM input)
-        cleaned_text = " ".join(text.split())
+    if question_type not in question_gen.QUESTION_TYPES:
+        raise HTTPException(status_code=400, detail="Unsupported question type. Only 'multiple_choice' and 'true_false' are supported.")
 
-        # Generate questions
-        questions = generate_quiz_questions(cleaned_text, num_questions, question_type)
-
-        # Extract vocabulary
-        vocabulary = extract_vocabulary(cleaned_text)
+    started = time.perf_counter()
+    try:
+        upload = await resolve_document(file, document_id)
 
+        # Generate questions and extract vocabulary concurrently
+        stages = {
+            "questions": quiz_for(upload, num_questions, question_type, coverage),
+            "vocabulary": vocabulary_for(upload, DEFAULT_NUM_WORDS),
+        }
+        results, timings, timed_out, errors = await run_stages(stages, QUIZ_DEADLINE_SECONDS)
+        if errors and not results and not timed_out:
+            # Nothing to return: report the failure itself (e.g. an empty document)
+            raise next(iter(errors.values()))
+        for name, error in errors.items():
+            logger.error("Error in /generate-quiz/ stage %s: %s", name, error)
 
+        timings["total"] = round(time.perf_counter() - started, 3)
         response_content = {
-            "questions": questions,
-            "vocabulary": vocabulary,
+            "questions": results.get("questions", []),
+            "vocabulary": results.get("vocabulary", []),
+            "timings": timings,
+            "timed_out": timed_out,
+            "errors": {name: str(error) for name, error in errors.items()},
         }
+        return JSONResponse(content=response_content)
 
+    except EmptyDocumentError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorBusyError, ExecutorTimeoutError) as e:
+        raise executor_error(e)
     except HTTPException as e:
-        print(f"Error in /generate-quiz/: {e.detail}")
+        logger.warning("Error in /generate-quiz/: %s", e.detail)
         raise e
     except Exception as e:
-        print(f"Error generating quiz questions: {e}")
+        logger.error("Error generating quiz questions: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to generate quiz questions: {e}")
-    finally:
-        # Clean up the uploaded file
-        if os.path.exists(file_location):
-            os.remove(file_location)
 
 
-@router.post("/extract-vocabulary/")
-async def extract_vocabulary_endpoint(
-    file: UploadFile = File(...),
-    num_words: int = Form(10)
+def sse_event(event: str, data) -> str:
+    """Formats one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/generate-quiz/stream")
+async def generate_quiz_stream_endpoint(
+    file: UploadFile = File(None),
+    document_id: str = Form(None),
+    num_questions: int = Form(5),
+    question_type: str = Form("multiple_choice"),
 ):
-    print("--- Backend Debug: /extract-vocabulary/ endpoint received request ---")
-    print(f"  Received file.filename: {file.filename}")
-    print(f"  Received num_words: {num_words} (type: {type(num_words)})")
-    print("----------------------------------------------------")
+    """
+    Streams quiz questions as server-sent events while the model is still writing them.
+
+    Emits one `question` event per validated question, then a `done` event with the
+    question count and timings, or an `error` event if generation fails mid-stream.
+    """
+    logger.debug(
+        "/generate-quiz/stream request: file=%s document_id=%s num_questions=%s question_type=%s",
+        getattr(file, "filename", None), document_id, num_questions, question_type,
+    )
 
-    file_location = os.path.join(UPLOAD_DIR, file.filename)
+    if question_type not in question_gen.QUESTION_TYPES:
+        raise HTTPException(status_code=400, detail="Unsupported question type. Only 'multiple_choice' and 'true_false' are supported.")
+
+    started = time.perf_counter()
     try:
-        with open(file_location, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        upload = await resolve_document(file, document_id)
+        # Fail with a plain HTTP error before the stream starts; the prefix is cached for the stream
+        await load_text(upload, question_gen.QUIZ_TEXT_CHARS)
+    except EmptyDocumentError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorBusyError, ExecutorTimeoutError) as e:
+        raise executor_error(e)
+
+    async def events():
+        count = 0
+        first_question = None
+        try:
+            async for question in quiz_stream_for(upload, num_questions, question_type):
+                if first_question is None:
+                    first_question = round(time.perf_counter() - started, 3)
+                count += 1
+                yield sse_event("question", question)
+        except Exception as e:
+            logger.error("Error streaming quiz questions: %s", e)
+            yield sse_event("error", {"detail": f"Failed to generate quiz questions: {e}"})
+            return
+        timings = {"first_question": first_question, "total": round(time.perf_counter() - started, 3)}
+        yield sse_event("done", {"count": count, "timings": timings})
 
-        doc = fitz.open(file_location)
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        doc.close()
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-        if not text.strip():
-            raise HTTPException(status_code=400, detail="Could not extract text from PDF. The PDF might be image-based or empty.")
 
-        cleaned_text = " ".join(text.split())
-        vocabulary = extract_vocabulary(cleaned_text, num_words)
+@router.post("/extract-vocabulary/")
+async def extract_vocabulary_endpoint(
+    file: UploadFile = File(None),
+    document_id: str = Form(None),
+    num_words: int = Form(DEFAULT_NUM_WORDS)
+):
+    logger.debug("/extract-vocabulary/ request: file=%s document_id=%s num_words=%s", getattr(file, "filename", None), document_id, num_words)
 
+    try:
+        upload = await resolve_document(file, document_id)
+        vocabulary = await vocabulary_for(upload, num_words)
         return JSONResponse(content={"vocabulary": vocabulary})
 
+    except EmptyDocumentError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorBusyError, ExecutorTimeoutError) as e:
+        raise executor_error(e)
     except HTTPException as e:
-        print(f"Error in /extract-vocabulary/: {e.detail}")
+        logger.warning("Error in /extract-vocabulary/: %s", e.detail)
         raise e
     except Exception as e:
-        print(f"Error extracting vocabulary: {e}")
+        logger.error("Error extracting vocabulary: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to extract vocabulary: {e}")
-    finally:
-        if os.path.exists(file_location):
-            os.remove(file_location)
 
 
 @router.post("/summarize-text/")
 async def summarize_text_endpoint(
-    file: UploadFile = File(...),
-    num_sentences: int = Form(3)
+    file: UploadFile = File(None),
+    document_id: str = Form(None),
+    num_sentences: int = Form(3),
+    mode: str = Form("truncate"),
 ):
-    print("--- Backend Debug: /summarize-text/ endpoint received request ---")
-    print(f"  Received file.filename: {file.filename}")
-    print(f"  Received num_sentences: {num_sentences} (type: {type(num_sentences)})")
-    print("----------------------------------------------------")
+    logger.debug("/summarize-text/ request: file=%s document_id=%s num_sentences=%s mode=%s", getattr(file, "filename", None), document_id, num_sentences, mode)
+
+    if mode not in SUMMARY_MODES:
+        raise HTTPException(status_code=400, detail=f"Unsupported summary mode. Supported modes: {', '.join(SUMMARY_MODES)}.")
 
-    file_location = os.path.join(UPLOAD_DIR, file.filename)
     try:
-        with open(file_location, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        upload = await resolve_document(file, document_id)
+        summary = await summary_for(upload, num_sentences, mode)
+        return JSONResponse(content={"summary": summary})
+
+    except EmptyDocumentError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorBusyError, ExecutorTimeoutError) as e:
+        raise executor_error(e)
+    except HTTPException as e:
+        logger.warning("Error in /summarize-text/: %s", e.detail)
+        raise e
+    except Exception as e:
+        logger.error("Error summarizing text: %s", e)
+        raise HTTPException(status_code=500, detail=f"Failed to summarize text: {e}")
 
-        doc = fitz.open(file_location)
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        doc.close()
 
-        if not text.strip():
-            raise HTTPException(status_code=400, detail="Could not extract text from PDF. The PDF might be image-based or empty.")
+@router.post("/study-pack")
+async def study_pack_endpoint(
+    file: UploadFile = File(None),
+    document_id: str = Form(None),
+    operations: str = Form(",".join(STUDY_PACK_SECTIONS)),
+    num_questions: int = Form(5),
+    question_type: str = Form("multiple_choice"),
+    coverage: bool = Form(False),
+    num_words: int = Form(DEFAULT_NUM_WORDS),
+    num_sentences: int = Form(3),
+    summary_mode: str = Form("truncate"),
+):
+    """
+    Generates a quiz, vocabulary and summary (or the subset in `operations`) with a
+    single combined model call. Sections missing from the reply fall back to their own
+    calls; `sources` tells, per operation, whether it came from the cache, the combined
+    call or an individual call.
+    """
+    logger.debug(
+        "/study-pack request: file=%s document_id=%s operations=%s",
+        getattr(file, "filename", None), document_id, operations,
+    )
 
-        cleaned_text = " ".join(text.split())
-        summary = summarize_text(cleaned_text, num_sentences)
+    requested = list(dict.fromkeys(op.strip() for op in operations.split(",") if op.strip()))
+    if not requested or any(op not in STUDY_PACK_SECTIONS for op in requested):
+        raise HTTPException(status_code=400, detail=f"operations must be a comma-separated subset of: {', '.join(STUDY_PACK_SECTIONS)}.")
+    if question_type not in question_gen.QUESTION_TYPES:
+        raise HTTPException(status_code=400, detail="Unsupported question type. Only 'multiple_choice' and 'true_false' are supported.")
+    if summary_mode not in SUMMARY_MODES:
+        raise HTTPException(status_code=400, detail=f"Unsupported summary mode. Supported modes: {', '.join(SUMMARY_MODES)}.")
 
-        return JSONResponse(content={"summary": summary})
+    started = time.perf_counter()
+    try:
+        upload = await resolve_document(file, document_id)
+        params = {
+            "num_questions": num_questions,
+            "question_type": question_type,
+            "coverage": coverage,
+            "num_words": num_words,
+            "num_sentences": num_sentences,
+            "summary_mode": summary_mode,
+        }
+        outcome = await study_pack_for(upload, requested, params)
+        return JSONResponse(content={**outcome, "timings": {"total": round(time.perf_counter() - started, 3)}})
 
+    except EmptyDocumentError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorBusyError, ExecutorTimeoutError) as e:
+        raise executor_error(e)
     except HTTPException as e:
-        print(f"Error in /summarize-text/: {e.detail}")
+        logger.warning("Error in /study-pack: %s", e.detail)
         raise e
     except Exception as e:
-        print(f"Error summarizing text: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to summarize text: {e}")
-    finally:
-        if os.path.exists(file_location):
-            os.remove(file_location)
\ No newline at end of file
+        logger.error("Error generating study pack: %s", e)
+        raise HTTPException(status_code=500, detail=f"Failed to generate study pack: {e}")
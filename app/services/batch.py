@@ -0,0 +1,138 @@
+# backend/app/services/batch.py
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from ..config import BATCH_MAX_CONCURRENCY
+from ..utils.log import get_logger
+from .pipeline import operation_coroutine, prepare_text, run_stages, study_pack_for
+
+BATCH_OPERATIONS = ("quiz", "vocabulary", "summary")
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class BatchItem:
+    """One file of a batch: the ingested upload (or the error that rejected it) and its operations."""
+    filename: str
+    operations: list
+    upload: object = None
+    error: str = None
+
+
+async def _process_document(upload, operations: list, params: dict, semaphore: asyncio.Semaphore) -> dict:
+    """
+    Extracts one distinct document once, then runs all of its operations concurrently,
+    or as one study pack when `params["combined"]` is set.
+    A failing operation is reported in `errors` without affecting the others.
+    """
+    async with semaphore:
+        timings = {}
+        started = time.perf_counter()
+        try:
+            await prepare_text(upload)
+        except Exception as e:
+            logger.error("Error extracting %s: %s", upload.filename, e)
+            return {"results": {}, "errors": {operation: str(e) for operation in operations}, "timings": timings}
+        timings["extraction"] = round(time.perf_counter() - started, 3)
+
+        if params.get("combined") and len(operations) > 1:
+            pack_started = time.perf_counter()
+            try:
+                outcome = await study_pack_for(upload, operations, params)
+            except Exception as e:
+                logger.error("Error in batch study pack for %s: %s", upload.filename, e)
+                outcome = {"results": {}, "errors": {operation: str(e) for operation in operations}}
+            timings["study_pack"] = round(time.perf_counter() - pack_started, 3)
+            timings["total"] = round(time.perf_counter() - started, 3)
+            return {"results": outcome["results"], "errors": outcome["errors"], "timings": timings}
+
+        errors = {}
+
+        async def run_operation(operation):
+            try:
+                return await operation_coroutine(upload, operation, params)
+            except Exception as e:
+                logger.error("Error in batch operation %s for %s: %s", operation, upload.filename, e)
+                errors[operation] = str(e)
+                return None
+
+        results, stage_timings, _, _ = await run_stages({operation: run_operation(operation) for operation in operations})
+        timings.update(stage_timings)
+        timings["total"] = round(time.perf_counter() - started, 3)
+        results = {operation: result for operation, result in results.items() if operation not in errors}
+        return {"results": results, "errors": errors, "timings": timings}
+
+
+async def run_batch(items: list, params: dict, max_concurrency: int = BATCH_MAX_CONCURRENCY):
+    """
+    Processes the files of a batch and yields one result per file as soon as it is ready.
+
+    Files with identical content (same SHA-256) are extracted and processed only once,
+    with the union of their requested operations; each file still gets its own entry,
+    holding only the operations it asked for. At most `max_concurrency` distinct
+    documents are processed at once, and all of their Gemini calls share the
+    LLM_MAX_CONCURRENCY budget of the LLM client.
+
+    Args:
+        items (list): The `BatchItem`s, in upload order.
+        params (dict): Operation parameters shared by every file, as for background jobs.
+        max_concurrency (int): The number of distinct documents processed concurrently.
+
+    Yields:
+        dict: Per-file results with `index`, `filename`, `sha256`, `duplicate_of`,
+        `status` ("completed" or "failed"), `results`, `errors` and `timings`.
+    """
+    # sha256 -> (upload, operations, [(index, item)])
+    documents = OrderedDict()
+    for index, item in enumerate(items):
+        if item.upload is None:
+            yield {
+                "index": index,
+                "filename": item.filename,
+                "sha256": None,
+                "duplicate_of": None,
+                "status": "failed",
+                "results": {},
+                "errors": {"upload": item.error},
+                "timings": {},
+            }
+            continue
+        upload, operations, members = documents.setdefault(item.upload.sha256, (item.upload, [], []))
+        operations.extend(op for op in item.operations if op not in operations)
+        members.append((index, item))
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def process(sha256, upload, operations):
+        return sha256, await _process_document(upload, operations, params, semaphore)
+
+    tasks = [
+        asyncio.create_task(process(sha256, upload, operations))
+        for sha256, (upload, operations, _) in documents.items()
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            sha256, outcome = await next_done
+            _, _, members = documents[sha256]
+            first_filename = members[0][1].filename
+            for position, (index, item) in enumerate(members):
+                results = {op: outcome["results"][op] for op in item.operations if op in outcome["results"]}
+                errors = {op: outcome["errors"][op] for op in item.operations if op in outcome["errors"]}
+                yield {
+                    "index": index,
+                    "filename": item.filename,
+                    "sha256": sha256,
+                    "duplicate_of": first_filename if position else None,
+                    "status": "failed" if len(errors) == len(item.operations) else "completed",
+                    "results": results,
+                    "errors": errors,
+                    "timings": outcome["timings"],
+                }
+    finally:
+        # The consumer went away (e.g. a closed stream): stop the remaining documents
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
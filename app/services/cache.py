@@ -0,0 +1,286 @@
+# backend/app/services/cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from ..config import (
+    CACHE_BACKEND,
+    CACHE_MAX_BYTES,
+    CACHE_MAX_ENTRIES,
+    CACHE_SQLITE_PATH,
+    CACHE_TTL_SECONDS,
+)
+from .executors import run_io
+
+
+def content_hash(data: bytes) -> str:
+    """
+    Returns the SHA-256 hex digest of the uploaded file contents.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def make_key(namespace: str, digest: str, **params) -> str:
+    """
+    Builds a cache key from a namespace, a content digest and request parameters.
+
+    Args:
+        namespace (str): The kind of value stored, e.g. "text", "quiz", "vocabulary" or "summary".
+        digest (str): The SHA-256 digest of the source document.
+        **params: Request parameters (and the model name) that affect the result.
+
+    Returns:
+        str: A stable key such as "quiz:<digest>:model=gemini-1.5-pro:num_questions=5".
+    """
+    parts = [namespace, digest]
+    parts.extend(f"{name}={params[name]}" for name in sorted(params))
+    return ":".join(parts)
+
+
+class CacheBackend:
+    """
+    Base class for result cache backends.
+
+    Values are stored as JSON strings, so anything cached must be JSON-serializable.
+    Hit/miss counters are tracked per namespace (the first segment of the key).
+    Async code uses `aget`, `aset` and `astats`, which run the calls of a `blocking`
+    backend on the I/O thread pool.
+    """
+
+    name = "base"
+    # Whether calls do blocking I/O and must stay off the event loop
+    blocking = False
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self._hits = {}
+        self._misses = {}
+
+    def get(self, key: str):
+        raw = self._get(key)
+        namespace = key.split(":", 1)[0]
+        with self._stats_lock:
+            counter = self._misses if raw is None else self._hits
+            counter[namespace] = counter.get(namespace, 0) + 1
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    def set(self, key: str, value) -> None:
+        self._set(key, json.dumps(value))
+
+    async def aget(self, key: str):
+        """
+        Like `get`, for async code.
+
+        Raises:
+            ExecutorBusyError: If the I/O thread pool's queue is full.
+            ExecutorTimeoutError: If the lookup does not finish in time.
+        """
+        if self.blocking:
+            return await run_io(self.get, key)
+        return self.get(key)
+
+    async def aset(self, key: str, value) -> None:
+        """Like `set`, for async code. The value is serialized first, on the calling thread."""
+        raw = json.dumps(value)
+        if self.blocking:
+            await run_io(self._set, key, raw)
+        else:
+            self._set(key, raw)
+
+    async def astats(self) -> dict:
+        """Like `stats`, for async code."""
+        if self.blocking:
+            return await run_io(self.stats)
+        return self.stats()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            namespaces = sorted(set(self._hits) | set(self._misses))
+            per_namespace = {
+                ns: {"hits": self._hits.get(ns, 0), "misses": self._misses.get(ns, 0)}
+                for ns in namespaces
+            }
+        hits = sum(v["hits"] for v in per_namespace.values())
+        misses = sum(v["misses"] for v in per_namespace.values())
+        return {
+            "backend": self.name,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            "namespaces": per_namespace,
+            "entries": self._entry_count(),
+        }
+
+    def _get(self, key: str):
+        raise NotImplementedError
+
+    def _set(self, key: str, raw: str) -> None:
+        raise NotImplementedError
+
+    def _entry_count(self) -> int:
+        raise NotImplementedError
+
+
+class NullCache(CacheBackend):
+    """Backend used when caching is disabled; every lookup is a miss."""
+
+    name = "none"
+
+    def _get(self, key):
+        return None
+
+    def _set(self, key, raw):
+        pass
+
+    def _entry_count(self):
+        return 0
+
+
+class MemoryCache(CacheBackend):
+    """
+    In-process LRU cache with entry-count, total-size and TTL eviction.
+    Each uvicorn worker gets its own copy.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: int):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, raw)
+        self._total_bytes = 0
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, raw = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return raw
+
+    def _set(self, key, raw):
+        if len(raw) > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, raw)
+            self._total_bytes += len(raw)
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+
+    def _remove(self, key):
+        _, raw = self._entries.pop(key)
+        self._total_bytes -= len(raw)
+
+    def _entry_count(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteCache(CacheBackend):
+    """
+    On-disk cache backed by a SQLite file, shared by every worker pointing at the same path.
+    Expired rows are skipped on read; the least recently used rows are evicted once
+    `max_entries` is exceeded. Hit/miss counters are per process.
+    """
+
+    name = "sqlite"
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: int):
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+        conn.commit()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _get(self, key):
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at < now:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            conn.commit()
+            return None
+        conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        conn.commit()
+        return value
+
+    def _set(self, key, raw):
+        conn = self._connection()
+        now = time.time()
+        expires_at = now + self.ttl_seconds if self.ttl_seconds > 0 else None
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, raw, expires_at, now),
+        )
+        conn.execute(
+            "DELETE FROM cache WHERE key IN ("
+            " SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        conn.commit()
+
+    def _entry_count(self):
+        return self._connection().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> CacheBackend:
+    """
+    Returns the process-wide cache, building it from the configured backend on first use.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                if CACHE_BACKEND == "sqlite":
+                    _cache = SQLiteCache(CACHE_SQLITE_PATH, CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS)
+                elif CACHE_BACKEND == "memory":
+                    _cache = MemoryCache(CACHE_MAX_ENTRIES, CACHE_MAX_BYTES, CACHE_TTL_SECONDS)
+                else:
+                    _cache = NullCache()
+    return _cache
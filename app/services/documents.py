@@ -0,0 +1,267 @@
+# backend/app/services/documents.py
+"""
+Persistent store of ingested documents, so repeated operations on the same PDF skip
+upload, extraction, cleaning and tokenization.
+
+Each document is one SQLite row keyed by the SHA-256 of the PDF: the cleaned text
+(zlib-compressed), the character offset of every page in it (packed 32-bit integers)
+and the lemma frequency table used for vocabulary ranking (compressed JSON). When the
+stored bytes exceed DOCUMENT_STORE_MAX_BYTES, the least recently used documents are
+evicted.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from array import array
+from collections import Counter
+from functools import cached_property
+
+from ..config import DOCUMENT_STORE_MAX_BYTES, DOCUMENT_STORE_PATH
+from ..utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+class DocumentNotFoundError(KeyError):
+    """Raised when a document id is unknown or its document has been evicted."""
+
+
+def _pack_offsets(offsets: list) -> bytes:
+    return array("I", offsets).tobytes()
+
+
+def _unpack_offsets(blob: bytes) -> list:
+    offsets = array("I")
+    offsets.frombytes(blob)
+    return offsets.tolist()
+
+
+def _pack_counts(counts: Counter) -> bytes:
+    # A list of pairs keeps the first-occurrence order that ranking ties depend on
+    return zlib.compress(json.dumps(list(counts.items()), separators=(",", ":")).encode())
+
+
+def _unpack_counts(blob: bytes) -> Counter:
+    return Counter(dict(json.loads(zlib.decompress(blob))))
+
+
+class StoredDocument:
+    """
+    A document loaded from the store. The pipeline accepts it wherever it accepts an
+    upload; its text and token counts are decompressed on first use.
+    """
+
+    def __init__(self, document_id: str, filename: str, page_count: int, size_bytes: int, created_at: float, text_blob: bytes, offsets_blob: bytes, counts_blob: bytes):
+        self.id = document_id
+        self.filename = filename
+        self.page_count = page_count
+        self.size_bytes = size_bytes
+        self.created_at = created_at
+        self._text_blob = text_blob
+        self._offsets_blob = offsets_blob
+        self._counts_blob = counts_blob
+
+    @property
+    def sha256(self) -> str:
+        # Result cache keys use the content digest, shared with uploads of the same file
+        return self.id
+
+    @cached_property
+    def text(self) -> str:
+        """The whitespace-normalized text, pages joined with single spaces."""
+        return zlib.decompress(self._text_blob).decode()
+
+    @cached_property
+    def page_offsets(self) -> list:
+        """Character offset in `text` at which each page starts; empty pages take no space."""
+        return _unpack_offsets(self._offsets_blob)
+
+    @cached_property
+    def token_counts(self):
+        """Lemma -> occurrences for the whole text, or None if it was not computed at ingestion."""
+        return _unpack_counts(self._counts_blob) if self._counts_blob is not None else None
+
+    def page_text(self, page_number: int) -> str:
+        """Returns the cleaned text of one zero-based page."""
+        offsets = self.page_offsets
+        start = offsets[page_number]
+        stop = offsets[page_number + 1] if page_number + 1 < len(offsets) else len(self.text)
+        return self.text[start:stop].strip()
+
+    def to_dict(self) -> dict:
+        return {
+            "document_id": self.id,
+            "filename": self.filename,
+            "page_count": self.page_count,
+            "characters": len(self.text),
+            "size_bytes": self.size_bytes,
+            "created_at": self.created_at,
+        }
+
+
+class DocumentStore:
+    """
+    SQLite-backed document store shared by every worker process.
+
+    Args:
+        path (str): The SQLite file.
+        max_bytes (int): Budget for the stored document bytes; 0 disables eviction.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Set up on a connection of its own, before WAL mode: auto_vacuum only takes effect
+        # when set before the first table is created, or through a full VACUUM.
+        # Incremental auto-vacuum lets evictions hand pages back to the file system.
+        conn = sqlite3.connect(path, timeout=5.0)
+        try:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                if conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone():
+                    # A store created without it is converted once
+                    conn.execute("VACUUM")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                " id TEXT PRIMARY KEY,"
+                " filename TEXT,"
+                " page_count INTEGER NOT NULL,"
+                " text BLOB NOT NULL,"
+                " page_offsets BLOB NOT NULL,"
+                " token_counts BLOB,"
+                " size_bytes INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS documents_last_used ON documents (last_used)")
+            conn.commit()
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def put(self, document_id: str, filename: str, page_texts: list, token_counts: Counter = None) -> StoredDocument:
+        """
+        Stores a document from its cleaned page texts, then evicts cold documents over budget.
+
+        Args:
+            document_id (str): The SHA-256 digest of the PDF.
+            filename (str): The uploaded file name.
+            page_texts (list): The whitespace-normalized text of every page, in order.
+            token_counts (Counter): Lemma frequencies of the text, if already computed.
+
+        Returns:
+            StoredDocument: The stored document.
+        """
+        offsets = []
+        parts = []
+        position = 0
+        for page in page_texts:
+            offsets.append(position)
+            if page:
+                parts.append(page)
+                position += len(page) + 1
+        text_blob = zlib.compress(" ".join(parts).encode())
+        offsets_blob = _pack_offsets(offsets)
+        counts_blob = _pack_counts(token_counts) if token_counts is not None else None
+        size_bytes = len(text_blob) + len(offsets_blob) + len(counts_blob or b"")
+        now = time.time()
+
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO documents (id, filename, page_count, text, page_offsets, token_counts, size_bytes, created_at, last_used)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (document_id, filename, len(page_texts), text_blob, offsets_blob, counts_blob, size_bytes, now, now),
+        )
+        conn.commit()
+        self._evict(keep=document_id)
+        return StoredDocument(document_id, filename, len(page_texts), size_bytes, now, text_blob, offsets_blob, counts_blob)
+
+    def set_token_counts(self, document_id: str, token_counts: Counter) -> None:
+        """Saves token counts computed after ingestion (e.g. once NLTK data became available)."""
+        counts_blob = _pack_counts(token_counts)
+        conn = self._connection()
+        conn.execute(
+            "UPDATE documents SET token_counts = ?, size_bytes = length(text) + length(page_offsets) + ? WHERE id = ?",
+            (counts_blob, len(counts_blob), document_id),
+        )
+        conn.commit()
+
+    def get(self, document_id: str) -> StoredDocument:
+        """
+        Loads a document and marks it as recently used.
+
+        Raises:
+            DocumentNotFoundError: If the id is unknown or the document was evicted.
+        """
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT id, filename, page_count, size_bytes, created_at, text, page_offsets, token_counts FROM documents WHERE id = ?",
+            (document_id,),
+        ).fetchone()
+        if row is None:
+            raise DocumentNotFoundError(document_id)
+        conn.execute("UPDATE documents SET last_used = ? WHERE id = ?", (time.time(), document_id))
+        conn.commit()
+        return StoredDocument(*row)
+
+    def contains(self, document_id: str) -> bool:
+        return self._connection().execute("SELECT 1 FROM documents WHERE id = ?", (document_id,)).fetchone() is not None
+
+    def delete(self, document_id: str) -> bool:
+        conn = self._connection()
+        deleted = conn.execute("DELETE FROM documents WHERE id = ?", (document_id,)).rowcount > 0
+        conn.commit()
+        return deleted
+
+    def total_bytes(self) -> int:
+        return self._connection().execute("SELECT COALESCE(SUM(size_bytes), 0) FROM documents").fetchone()[0]
+
+    def _evict(self, keep: str) -> None:
+        """Deletes least recently used documents, except `keep`, until the budget is met."""
+        if self.max_bytes <= 0:
+            return
+        conn = self._connection()
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for document_id, size_bytes in conn.execute("SELECT id, size_bytes FROM documents WHERE id != ? ORDER BY last_used", (keep,)).fetchall():
+            if total <= self.max_bytes:
+                break
+            evicted.append((document_id,))
+            total -= size_bytes
+        conn.executemany("DELETE FROM documents WHERE id = ?", evicted)
+        conn.commit()
+        conn.execute("PRAGMA incremental_vacuum")
+        logger.info("Evicted %d documents to stay within %d bytes", len(evicted), self.max_bytes)
+
+
+_document_store = None
+_store_lock = threading.Lock()
+
+
+def get_document_store() -> DocumentStore:
+    """
+    Returns the process-wide document store, created on first use.
+    """
+    global _document_store
+    if _document_store is None:
+        with _store_lock:
+            if _document_store is None:
+                _document_store = DocumentStore(DOCUMENT_STORE_PATH, DOCUMENT_STORE_MAX_BYTES)
+    return _document_store
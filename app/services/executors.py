@@ -0,0 +1,243 @@
+# backend/app/services/executors.py
+"""
+Executors for work that must not run on the event loop.
+
+CPU-bound stages (PDF extraction, whitespace normalization, tokenization and
+lemmatization) run on a process pool, so a 400-page PDF never holds the GIL the event
+loop needs to answer other requests. Blocking I/O (the document store's SQLite calls)
+runs on a thread pool. Both pools are sized by config and shared by the whole worker.
+
+Each pool admits EXECUTOR_MAX_QUEUE waiting tasks beyond its busy workers and rejects
+more with `ExecutorBusyError`, so an overloaded server answers 503 instead of queueing
+without bound. `run_cpu` and `run_io` stop waiting for a task after
+EXECUTOR_TASK_TIMEOUT_SECONDS. A queued task is then cancelled, but one that is already
+running cannot be interrupted: it keeps its worker, and counts as in flight, until it
+finishes.
+
+If a worker process dies (killed by the OOM killer, or crashed in native code), the
+process pool is broken for good. The pool then drops it, so the next task starts fresh
+workers. Tasks that were running on the broken pool raise `ExecutorBusyError` (503).
+
+Worker processes load the NLTK data and the lemmatizer when they start, and `warm_up`
+starts all of them before the first request.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from ..config import CPU_WORKERS, EXECUTOR_MAX_QUEUE, EXECUTOR_TASK_TIMEOUT_SECONDS, IO_WORKERS
+from ..utils.log import get_logger
+from .metrics import EXECUTOR_IN_FLIGHT, EXECUTOR_TASK_SECONDS, EXECUTOR_TASKS, EXECUTOR_TIMEOUTS, EXECUTOR_UTILIZATION, EXECUTOR_WORKERS
+
+logger = get_logger(__name__)
+
+
+class ExecutorBusyError(RuntimeError):
+    """Raised when a pool already has EXECUTOR_MAX_QUEUE tasks waiting for a worker."""
+
+
+class ExecutorTimeoutError(TimeoutError):
+    """Raised when a task does not finish within its timeout."""
+
+
+def _init_cpu_worker() -> None:
+    """Runs once in every CPU worker process, so its first task does not load NLTK data."""
+    from .nlp_resources import load_nltk_resources
+
+    try:
+        missing = load_nltk_resources()
+    except Exception as e:
+        # A failing initializer would break the whole pool; tasks that need NLTK report it
+        logger.warning("CPU worker could not preload NLTK resources: %s", e)
+        return
+    if missing:
+        logger.debug("CPU worker started without NLTK resources: %s", ", ".join(missing))
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _process_pool(workers: int) -> ProcessPoolExecutor:
+    # "spawn" keeps worker processes from inheriting the server's threads and locks.
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_cpu_worker,
+    )
+
+
+def _thread_pool(workers: int) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="io")
+
+
+class _Pool:
+    """An executor created on first use, with admission control and utilization metrics."""
+
+    def __init__(self, name: str, workers: int, max_queue: int, factory):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self._factory = factory
+        self._executor = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        EXECUTOR_WORKERS.set(workers, pool=name)
+
+    def submit(self, fn, *args):
+        """
+        Submits `fn(*args)` and returns its concurrent.futures.Future.
+
+        Raises:
+            ExecutorBusyError: If `max_queue` tasks are already waiting for a worker, or
+                the executor broke and could not be replaced.
+        """
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                EXECUTOR_TASKS.inc(pool=self.name, outcome="rejected")
+                raise ExecutorBusyError(f"The {self.name} executor is busy ({self.max_queue} tasks waiting). Try again later.")
+            self._in_flight += 1
+            self._update_gauges()
+        started = time.perf_counter()
+        try:
+            # A worker may have died since the last task; one retry gets a fresh executor
+            for attempt in range(2):
+                executor = self._current()
+                try:
+                    future = executor.submit(fn, *args)
+                    break
+                except BrokenExecutor:
+                    self._discard(executor)
+                    if attempt:
+                        raise ExecutorBusyError(f"The {self.name} executor's workers keep failing. Try again later.") from None
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+                self._update_gauges()
+            raise
+        future.add_done_callback(lambda done: self._finished(done, started, executor))
+        return future
+
+    def _current(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._factory(self.workers)
+            return self._executor
+
+    def _discard(self, executor) -> None:
+        """Drops `executor` if it is still the current one, so the next task creates a new one."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        logger.warning("The %s executor broke (a worker died); starting new workers on the next task", self.name)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _finished(self, future, started: float, executor) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._update_gauges()
+        if future.cancelled():
+            outcome = "cancelled"
+        else:
+            error = future.exception()
+            if isinstance(error, BrokenExecutor):
+                self._discard(executor)
+            outcome = "error" if error is not None else "ok"
+        EXECUTOR_TASKS.inc(pool=self.name, outcome=outcome)
+        EXECUTOR_TASK_SECONDS.observe(time.perf_counter() - started, pool=self.name)
+
+    def _update_gauges(self) -> None:
+        EXECUTOR_IN_FLIGHT.set(self._in_flight, pool=self.name)
+        EXECUTOR_UTILIZATION.set(min(self._in_flight, self.workers) / self.workers, pool=self.name)
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = self._in_flight
+        return {
+            "workers": self.workers,
+            "in_flight": in_flight,
+            "queued": max(0, in_flight - self.workers),
+            "utilization": min(in_flight, self.workers) / self.workers,
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_cpu_pool = _Pool("cpu", CPU_WORKERS or os.cpu_count() or 1, EXECUTOR_MAX_QUEUE, _process_pool)
+_io_pool = _Pool("io", max(1, IO_WORKERS), EXECUTOR_MAX_QUEUE, _thread_pool)
+
+# Number of CPU worker processes, e.g. for splitting a document into page ranges
+NUM_CPU_WORKERS = _cpu_pool.workers
+
+
+async def _run(pool: _Pool, fn, args: tuple, timeout: float = None):
+    future = pool.submit(fn, *args)
+    timeout = EXECUTOR_TASK_TIMEOUT_SECONDS if timeout is None else timeout
+    try:
+        # Cancelling the wrapper also cancels the task if it has not started yet
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout or None)
+    except BrokenExecutor:
+        # The task may be what killed the worker, so it is not retried; the pool is fresh again
+        raise ExecutorBusyError(f"A {pool.name} worker died while running {getattr(fn, '__name__', 'the task')}. Try again.") from None
+    except asyncio.TimeoutError:
+        EXECUTOR_TIMEOUTS.inc(pool=pool.name)
+        raise ExecutorTimeoutError(f"{getattr(fn, '__name__', 'Task')} did not finish within {timeout} seconds.") from None
+
+
+async def run_cpu(fn, *args, timeout: float = None):
+    """
+    Runs `fn(*args)` in a CPU worker process and returns its result.
+
+    `fn`, its arguments and its result must be picklable: module-level functions and
+    plain data.
+
+    Args:
+        fn: The function to run.
+        *args: Its arguments.
+        timeout (float): Seconds to wait; None uses EXECUTOR_TASK_TIMEOUT_SECONDS, 0 waits indefinitely.
+
+    Raises:
+        ExecutorBusyError: If the CPU pool's queue is full, or its worker died.
+        ExecutorTimeoutError: If the task does not finish in time.
+    """
+    return await _run(_cpu_pool, fn, args, timeout)
+
+
+async def run_io(fn, *args, timeout: float = None):
+    """
+    Runs the blocking call `fn(*args)` on the I/O thread pool and returns its result.
+    Arguments and timeout as for `run_cpu`.
+    """
+    return await _run(_io_pool, fn, args, timeout)
+
+
+async def warm_up() -> None:
+    """
+    Starts every CPU worker process, each loading the NLTK data and the lemmatizer, so
+    the first requests do not pay for process start-up.
+    """
+    started = time.perf_counter()
+    pids = await asyncio.gather(*(run_cpu(_ping) for _ in range(_cpu_pool.workers)))
+    logger.info("Started %d CPU worker processes in %.1fs", len(set(pids)), time.perf_counter() - started)
+
+
+def executor_stats() -> dict:
+    """Pool name ("cpu", "io") -> workers, tasks in flight, tasks queued and utilization (0-1)."""
+    return {pool.name: pool.stats() for pool in (_cpu_pool, _io_pool)}
+
+
+def shutdown_executors() -> None:
+    """
+    Stops the worker processes and threads, cancelling queued tasks. The pools start
+    again on their next use.
+    """
+    _cpu_pool.shutdown()
+    _io_pool.shutdown()
@@ -0,0 +1,292 @@
+# backend/app/services/jobs.py
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+
+from ..config import (
+    JOB_MAX_QUEUE_DEPTH,
+    JOB_RETENTION_SECONDS,
+    JOB_SQLITE_PATH,
+    JOB_STORE,
+    JOB_WORKERS,
+)
+from ..utils.log import get_logger
+from .executors import run_io
+from .pipeline import operation_coroutine, run_stages, study_pack_for
+
+JOB_OPERATIONS = ("quiz", "vocabulary", "summary")
+
+logger = get_logger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at its maximum depth."""
+
+
+@dataclass
+class Job:
+    id: str
+    operations: list
+    params: dict
+    filename: str = None
+    status: str = "queued" # queued -> running -> completed | failed
+    stages: dict = field(default_factory=dict) # operation -> {"status": ..., "seconds": ...}
+    results: dict = field(default_factory=dict)
+    errors: dict = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        done = sum(1 for stage in self.stages.values() if stage["status"] in ("completed", "failed"))
+        data["progress"] = done / len(self.stages) if self.stages else 0.0
+        return data
+
+
+class JobStore:
+    """Base class for job stores. Jobs are saved whole on every state change."""
+
+    # Whether calls do blocking I/O and must stay off the event loop
+    blocking = False
+
+    def save(self, job: Job) -> None:
+        raise NotImplementedError
+
+    def get(self, job_id: str):
+        raise NotImplementedError
+
+
+class InMemoryJobStore(JobStore):
+    """
+    Keeps jobs in this process. Finished jobs are dropped after JOB_RETENTION_SECONDS.
+    """
+
+    def __init__(self, retention_seconds: int):
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+
+    def save(self, job):
+        with self._lock:
+            self._jobs[job.id] = job
+            self._jobs.move_to_end(job.id)
+            cutoff = time.time() - self.retention_seconds
+            for job_id in [j.id for j in self._jobs.values() if j.status in ("completed", "failed") and j.updated_at < cutoff]:
+                del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Stores jobs in a SQLite file, so any worker process can report on any job.
+    Finished jobs are deleted after JOB_RETENTION_SECONDS.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, retention_seconds: int):
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " data TEXT NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def save(self, job):
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO jobs (id, status, data, updated_at) VALUES (?, ?, ?, ?)",
+            (job.id, job.status, json.dumps(asdict(job)), job.updated_at),
+        )
+        conn.execute(
+            "DELETE FROM jobs WHERE status IN ('completed', 'failed') AND updated_at < ?",
+            (time.time() - self.retention_seconds,),
+        )
+        conn.commit()
+
+    def get(self, job_id):
+        row = self._connection().execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job(**json.loads(row[0])) if row else None
+
+
+class JobQueue:
+    """
+    Bounded queue of pipeline jobs served by a fixed pool of worker tasks.
+
+    The uploaded bytes stay in memory with the queued item; only job metadata and
+    results go to the store. Workers start on the first submission, on the running loop.
+    A `blocking` store is called on the I/O thread pool.
+    """
+
+    def __init__(self, store: JobStore, num_workers: int, max_depth: int):
+        self.store = store
+        self.num_workers = num_workers
+        self.max_depth = max_depth
+        self._queue = None
+        self._loop = None
+        self._workers = []
+        self._save_lock = None
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_depth)
+            self._save_lock = asyncio.Lock()
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.num_workers)]
+
+    async def _save(self, job: Job) -> None:
+        if not self.store.blocking:
+            self.store.save(job)
+            return
+        # Saves are written in order, each from a snapshot taken on the loop, so a slow
+        # write never lands after a newer state of the same job
+        async with self._save_lock:
+            await run_io(self.store.save, Job(**asdict(job)))
+
+    async def get(self, job_id: str):
+        """Loads a job from the store, or returns None."""
+        if self.store.blocking:
+            return await run_io(self.store.get, job_id)
+        return self.store.get(job_id)
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, upload, operations: list, params: dict) -> Job:
+        """
+        Queues a job for `upload` and returns it once it is saved, without waiting for it to run.
+
+        Raises:
+            QueueFullError: If JOB_MAX_QUEUE_DEPTH jobs are already waiting.
+        """
+        self._ensure_started()
+        if self._queue.full():
+            raise QueueFullError(f"Job queue is full ({self.max_depth} jobs waiting). Try again later.")
+        job = Job(
+            id=uuid.uuid4().hex,
+            operations=list(operations),
+            params=params,
+            filename=upload.filename,
+            stages={operation: {"status": "queued", "seconds": None} for operation in operations},
+        )
+        await self._save(job)
+        try:
+            self._queue.put_nowait((job, upload))
+        except asyncio.QueueFull:
+            # Other submissions filled the queue while the job was being saved
+            job.status = "failed"
+            job.errors = {operation: "Job queue is full." for operation in operations}
+            await self._save(job)
+            raise QueueFullError(f"Job queue is full ({self.max_depth} jobs waiting). Try again later.") from None
+        return job
+
+    async def _worker(self):
+        while True:
+            job, upload = await self._queue.get()
+            try:
+                await self._run(job, upload)
+            except Exception as e:
+                logger.error("Error running job %s: %s", job.id, e)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job, upload):
+        job.status = "running"
+        job.updated_at = time.time()
+        await self._save(job)
+
+        async def run_operation(operation):
+            job.stages[operation]["status"] = "running"
+            await self._save(job)
+            started = time.perf_counter()
+            try:
+                job.results[operation] = await operation_coroutine(upload, operation, job.params)
+                job.stages[operation]["status"] = "completed"
+            except Exception as e:
+                logger.error("Error in job %s operation %s: %s", job.id, operation, e)
+                job.errors[operation] = str(e)
+                job.stages[operation]["status"] = "failed"
+            job.stages[operation]["seconds"] = round(time.perf_counter() - started, 3)
+            job.updated_at = time.time()
+            await self._save(job)
+
+        if job.params.get("combined") and len(job.operations) > 1:
+            await self._run_combined(job, upload)
+        else:
+            await run_stages({operation: run_operation(operation) for operation in job.operations})
+        job.status = "failed" if len(job.errors) == len(job.operations) else "completed"
+        job.updated_at = time.time()
+        await self._save(job)
+
+    async def _run_combined(self, job: Job, upload):
+        """Runs all of the job's operations as one study pack; see `pipeline.study_pack_for`."""
+        for operation in job.operations:
+            job.stages[operation]["status"] = "running"
+        await self._save(job)
+        started = time.perf_counter()
+        try:
+            outcome = await study_pack_for(upload, job.operations, job.params)
+        except Exception as e:
+            logger.error("Error in job %s study pack: %s", job.id, e)
+            outcome = {"results": {}, "errors": {operation: str(e) for operation in job.operations}}
+        seconds = round(time.perf_counter() - started, 3)
+        for operation in job.operations:
+            if operation in outcome["results"]:
+                job.results[operation] = outcome["results"][operation]
+                job.stages[operation]["status"] = "completed"
+            else:
+                job.errors[operation] = outcome["errors"].get(operation, "No result.")
+                job.stages[operation]["status"] = "failed"
+            job.stages[operation]["seconds"] = seconds
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._loop = None
+
+
+_job_queue = None
+
+
+def get_job_queue() -> JobQueue:
+    """
+    Returns the process-wide job queue, building its store from configuration on first use.
+    """
+    global _job_queue
+    if _job_queue is None:
+        if JOB_STORE == "sqlite":
+            store = SQLiteJobStore(JOB_SQLITE_PATH, JOB_RETENTION_SECONDS)
+        else:
+            store = InMemoryJobStore(JOB_RETENTION_SECONDS)
+        _job_queue = JobQueue(store, JOB_WORKERS, JOB_MAX_QUEUE_DEPTH)
+    return _job_queue
@@ -0,0 +1,354 @@
+# backend/app/services/llm_client.py
+import asyncio
+import functools
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+
+from ..config import (
+    LLM_BACKOFF_BASE_SECONDS,
+    LLM_BACKOFF_MAX_SECONDS,
+    LLM_BREAKER_FAILURE_THRESHOLD,
+    LLM_BREAKER_RESET_SECONDS,
+    LLM_HEDGE_AFTER_SECONDS,
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_RETRIES,
+    LLM_PROVIDER,
+    LLM_RATE_LIMIT_BURST,
+    LLM_RATE_LIMIT_PER_MINUTE,
+    LLM_TIMEOUT_SECONDS,
+)
+from ..utils.log import get_logger
+from .llm_resilience import CircuitBreaker, CircuitOpenError, TokenBucket, backoff_delay, is_retryable
+from .metrics import (
+    LLM_CALL_SECONDS,
+    LLM_CALLS,
+    LLM_CIRCUIT_OPEN,
+    LLM_RATE_LIMIT_WAIT_SECONDS,
+    LLM_RETRIES,
+    STAGE_SECONDS,
+    record_llm_tokens,
+)
+
+logger = get_logger(__name__)
+
+# The blocking model SDK calls run on a dedicated, bounded thread pool so a slow
+# response never blocks the event loop. The pool is sized to the concurrency limit,
+# so requests beyond it wait on the semaphore instead of piling up in the pool queue.
+_executor = ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY, thread_name_prefix="llm")
+
+# Model objects by model name, created on first use. Every provider returns objects with
+# the `GenerativeModel.generate_content(prompt, stream=..., request_options=...)` interface.
+_models = {}
+_models_lock = threading.Lock()
+_configured = False
+
+# asyncio primitives are bound to the loop they are first used on, so keep one per loop.
+_semaphores = weakref.WeakKeyDictionary()
+
+# One rate limiter for the whole process, matched to the provider quota, and one circuit
+# breaker per model name
+_rate_limiter = TokenBucket(LLM_RATE_LIMIT_PER_MINUTE / 60, LLM_RATE_LIMIT_BURST) if LLM_RATE_LIMIT_PER_MINUTE > 0 else None
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def _create_gemini_model(model_name: str):
+    global _configured
+    from dotenv import load_dotenv
+    from google.generativeai import GenerativeModel, configure
+
+    if not _configured:
+        load_dotenv()
+        configure(api_key=os.getenv("GEMINI_API_KEY"))
+        _configured = True
+    return GenerativeModel(model_name)
+
+
+def _create_stub_model(model_name: str):
+    from .llm_stub import StubModel
+
+    return StubModel(model_name)
+
+
+# LLM_PROVIDER value -> factory building the model object for a model name
+PROVIDERS = {
+    "gemini": _create_gemini_model,
+    "stub": _create_stub_model,
+}
+
+
+def get_model(model_name: str):
+    """
+    Returns the shared model object for `model_name` from the configured LLM_PROVIDER.
+
+    The provider SDK is imported (and, for Gemini, configured with GEMINI_API_KEY) only
+    on the first call, so importing the services costs nothing and needs no network.
+
+    Raises:
+        ValueError: If LLM_PROVIDER names an unknown provider.
+    """
+    model = _models.get(model_name)
+    if model is not None:
+        return model
+    factory = PROVIDERS.get(LLM_PROVIDER)
+    if factory is None:
+        raise ValueError(f"Unknown LLM_PROVIDER '{LLM_PROVIDER}'. Supported providers: {', '.join(PROVIDERS)}.")
+    with _models_lock:
+        model = _models.get(model_name)
+        if model is None:
+            model = factory(model_name)
+            _models[model_name] = model
+    return model
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+        _semaphores[loop] = semaphore
+    return semaphore
+
+
+def get_breaker(model_name: str) -> CircuitBreaker:
+    """Returns the circuit breaker guarding calls to `model_name`."""
+    with _breakers_lock:
+        breaker = _breakers.get(model_name)
+        if breaker is None:
+            breaker = _breakers[model_name] = CircuitBreaker(LLM_BREAKER_FAILURE_THRESHOLD, LLM_BREAKER_RESET_SECONDS)
+        return breaker
+
+
+def _record_call(model_name: str, started: float, outcome: str) -> None:
+    seconds = time.perf_counter() - started
+    LLM_CALL_SECONDS.observe(seconds, model=model_name)
+    STAGE_SECONDS.observe(seconds, stage="llm_call")
+    LLM_CALLS.inc(model=model_name, outcome=outcome)
+
+
+async def _admit(model_name: str, breaker: CircuitBreaker) -> None:
+    """
+    Lets one call attempt through the circuit breaker and the rate limiter.
+
+    Raises:
+        CircuitOpenError: If the circuit is open.
+    """
+    try:
+        breaker.allow()
+    except CircuitOpenError:
+        LLM_CALLS.inc(model=model_name, outcome="rejected")
+        raise
+    if _rate_limiter is not None:
+        LLM_RATE_LIMIT_WAIT_SECONDS.observe(await _rate_limiter.acquire(), model=model_name)
+
+
+def _settle(model_name: str, breaker: CircuitBreaker, error: Exception = None) -> None:
+    """Reports an attempt's outcome to the breaker. Only provider-side failures count against it."""
+    if error is not None and is_retryable(error):
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    LLM_CIRCUIT_OPEN.set(1 if breaker.state == CircuitBreaker.OPEN else 0, model=model_name)
+
+
+async def _call_once(model_name: str, model, prompt: str, timeout: float):
+    """One call to the model on the LLM thread pool, under the concurrency limit."""
+    call = functools.partial(model.generate_content, prompt, request_options={"timeout": timeout})
+    async with _get_semaphore():
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(loop.run_in_executor(_executor, call), timeout)
+        except Exception as e:
+            _record_call(model_name, started, "timeout" if isinstance(e, TimeoutError) else "error")
+            raise
+    _record_call(model_name, started, "ok")
+    record_llm_tokens(model_name, prompt, response)
+    return response
+
+
+async def _call_hedged(model_name: str, model, prompt: str, timeout: float):
+    """
+    Makes one call; if it has not answered after LLM_HEDGE_AFTER_SECONDS, sends an
+    identical second one and returns whichever succeeds first. The hedge is skipped when
+    the rate limiter has no spare token, so hedging never eats into the quota of new calls.
+    """
+    primary = asyncio.ensure_future(_call_once(model_name, model, prompt, timeout))
+    pending = {primary}
+    try:
+        if LLM_HEDGE_AFTER_SECONDS <= 0:
+            return await primary
+        done, pending = await asyncio.wait(pending, timeout=LLM_HEDGE_AFTER_SECONDS)
+        if done or (_rate_limiter is not None and not _rate_limiter.try_acquire()):
+            return await primary
+
+        LLM_RETRIES.inc(model=model_name, reason="hedge")
+        pending.add(asyncio.ensure_future(_call_once(model_name, model, prompt, timeout)))
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        # The losing call's thread finishes in the background; its result is discarded
+        for task in pending:
+            task.cancel()
+
+
+async def generate_content(model_name: str, prompt: str, timeout: float = None) -> str:
+    """
+    Sends a prompt to the configured model without blocking the event loop.
+
+    Timeouts, rate limiting (429) and 5xx errors are retried up to LLM_MAX_RETRIES times
+    with exponential backoff and full jitter. Slow calls may be hedged (see
+    `_call_hedged`). Every attempt passes the process-wide rate limiter and the model's
+    circuit breaker, which rejects calls outright while the provider keeps failing.
+
+    Args:
+        model_name (str): The Gemini model to call, e.g. "gemini-2.0-flash".
+        prompt (str): The prompt text.
+        timeout (float): Seconds to wait for each attempt, defaulting to LLM_TIMEOUT_SECONDS.
+            Time spent waiting for a concurrency slot does not count against it.
+
+    Returns:
+        str: The text of the model response.
+
+    Raises:
+        TimeoutError: If the last attempt does not answer within the timeout.
+        CircuitOpenError: If the model's circuit breaker is open.
+    """
+    timeout = LLM_TIMEOUT_SECONDS if timeout is None else timeout
+    model = get_model(model_name)
+    breaker = get_breaker(model_name)
+    attempt = 0
+    while True:
+        await _admit(model_name, breaker)
+        try:
+            response = await _call_hedged(model_name, model, prompt, timeout)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception as e:
+            _settle(model_name, breaker, e)
+            if not is_retryable(e) or attempt >= LLM_MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt, LLM_BACKOFF_BASE_SECONDS, LLM_BACKOFF_MAX_SECONDS)
+            logger.warning("LLM call to %s failed (%s); retry %d in %.2fs", model_name, e, attempt + 1, delay)
+            LLM_RETRIES.inc(model=model_name, reason="error")
+            attempt += 1
+            await asyncio.sleep(delay)
+            continue
+        _settle(model_name, breaker)
+        return response.text
+
+
+class _StreamedText:
+    """The concatenated text of a streamed response, for token accounting."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+async def _stream_once(model_name: str, model, prompt: str, timeout: float):
+    """One streamed call; the concurrency slot is held until the stream ends."""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    done = object()
+    cancelled = threading.Event()
+
+    def drain():
+        try:
+            response = model.generate_content(prompt, stream=True, request_options={"timeout": timeout})
+            for chunk in response:
+                if cancelled.is_set():
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, chunk.text)
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+
+    async with _get_semaphore():
+        started = time.perf_counter()
+        future = loop.run_in_executor(_executor, drain)
+        outcome = "error"
+        received = []
+        try:
+            while True:
+                item = await asyncio.wait_for(queue.get(), timeout)
+                if item is done:
+                    outcome = "ok"
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                received.append(item)
+                yield item
+        except TimeoutError:
+            outcome = "timeout"
+            raise
+        except (GeneratorExit, asyncio.CancelledError):
+            # The consumer stopped reading, e.g. it already had enough questions
+            outcome = "cancelled"
+            raise
+        finally:
+            _record_call(model_name, started, outcome)
+            record_llm_tokens(model_name, prompt, _StreamedText("".join(received)))
+            # A running worker thread cannot be interrupted; it stops after its current chunk
+            cancelled.set()
+            future.cancel()
+
+
+async def stream_content(model_name: str, prompt: str, timeout: float = None):
+    """
+    Streams a model response chunk by chunk without blocking the event loop.
+
+    The SDK's blocking stream iterator is drained on the LLM thread pool and each chunk
+    is handed back to the loop as it arrives. Failures before the first chunk are retried
+    like in `generate_content`; once text has been yielded, a failure is raised, since
+    repeating the call would repeat that text. Streams are never hedged.
+
+    Args:
+        model_name (str): The Gemini model to call.
+        prompt (str): The prompt text.
+        timeout (float): Maximum seconds to wait for each chunk, defaulting to LLM_TIMEOUT_SECONDS.
+
+    Yields:
+        str: The text of each response chunk.
+
+    Raises:
+        TimeoutError: If no chunk arrives within the timeout.
+        CircuitOpenError: If the model's circuit breaker is open.
+    """
+    timeout = LLM_TIMEOUT_SECONDS if timeout is None else timeout
+    model = get_model(model_name)
+    breaker = get_breaker(model_name)
+    attempt = 0
+    while True:
+        await _admit(model_name, breaker)
+        yielded = False
+        try:
+            async with aclosing(_stream_once(model_name, model, prompt, timeout)) as chunks:
+                async for chunk in chunks:
+                    yielded = True
+                    yield chunk
+        except (GeneratorExit, asyncio.CancelledError):
+            breaker.release()
+            raise
+        except Exception as e:
+            _settle(model_name, breaker, e)
+            if yielded or not is_retryable(e) or attempt >= LLM_MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt, LLM_BACKOFF_BASE_SECONDS, LLM_BACKOFF_MAX_SECONDS)
+            logger.warning("LLM stream from %s failed (%s); retry %d in %.2fs", model_name, e, attempt + 1, delay)
+            LLM_RETRIES.inc(model=model_name, reason="error")
+            attempt += 1
+            await asyncio.sleep(delay)
+            continue
+        _settle(model_name, breaker)
+        return
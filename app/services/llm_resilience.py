@@ -0,0 +1,140 @@
+# backend/app/services/llm_resilience.py
+"""
+Building blocks for resilient LLM calls: error classification, exponential backoff with
+jitter, a token-bucket rate limiter and a circuit breaker. `llm_client` combines them.
+"""
+import asyncio
+import random
+import threading
+import time
+
+# HTTP status codes worth retrying: rate limited, or a transient server-side failure
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the provider while its circuit breaker is open."""
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Whether a failed call may succeed if repeated: timeouts, rate limits (429) and 5xx
+    responses. Google API errors carry the HTTP status in `code`; other providers can
+    mark their errors with a true `retryable` attribute.
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, (TimeoutError, ConnectionError)) or getattr(error, "retryable", False):
+        return True
+    return getattr(error, "code", None) in RETRYABLE_STATUS_CODES
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rng=random) -> float:
+    """
+    Seconds to wait before retry number `attempt` (0-based), with "full jitter": a random
+    delay up to min(cap, base * 2 ** attempt), so simultaneous failures do not retry in lockstep.
+    """
+    return rng.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class TokenBucket:
+    """
+    Client-side rate limiter: `rate` calls per second on average, bursts of up to `capacity`.
+
+    The bucket is shared by every event loop in the process, so it is guarded by a thread
+    lock and waits with `asyncio.sleep` rather than loop-bound primitives.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        """Takes a token if one is available, without waiting."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    async def acquire(self) -> float:
+        """Waits for a token and takes it; returns the seconds spent waiting."""
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return now - started
+                wait = (1 - self._tokens) / self.rate
+            await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Fails fast while a provider is down.
+
+    After `failure_threshold` consecutive retryable failures the circuit opens and calls
+    are rejected for `reset_seconds`. Then a single trial call is let through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> None:
+        """
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with its trial call in flight.
+        """
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            retry_in = max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError(f"LLM provider circuit is open after repeated failures; retry in {retry_in:.0f}s.")
+
+    def release(self) -> None:
+        """Ends an attempt that was cancelled before it succeeded or failed."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or (self.failure_threshold > 0 and self._failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
@@ -0,0 +1,173 @@
+# backend/app/services/llm_stub.py
+"""
+Local stand-in for a Gemini model, selected with LLM_PROVIDER=stub.
+
+`StubModel` implements the part of `GenerativeModel` the services use
+(`generate_content`, optionally streamed) and answers the quiz, vocabulary and summary
+prompts (and the combined study pack prompt) with schema-valid JSON or text built from
+the prompt itself. Answers are a pure
+function of the prompt, so repeated runs are reproducible. Latency and failures are
+simulated from LLM_STUB_* settings with a seeded random generator.
+"""
+import json
+import random
+import re
+import threading
+import time
+
+from ..config import (
+    LLM_STUB_FAILURE_RATE,
+    LLM_STUB_JITTER_SECONDS,
+    LLM_STUB_LATENCY_SECONDS,
+    LLM_STUB_SEED,
+)
+
+# Streamed responses are cut into chunks of this many characters
+STREAM_CHUNK_CHARS = 64
+
+_WORD_PATTERN = re.compile(r"[A-Za-z]{4,}")
+_SENTENCE_PATTERN = re.compile(r"[^.!?]+[.!?]")
+
+
+class StubFailureError(RuntimeError):
+    """Raised for calls the stub was configured to fail. Treated like a transient provider error."""
+
+    retryable = True
+
+
+class StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+def _section(prompt: str, marker: str) -> str:
+    """Returns the prompt text after `marker`, without the trailing prompt comments."""
+    _, _, text = prompt.partition(marker)
+    text = text.split(" # Limit", 1)[0]
+    return text.split("Do NOT repeat", 1)[0].strip()
+
+
+def _distinct_words(text: str) -> list:
+    return list(dict.fromkeys(word.lower() for word in _WORD_PATTERN.findall(text))) or ["document", "content", "topic"]
+
+
+def _quiz(prompt: str, marker: str = "Text to generate questions from:") -> list:
+    match = re.search(r"(\d+) (multiple choice|true false) questions", prompt)
+    num_questions = int(match.group(1)) if match else 5
+    question_type = match.group(2).replace(" ", "_") if match else "multiple_choice"
+    words = _distinct_words(_section(prompt, marker))
+
+    questions = []
+    for i in range(num_questions):
+        # Three different words per question keep the questions apart for de-duplication
+        terms = [words[(3 * i + k) % len(words)] for k in range(3)]
+        if question_type == "multiple_choice":
+            options = [f"{terms[0]} {suffix}" for suffix in ("first", "second", "third", "fourth")]
+            questions.append({
+                "question": f"Question {i + 1}: how do '{terms[0]}', '{terms[1]}' and '{terms[2]}' relate in the text?",
+                "options": options,
+                "answer": options[i % 4],
+                "type": "multiple_choice",
+                "explanation": f"The text connects '{terms[0]}' with '{terms[1]}' and '{terms[2]}'.",
+            })
+        else:
+            questions.append({
+                "question": f"Statement {i + 1}: the text mentions '{terms[0]}', '{terms[1]}' and '{terms[2]}'.",
+                "answer": "True" if i % 2 == 0 else "False",
+                "type": "true_false",
+                "explanation": f"The text discusses '{terms[0]}'.",
+            })
+    return questions
+
+
+def _vocabulary(prompt: str) -> list:
+    match = re.search(r"(\d+) most important", prompt)
+    num_words = int(match.group(1)) if match else 10
+    listed = re.search(r"from this list: (.*?)\.\n", prompt)
+    words = [w.strip() for w in listed.group(1).split(",") if w.strip()] if listed else _distinct_words(prompt)
+    return [
+        {"word": word, "definition": f"A term used in the text: {word}.", "part_of_speech": "noun"}
+        for word in words[:num_words]
+    ]
+
+
+def _summary(prompt: str, marker: str = None) -> str:
+    match = re.search(r"approximately (\d+) sentences", prompt)
+    num_sentences = int(match.group(1)) if match else 3
+    if marker is None:
+        marker = next((m for m in ("Text to summarize:", "Section to summarize:", "Section summaries:") if m in prompt), "")
+    sentences = [s.strip() for s in _SENTENCE_PATTERN.findall(_section(prompt, marker) if marker else prompt)]
+    if not sentences:
+        sentences = ["The document covers its topic briefly."]
+    return " ".join(sentences[:num_sentences])
+
+
+def _study_pack(prompt: str) -> dict:
+    """Answers only the sections the combined prompt asks for."""
+    pack = {}
+    if '"questions":' in prompt:
+        pack["questions"] = _quiz(prompt, "Text to study:")
+    if '"vocabulary":' in prompt:
+        pack["vocabulary"] = _vocabulary(prompt)
+    if '"summary":' in prompt:
+        pack["summary"] = _summary(prompt, "Text to study:")
+    return pack
+
+
+def respond(prompt: str) -> str:
+    """Builds the stub's answer to a prompt written by one of the services."""
+    if "Create study material" in prompt:
+        return json.dumps(_study_pack(prompt))
+    if "questions about the following text" in prompt:
+        return json.dumps(_quiz(prompt))
+    if "vocabulary words from this list" in prompt:
+        return json.dumps(_vocabulary(prompt))
+    return _summary(prompt)
+
+
+class StubModel:
+    """
+    Deterministic, offline replacement for `GenerativeModel`.
+
+    Args:
+        model_name (str): The model name the service asked for; kept for reporting only.
+        latency (float): Seconds each call takes.
+        jitter (float): Maximum random seconds added to `latency`.
+        failure_rate (float): Share of calls, between 0 and 1, that raise `StubFailureError`.
+        seed (int): Seed for the latency and failure draws.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        latency: float = LLM_STUB_LATENCY_SECONDS,
+        jitter: float = LLM_STUB_JITTER_SECONDS,
+        failure_rate: float = LLM_STUB_FAILURE_RATE,
+        seed: int = LLM_STUB_SEED,
+    ):
+        self.model_name = model_name
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _simulate_call(self, timeout: float = None) -> None:
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.failure_rate
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Stub model {self.model_name} timed out after {timeout} seconds.")
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            raise StubFailureError(f"Injected failure from stub model {self.model_name}.")
+
+    def generate_content(self, prompt: str, stream: bool = False, request_options: dict = None):
+        timeout = (request_options or {}).get("timeout")
+        self._simulate_call(timeout)
+        text = respond(prompt)
+        if not stream:
+            return StubResponse(text)
+        return (StubResponse(text[i:i + STREAM_CHUNK_CHARS]) for i in range(0, len(text), STREAM_CHUNK_CHARS))
@@ -0,0 +1,231 @@
+# backend/app/services/metrics.py
+"""
+In-process metrics in the Prometheus text exposition format, served at GET /api/metrics.
+
+A deliberately small registry (counters, gauges and histograms with labels) so the hot
+path costs a lock and a few additions. Each worker process keeps its own values; scrape
+every worker, or run a single worker, when aggregating.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+from . import prompt_budget
+
+# Histogram bucket upper bounds in seconds, from sub-millisecond parsing to slow LLM calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Prompt size bucket upper bounds in tokens
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value) -> list:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _render_sample(self, key, state) -> list:
+        counts, total, count = state
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            le = f'le="{_format_value(float(bound))}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by endpoint and status code.", ("endpoint", "method", "status"))
+HTTP_REQUEST_SECONDS = Histogram("http_request_duration_seconds", "HTTP request latency by endpoint, until the response starts.", ("endpoint", "method"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being handled, by endpoint.", ("endpoint",))
+
+STAGE_SECONDS = Histogram("pipeline_stage_duration_seconds", "Duration of each document pipeline stage.", ("stage",))
+
+LLM_CALL_SECONDS = Histogram("llm_call_duration_seconds", "LLM call latency by model, including streamed calls.", ("model",))
+LLM_CALLS = Counter("llm_calls_total", "LLM calls by model and outcome (ok, error, timeout, cancelled, rejected).", ("model", "outcome"))
+LLM_TOKENS = Counter("llm_tokens_total", "LLM tokens by model and direction (prompt, completion); estimated when the provider reports none.", ("model", "direction"))
+LLM_PROMPT_TOKENS = Histogram("llm_prompt_tokens", "Prompt size in tokens by model; estimated when the provider reports none.", ("model",), TOKEN_BUCKETS)
+LLM_RETRIES = Counter("llm_retries_total", "Additional LLM calls made to retry or complete an earlier one, by model and reason.", ("model", "reason"))
+LLM_RATE_LIMIT_WAIT_SECONDS = Histogram("llm_rate_limit_wait_seconds", "Time LLM calls waited for the client-side rate limiter.", ("model",))
+LLM_CIRCUIT_OPEN = Gauge("llm_circuit_open", "1 while the model's circuit breaker rejects calls, 0 otherwise.", ("model",))
+
+EXECUTOR_WORKERS = Gauge("executor_workers", "Workers of each executor pool (cpu processes, io threads).", ("pool",))
+EXECUTOR_IN_FLIGHT = Gauge("executor_tasks_in_flight", "Executor tasks submitted and not yet finished, running or queued, by pool.", ("pool",))
+EXECUTOR_UTILIZATION = Gauge("executor_utilization", "Share of each executor pool's workers that are busy (0-1).", ("pool",))
+EXECUTOR_TASKS = Counter("executor_tasks_total", "Executor tasks by pool and outcome (ok, error, cancelled, rejected).", ("pool", "outcome"))
+EXECUTOR_TIMEOUTS = Counter("executor_task_timeouts_total", "Executor tasks whose caller stopped waiting at the task timeout, by pool.", ("pool",))
+EXECUTOR_TASK_SECONDS = Histogram("executor_task_duration_seconds", "Executor task duration from submission to completion, including queueing, by pool.", ("pool",))
+
+_REGISTRY = [
+    HTTP_REQUESTS,
+    HTTP_REQUEST_SECONDS,
+    HTTP_IN_FLIGHT,
+    STAGE_SECONDS,
+    LLM_CALL_SECONDS,
+    LLM_CALLS,
+    LLM_TOKENS,
+    LLM_PROMPT_TOKENS,
+    LLM_RETRIES,
+    LLM_RATE_LIMIT_WAIT_SECONDS,
+    LLM_CIRCUIT_OPEN,
+    EXECUTOR_WORKERS,
+    EXECUTOR_IN_FLIGHT,
+    EXECUTOR_UTILIZATION,
+    EXECUTOR_TASKS,
+    EXECUTOR_TIMEOUTS,
+    EXECUTOR_TASK_SECONDS,
+]
+
+
+@contextmanager
+def stage(name: str):
+    """Times the enclosed block as pipeline stage `name`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage=name)
+
+
+def record_llm_tokens(model: str, prompt: str, response) -> None:
+    """
+    Counts the prompt and completion tokens of one model response, using the provider's
+    usage metadata when present and the local estimate otherwise. Reported prompt counts
+    also calibrate the model's estimate for prompt budgeting.
+    """
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None)
+    completion_tokens = getattr(usage, "candidates_token_count", None)
+    if prompt_tokens is None:
+        prompt_tokens = prompt_budget.estimate_tokens(prompt, model)
+    else:
+        prompt_budget.calibrate(model, prompt, prompt_tokens)
+    if completion_tokens is None:
+        completion_tokens = prompt_budget.estimate_tokens(getattr(response, "text", "") or "", model)
+    LLM_TOKENS.inc(prompt_tokens, model=model, direction="prompt")
+    LLM_PROMPT_TOKENS.observe(prompt_tokens, model=model)
+    LLM_TOKENS.inc(completion_tokens, model=model, direction="completion")
+
+
+def _cache_lines(cache_stats: dict) -> list:
+    lines = [
+        "# HELP cache_requests_total Result cache lookups by namespace and result.",
+        "# TYPE cache_requests_total counter",
+    ]
+    for namespace, counts in cache_stats["namespaces"].items():
+        for result, count in (("hit", counts["hits"]), ("miss", counts["misses"])):
+            lines.append(f"cache_requests_total{_format_labels(('namespace', 'result'), (namespace, result))} {count}")
+    lines += ["# HELP cache_hit_ratio Share of result cache lookups that hit, by namespace.", "# TYPE cache_hit_ratio gauge"]
+    for namespace, counts in cache_stats["namespaces"].items():
+        lookups = counts["hits"] + counts["misses"]
+        ratio = counts["hits"] / lookups if lookups else 0.0
+        lines.append(f"cache_hit_ratio{_format_labels(('namespace',), (namespace,))} {_format_value(ratio)}")
+    lines += [
+        "# HELP cache_entries Entries currently in the result cache.",
+        "# TYPE cache_entries gauge",
+        f"cache_entries {cache_stats['entries']}",
+    ]
+    return lines
+
+
+def render(cache_stats: dict = None, extra_gauges: dict = None) -> str:
+    """
+    Returns every metric in the Prometheus text format.
+
+    Args:
+        cache_stats (dict): `CacheBackend.stats()`, rendered as cache counters and hit ratios.
+        extra_gauges (dict): Name -> (help text, value) for point-in-time values such as queue depth.
+    """
+    lines = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    if cache_stats is not None:
+        lines.extend(_cache_lines(cache_stats))
+    for name, (documentation, value) in (extra_gauges or {}).items():
+        lines += [f"# HELP {name} {documentation}", f"# TYPE {name} gauge", f"{name} {_format_value(value)}"]
+    return "\n".join(lines) + "\n"
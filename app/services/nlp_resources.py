@@ -0,0 +1,109 @@
+# backend/app/services/nlp_resources.py
+"""
+NLTK data loading without network access.
+
+The server only reads NLTK data from NLTK_DATA_DIR (plus NLTK's default search path);
+it never downloads at import or startup. Populate the directory once at build time:
+
+    python -m app.services.nlp_resources --download
+"""
+import os
+import sys
+from functools import lru_cache
+
+from ..config import NLTK_DATA_DIR
+
+# NLTK package name -> resource path checked with nltk.data.find
+NLTK_RESOURCES = {
+    "stopwords": "corpora/stopwords",
+    "wordnet": "corpora/wordnet",
+    "omw-1.4": "corpora/omw-1.4",
+}
+
+# Legacy download location used by earlier Render deployments
+_LEGACY_DATA_DIR = "/opt/render/nltk_data"
+
+
+def _nltk():
+    """Imports NLTK with the local data directories on its search path."""
+    import nltk
+
+    if NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_DIR)
+    if _LEGACY_DATA_DIR not in nltk.data.path:
+        nltk.data.path.append(_LEGACY_DATA_DIR)
+    return nltk
+
+
+def missing_resources() -> list:
+    """
+    Returns the names of required NLTK resources that are not installed locally.
+    """
+    nltk = _nltk()
+    missing = []
+    for name, path in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            # Corpora may be installed zipped only
+            try:
+                nltk.data.find(f"{path}.zip")
+            except LookupError:
+                missing.append(name)
+    return missing
+
+
+@lru_cache(maxsize=1)
+def get_stop_words() -> frozenset:
+    """Returns the English stopword list, loaded on first use."""
+    from nltk.corpus import stopwords
+
+    _nltk()
+    return frozenset(stopwords.words('english'))
+
+
+@lru_cache(maxsize=1)
+def get_lemmatizer():
+    """Returns the shared WordNet lemmatizer, created on first use."""
+    from nltk.stem import WordNetLemmatizer
+
+    _nltk()
+    return WordNetLemmatizer()
+
+
+def load_nltk_resources() -> list:
+    """
+    Loads stopwords and WordNet into memory so the first request does not pay for it.
+    Never touches the network.
+
+    Returns:
+        list: The names of resources that are missing; vocabulary extraction fails until
+        they are installed.
+    """
+    missing = missing_resources()
+    if "stopwords" not in missing:
+        get_stop_words()
+    if "wordnet" not in missing:
+        # WordNet is a lazy corpus; the first lemmatize call is what actually reads it
+        get_lemmatizer().lemmatize("warmup")
+    return missing
+
+
+def download_resources(download_dir: str = NLTK_DATA_DIR) -> None:
+    """
+    Downloads every required NLTK resource into `download_dir`. Meant for build steps.
+    """
+    nltk = _nltk()
+    os.makedirs(download_dir, exist_ok=True)
+    for name in NLTK_RESOURCES:
+        nltk.download(name, download_dir=download_dir, quiet=True)
+
+
+if __name__ == "__main__":
+    if "--download" in sys.argv:
+        download_resources()
+    missing = missing_resources()
+    if missing:
+        print(f"Missing NLTK resources in {NLTK_DATA_DIR}: {', '.join(missing)}")
+        sys.exit(1)
+    print(f"All NLTK resources found ({', '.join(NLTK_RESOURCES)}).")
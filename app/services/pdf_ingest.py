@@ -0,0 +1,90 @@
+# backend/app/services/pdf_ingest.py
+import hashlib
+from dataclasses import dataclass
+
+import fitz # PyMuPDF
+
+from ..config import MAX_UPLOAD_BYTES, MAX_UPLOAD_PAGES, UPLOAD_CHUNK_SIZE
+from .metrics import stage
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured byte or page limit."""
+
+
+class InvalidPDFError(ValueError):
+    """Raised when the uploaded bytes cannot be opened as a PDF."""
+
+
+@dataclass
+class IngestedUpload:
+    filename: str
+    data: bytes
+    sha256: str
+    page_count: int
+
+
+def open_pdf(data: bytes) -> fitz.Document:
+    """
+    Opens a PDF directly from memory, without writing it to disk.
+
+    Raises:
+        InvalidPDFError: If the bytes are not a readable PDF.
+    """
+    try:
+        return fitz.open(stream=data, filetype="pdf")
+    except (fitz.FileDataError, RuntimeError, ValueError) as e:
+        raise InvalidPDFError(f"Could not open the uploaded file as a PDF: {e}") from e
+
+
+async def read_upload(file, max_bytes: int = MAX_UPLOAD_BYTES, max_pages: int = MAX_UPLOAD_PAGES) -> IngestedUpload:
+    """
+    Reads an uploaded PDF into a bounded in-memory buffer and validates its size.
+
+    The declared size is checked before reading, the buffer is checked after every chunk,
+    and the page count is read from the document structure before any text is parsed,
+    so oversized files are rejected as early as possible. The SHA-256 digest used for
+    caching is computed while the chunks stream in.
+
+    Args:
+        file (UploadFile): The uploaded file.
+        max_bytes (int): The largest accepted upload in bytes.
+        max_pages (int): The largest accepted page count.
+
+    Returns:
+        IngestedUpload: The file contents, digest and page count.
+
+    Raises:
+        UploadTooLargeError: If the file exceeds `max_bytes` or `max_pages`.
+        InvalidPDFError: If the file is not a readable PDF.
+    """
+    with stage("upload_read"):
+        return await _read_upload(file, max_bytes, max_pages)
+
+
+async def _read_upload(file, max_bytes: int, max_pages: int) -> IngestedUpload:
+    """Reads, validates and hashes the upload; see `read_upload`."""
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(f"File is larger than the {max_bytes} byte limit.")
+
+    buffer = bytearray()
+    hasher = hashlib.sha256()
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        if len(buffer) + len(chunk) > max_bytes:
+            raise UploadTooLargeError(f"File is larger than the {max_bytes} byte limit.")
+        buffer += chunk
+        hasher.update(chunk)
+
+    data = bytes(buffer)
+    doc = open_pdf(data)
+    try:
+        page_count = doc.page_count
+    finally:
+        doc.close()
+    if page_count > max_pages:
+        raise UploadTooLargeError(f"PDF has {page_count} pages; the limit is {max_pages}.")
+
+    return IngestedUpload(filename=file.filename, data=data, sha256=hasher.hexdigest(), page_count=page_count)
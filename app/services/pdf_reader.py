@@ -1,6 +1,161 @@
 # backend/app/services/pdf_reader.py
+import asyncio
+
+import fitz # PyMuPDF
 from pypdf import PdfReader
 
+from ..config import PAGE_DEDUP, PDF_PARALLEL_MIN_PAGES
+from ..utils.log import get_logger
+from ..utils.text_cleaner import iter_clean_pages, normalize_whitespace, preprocess_pages, take_chars
+from .executors import NUM_CPU_WORKERS, run_cpu
+from .metrics import stage
+
+NUM_WORKERS = NUM_CPU_WORKERS
+
+logger = get_logger(__name__)
+
+
+def _extract_page_texts(data: bytes, page_numbers) -> list:
+    """Extracts the raw text of the given pages of an in-memory PDF. Runs inside worker processes."""
+    return list(iter_page_texts(data, page_numbers=page_numbers))
+
+
+def _clean_page_list(pages: list, dedupe: bool) -> list:
+    """Preprocesses and whitespace-normalizes raw page texts, keeping one entry per page. Runs inside worker processes."""
+    return [normalize_whitespace(page) for page in preprocess_pages(pages, dedupe)]
+
+
+def _join_clean_pages(pages: list, dedupe: bool) -> str:
+    """Preprocesses raw page texts and joins the non-empty ones. Runs inside worker processes."""
+    return take_chars(iter_clean_pages(preprocess_pages(pages, dedupe)))
+
+
+def extract_clean_text(data: bytes, page_numbers=None, max_chars: int = None, dedupe: bool = PAGE_DEDUP) -> str:
+    """
+    Extracts, preprocesses and whitespace-normalizes an in-memory PDF, one page at a time.
+
+    Runs inside worker processes, or on the calling thread for synchronous callers.
+
+    Args:
+        data (bytes): The PDF file contents.
+        page_numbers: Optional zero-based page numbers to read, in order; None reads every page.
+        max_chars (int): Optional character budget; pages past it are never parsed.
+        dedupe (bool): Whether to strip repeated headers and footers and near-duplicate pages.
+
+    Returns:
+        str: The non-empty pages' cleaned text, joined with single spaces.
+    """
+    pages = preprocess_pages(iter_page_texts(data, page_numbers=page_numbers), dedupe)
+    return take_chars(iter_clean_pages(pages), max_chars)
+
+
+def _split_range(start: int, stop: int, num_chunks: int) -> list:
+    """Splits [start, stop) into at most `num_chunks` contiguous, nearly equal ranges."""
+    total = stop - start
+    num_chunks = max(1, min(num_chunks, total))
+    size, remainder = divmod(total, num_chunks)
+    ranges = []
+    chunk_start = start
+    for i in range(num_chunks):
+        chunk_stop = chunk_start + size + (1 if i < remainder else 0)
+        ranges.append((chunk_start, chunk_stop))
+        chunk_start = chunk_stop
+    return ranges
+
+
+async def extract_clean_text_in_pool(data: bytes, page_count: int, max_chars: int = None, page_numbers: list = None) -> str:
+    """
+    Like `extract_clean_text`, but on the CPU worker processes, without blocking the
+    event loop.
+
+    Documents with at least PDF_PARALLEL_MIN_PAGES pages to read are split into one page
+    range per worker, and the preprocessing stage then runs over all of their pages at
+    once. With `max_chars`, a single worker reads pages in order and stops once enough
+    text has been collected.
+
+    Timed as the `pdf_extraction` stage, and `text_cleaning` for the separate
+    preprocessing task after a parallel extraction. A single worker cleans each page as
+    it reads it, so its cleaning counts as extraction.
+
+    Args:
+        data (bytes): The PDF file contents.
+        page_count (int): The number of pages in the document.
+        max_chars (int): Optional character budget; None extracts the whole document.
+        page_numbers (list): Optional pages to read, e.g. from `sample_page_numbers`.
+
+    Returns:
+        str: The non-empty pages' normalized text, joined with single spaces.
+
+    Raises:
+        ExecutorBusyError: If the CPU workers' queue is full.
+        ExecutorTimeoutError: If extraction does not finish in time.
+    """
+    numbers = range(page_count) if page_numbers is None else page_numbers
+    if not numbers:
+        return ""
+    if max_chars is not None or NUM_WORKERS < 2 or len(numbers) < PDF_PARALLEL_MIN_PAGES:
+        with stage("pdf_extraction"):
+            return await run_cpu(extract_clean_text, data, numbers, max_chars, PAGE_DEDUP)
+    with stage("pdf_extraction"):
+        pages = await _extract_in_parallel(data, numbers)
+    with stage("text_cleaning"):
+        return await run_cpu(_join_clean_pages, pages, PAGE_DEDUP)
+
+
+async def extract_pages_in_pool(data: bytes, page_count: int) -> list:
+    """
+    Like `extract_clean_text_in_pool`, but reads every page and keeps the pages apart.
+
+    Returns:
+        list: The cleaned text of every page, in order; "" for empty pages and for pages
+        dropped as near duplicates.
+    """
+    if page_count <= 0:
+        return []
+    with stage("pdf_extraction"):
+        if NUM_WORKERS < 2 or page_count < PDF_PARALLEL_MIN_PAGES:
+            pages = await run_cpu(_extract_page_texts, data, range(page_count))
+        else:
+            pages = await _extract_in_parallel(data, range(page_count))
+    with stage("text_cleaning"):
+        return await run_cpu(_clean_page_list, pages, PAGE_DEDUP)
+
+
+async def _extract_in_parallel(data: bytes, page_numbers) -> list:
+    """Extracts the raw text of the given pages with one contiguous share per CPU worker."""
+    chunks = await asyncio.gather(*(
+        run_cpu(_extract_page_texts, data, page_numbers[chunk_start:chunk_stop])
+        for chunk_start, chunk_stop in _split_range(0, len(page_numbers), NUM_WORKERS)
+    ))
+    return [page for chunk in chunks for page in chunk]
+
+
+def iter_page_texts(data: bytes, page_range: tuple = None, page_numbers=None):
+    """
+    Lazily yields the raw text of each page of an in-memory PDF, in order.
+
+    Pages are only parsed when the consumer asks for them, so a caller that stops
+    iterating early never pays for the rest of the document.
+
+    Args:
+        data (bytes): The PDF file contents.
+        page_range (tuple): Optional (start, stop) zero-based, stop-exclusive page range.
+        page_numbers: Optional zero-based page numbers to read instead of a range.
+
+    Yields:
+        str: The text of one page.
+    """
+    doc = fitz.open(stream=data, filetype="pdf")
+    try:
+        if page_numbers is None:
+            start, stop = page_range if page_range else (0, doc.page_count)
+            page_numbers = range(max(0, start), min(doc.page_count, stop))
+        for page_number in page_numbers:
+            yield doc[page_number].get_text()
+    finally:
+        doc.close()
+
+
 def extract_text_from_pdf(pdf_path: str) -> str:
     """
     Extracts text from a PDF file.
@@ -13,10 +168,7 @@ def extract_text_from_pdf(pdf_path: str) -> str:
     """
     try:
         reader = PdfReader(pdf_path)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-        return text
+        return "".join([(page.extract_text() or "") + "\n" for page in reader.pages])
     except Exception as e:
-        print(f"Error extracting text from PDF: {e}")
-        return ""
\ No newline at end of file
+        logger.error("Error extracting text from PDF: %s", e)
+        return ""
@@ -0,0 +1,392 @@
+# backend/app/services/pipeline.py
+import asyncio
+import time
+
+from ..config import PAGE_DEDUP, PAGE_SAMPLE_MAX_PAGES
+from ..utils.text_cleaner import sample_page_numbers
+from ..utils.log import get_logger
+from . import question_gen, study_pack, text_summarizer, vocab_extractor
+from .cache import get_cache, make_key
+from .documents import DocumentNotFoundError, StoredDocument, get_document_store
+from .metrics import LLM_RETRIES, stage
+from .executors import run_cpu, run_io
+from .pdf_reader import extract_clean_text_in_pool, extract_pages_in_pool
+from .question_gen import generate_quiz_questions, stream_quiz_questions, top_up_questions
+from .study_pack import generate_study_pack
+from .text_summarizer import SUMMARY_FAILED_MESSAGE, summarize_text
+from .vocab_extractor import count_tokens, extract_vocabulary
+
+DEFAULT_NUM_WORDS = 10
+
+logger = get_logger(__name__)
+
+
+class EmptyDocumentError(ValueError):
+    """Raised when no text can be extracted from a PDF."""
+
+
+def _sampled_pages(upload, max_chars: int = None):
+    """The pages to read for a long upload's whole-document text when sampling is on, else None."""
+    if max_chars is None and 0 < PAGE_SAMPLE_MAX_PAGES < upload.page_count:
+        with stage("page_sampling"):
+            return sample_page_numbers(upload.page_count, PAGE_SAMPLE_MAX_PAGES)
+    return None
+
+
+def _text_key(upload, max_chars: int = None, sampled: bool = False) -> str:
+    params = {"dedupe": PAGE_DEDUP}
+    if sampled:
+        params["sample"] = PAGE_SAMPLE_MAX_PAGES
+    if max_chars is not None:
+        params["max_chars"] = max_chars
+    return make_key("text", upload.sha256, **params)
+
+
+async def _cached_text(upload, max_chars: int = None, page_numbers: list = None):
+    """The cached text for the request, or None. The full text also serves every prefix."""
+    cache = get_cache()
+    full_text = await cache.aget(_text_key(upload))
+    if full_text is not None:
+        return full_text[:max_chars] if max_chars is not None else full_text
+    if max_chars is None and page_numbers is None:
+        return None
+    return await cache.aget(_text_key(upload, max_chars, page_numbers is not None))
+
+
+async def load_text(upload, max_chars: int = None) -> str:
+    """
+    Returns the cleaned text of the uploaded PDF. Extraction and cleaning run on the CPU
+    worker processes, so the event loop keeps serving other requests meanwhile.
+    Extraction results are cached by content hash so all operations share one extraction.
+    A stored document already holds its cleaned text.
+
+    Pages go through the preprocessing stage (repeated headers, footers and near-duplicate
+    pages removed, with PAGE_DEDUP) and are whitespace-normalized. Without `max_chars`,
+    documents longer than PAGE_SAMPLE_MAX_PAGES pages are read from a representative
+    sample of pages. With `max_chars`, pages are extracted and cleaned only until the
+    budget is filled, unless the full text is already cached.
+
+    Raises:
+        EmptyDocumentError: If the PDF contains no extractable text.
+        ExecutorBusyError: If the CPU workers' queue is full.
+        ExecutorTimeoutError: If extraction does not finish in time.
+    """
+    if isinstance(upload, StoredDocument):
+        return upload.text[:max_chars] if max_chars is not None else upload.text
+
+    page_numbers = _sampled_pages(upload, max_chars)
+    cleaned_text = await _cached_text(upload, max_chars, page_numbers)
+    if cleaned_text is None:
+        cleaned_text = await extract_clean_text_in_pool(upload.data, upload.page_count, max_chars, page_numbers)
+        if cleaned_text:
+            await get_cache().aset(_text_key(upload, max_chars, page_numbers is not None), cleaned_text)
+
+    if not cleaned_text:
+        raise EmptyDocumentError("Could not extract text from PDF. The PDF might be image-based or empty.")
+    return cleaned_text
+
+
+async def prepare_text(upload) -> None:
+    """
+    Extracts and caches the full text of the upload on the CPU workers, so the
+    operations that follow read it from the cache.
+
+    Raises:
+        EmptyDocumentError: If the PDF contains no extractable text.
+    """
+    await load_text(upload)
+
+
+async def ingest_document(upload):
+    """
+    Adds the upload to the document store: extracts its pages on the process pool,
+    cleans them and counts its tokens once, so later operations skip all of that.
+    A PDF that is already stored is returned as it is.
+
+    Returns:
+        tuple: (StoredDocument, created), where `created` is False if it was already stored.
+
+    Raises:
+        EmptyDocumentError: If the PDF contains no extractable text.
+    """
+    store = get_document_store()
+    try:
+        return await run_io(store.get, upload.sha256), False
+    except DocumentNotFoundError:
+        pass
+
+    pages = await extract_pages_in_pool(upload.data, upload.page_count)
+    if not any(pages):
+        raise EmptyDocumentError("Could not extract text from PDF. The PDF might be image-based or empty.")
+    try:
+        with stage("tokenization"):
+            token_counts = await run_cpu(count_tokens, " ".join(page for page in pages if page))
+    except LookupError as e:
+        # Without NLTK data the counts are computed by the first vocabulary request instead
+        logger.warning("Storing %s without token counts: %s", upload.filename, e)
+        token_counts = None
+    return await run_io(store.put, upload.sha256, upload.filename, pages, token_counts), True
+
+
+def _quiz_key(upload, num_questions: int, question_type: str, coverage: bool, model: str = None) -> str:
+    return make_key("quiz", upload.sha256, num_questions=num_questions, question_type=question_type, coverage=coverage, model=model or question_gen.MODEL_NAME)
+
+
+def _vocabulary_key(upload, num_words: int, model: str = None) -> str:
+    return make_key("vocabulary", upload.sha256, num_words=num_words, model=model or vocab_extractor.MODEL_NAME)
+
+
+def _summary_key(upload, num_sentences: int, mode: str, model: str = None) -> str:
+    return make_key("summary", upload.sha256, num_sentences=num_sentences, mode=mode, model=model or text_summarizer.MODEL_NAME)
+
+
+def _operation_keys(upload, params: dict, model: str = None) -> dict:
+    """Operation -> result cache key, for the operations' own models or for `model`."""
+    return {
+        "quiz": _quiz_key(upload, params["num_questions"], params["question_type"], params["coverage"], model),
+        "vocabulary": _vocabulary_key(upload, params["num_words"], model),
+        "summary": _summary_key(upload, params["num_sentences"], params["summary_mode"], model),
+    }
+
+
+async def quiz_for(upload, num_questions: int, question_type: str, coverage: bool = False) -> list:
+    """
+    Returns quiz questions for the upload, from the cache when possible.
+    Only coverage mode reads the whole document; otherwise just the prompt window is extracted.
+    """
+    cache = get_cache()
+    quiz_key = _quiz_key(upload, num_questions, question_type, coverage)
+    questions = await cache.aget(quiz_key)
+    if questions is None:
+        cleaned_text = await load_text(upload, None if coverage else question_gen.QUIZ_TEXT_CHARS)
+        questions = await generate_quiz_questions(cleaned_text, num_questions, question_type, coverage)
+        if questions:
+            await cache.aset(quiz_key, questions)
+    return questions
+
+
+async def quiz_stream_for(upload, num_questions: int, question_type: str):
+    """
+    Yields quiz questions for the upload one at a time as they are generated.
+    Cached quizzes are replayed immediately; a complete streamed quiz is cached.
+    """
+    cache = get_cache()
+    quiz_key = _quiz_key(upload, num_questions, question_type, False)
+    questions = await cache.aget(quiz_key)
+    if questions is not None:
+        for q in questions:
+            yield q
+        return
+
+    cleaned_text = await load_text(upload, question_gen.QUIZ_TEXT_CHARS)
+    questions = []
+    async for q in stream_quiz_questions(cleaned_text, num_questions, question_type):
+        questions.append(q)
+        yield q
+    if len(questions) == num_questions:
+        await cache.aset(quiz_key, questions)
+
+
+async def vocabulary_for(upload, num_words: int = DEFAULT_NUM_WORDS) -> list:
+    """
+    Returns vocabulary for the upload, from the cache when possible.
+    Word ranking counts the whole document, so the full text is extracted; a stored
+    document brings its token counts along.
+    """
+    cache = get_cache()
+    vocab_key = _vocabulary_key(upload, num_words)
+    vocabulary = await cache.aget(vocab_key)
+    if vocabulary is None:
+        cleaned_text = await load_text(upload)
+        word_counts = None
+        if isinstance(upload, StoredDocument):
+            word_counts = upload.token_counts
+            if word_counts is None:
+                with stage("tokenization"):
+                    word_counts = await run_cpu(count_tokens, cleaned_text)
+                await run_io(get_document_store().set_token_counts, upload.id, word_counts)
+        vocabulary = await extract_vocabulary(cleaned_text, num_words, word_counts)
+        if vocabulary:
+            await cache.aset(vocab_key, vocabulary)
+    return vocabulary
+
+
+async def summary_for(upload, num_sentences: int = 3, mode: str = "truncate") -> str:
+    """
+    Returns a summary of the upload, from the cache when possible.
+    """
+    cache = get_cache()
+    summary_key = _summary_key(upload, num_sentences, mode)
+    summary = await cache.aget(summary_key)
+    if summary is None:
+        if mode == "hierarchical":
+            cleaned_text = await load_text(upload)
+        else:
+            # Read one character past the prompt window: "auto" only needs the full
+            # document when it does not fit in a single prompt.
+            cleaned_text = await load_text(upload, text_summarizer.SUMMARY_TEXT_CHARS + 1)
+            if mode == "auto" and not text_summarizer.fits_single_prompt(cleaned_text):
+                cleaned_text = await load_text(upload)
+        summary = await summarize_text(cleaned_text, num_sentences, mode)
+        if summary and summary != SUMMARY_FAILED_MESSAGE:
+            await cache.aset(summary_key, summary)
+    return summary
+
+
+def operation_coroutine(upload, operation: str, params: dict):
+    """The coroutine running one operation ("quiz", "vocabulary" or "summary") with the request's parameters."""
+    if operation == "quiz":
+        return quiz_for(upload, params["num_questions"], params["question_type"], params["coverage"])
+    if operation == "vocabulary":
+        return vocabulary_for(upload, params["num_words"])
+    return summary_for(upload, params["num_sentences"], params["summary_mode"])
+
+
+async def study_pack_for(upload, operations: list, params: dict) -> dict:
+    """
+    Runs several operations for the upload with one combined model call instead of one
+    call each; see `study_pack.generate_study_pack`.
+
+    Results already cached for an operation are reused and left out of the prompt.
+    Coverage-mode quizzes and summaries that need the hierarchical mode do not fit one
+    prompt window and run on their own, as does a single remaining operation. Sections
+    missing from the combined reply fall back to their own operation, and a short quiz
+    is topped up. Combined results are cached under the study pack model, and a request
+    reuses results cached for either the operation's own model or the study pack model.
+
+    Args:
+        upload: The ingested upload or stored document.
+        operations (list): A subset of "quiz", "vocabulary" and "summary".
+        params (dict): Operation parameters, as for background jobs.
+
+    Returns:
+        dict: "results" (operation -> result), "sources" (operation -> "cache",
+        "combined" or "individual") and "errors" (operation -> message).
+
+    Raises:
+        EmptyDocumentError: If the PDF contains no extractable text.
+    """
+    cache = get_cache()
+    keys = _operation_keys(upload, params, study_pack.MODEL_NAME)
+    own_keys = _operation_keys(upload, params)
+    results, sources, errors = {}, {}, {}
+    for operation in operations:
+        cached = await cache.aget(own_keys[operation])
+        if cached is None and keys[operation] != own_keys[operation]:
+            cached = await cache.aget(keys[operation])
+        if cached is not None:
+            results[operation] = cached
+            sources[operation] = "cache"
+    pending = [operation for operation in operations if operation not in results]
+    if not pending:
+        return {"results": results, "sources": sources, "errors": errors}
+
+    # Vocabulary ranks words over the whole document; the other sections only need the prompt window
+    window = max(study_pack.STUDY_PACK_TEXT_CHARS, text_summarizer.SUMMARY_TEXT_CHARS + 1)
+    text = await load_text(upload, None if "vocabulary" in pending else window)
+
+    combined = [
+        operation for operation in pending
+        if (operation != "quiz" or not params["coverage"])
+        and (operation != "summary" or params["summary_mode"] == "truncate"
+             or (params["summary_mode"] == "auto" and text_summarizer.fits_single_prompt(text)))
+    ]
+    word_counts = None
+    if "vocabulary" in combined:
+        try:
+            word_counts = upload.token_counts if isinstance(upload, StoredDocument) else None
+            if word_counts is None:
+                with stage("tokenization"):
+                    word_counts = await run_cpu(count_tokens, text)
+        except Exception as e:
+            # Left to the individual call, which reports the error
+            logger.warning("Leaving vocabulary out of the study pack: %s", e)
+            combined.remove("vocabulary")
+
+    if len(combined) > 1:
+        generated = await generate_study_pack(
+            text, combined, params["num_questions"], params["question_type"],
+            params["num_words"], params["num_sentences"], word_counts,
+        )
+        for operation, result in generated.items():
+            results[operation] = result
+            sources[operation] = "combined"
+            if operation != "quiz" or len(result) == params["num_questions"]:
+                await cache.aset(keys[operation], result)
+
+    stages = {}
+    for operation in pending:
+        if operation not in results:
+            if operation in combined and len(combined) > 1:
+                LLM_RETRIES.inc(model=study_pack.MODEL_NAME, reason="study_pack_fallback")
+            sources[operation] = "individual"
+            stages[operation] = operation_coroutine(upload, operation, params)
+        elif operation == "quiz" and len(results["quiz"]) < params["num_questions"]:
+            stages[operation] = top_up_questions(text, results["quiz"], params["num_questions"], params["question_type"])
+
+    async def settle(operation, coro):
+        try:
+            results[operation] = await coro
+        except Exception as e:
+            logger.error("Error in study pack operation %s: %s", operation, e)
+            # A failed top-up keeps the combined questions
+            if operation not in results:
+                errors[operation] = str(e)
+
+    await run_stages({operation: settle(operation, coro) for operation, coro in stages.items()})
+    if "quiz" in stages and sources["quiz"] == "combined" and results.get("quiz"):
+        await cache.aset(keys["quiz"], results["quiz"])
+    return {
+        "results": {operation: results[operation] for operation in operations if operation in results},
+        "sources": {operation: sources[operation] for operation in operations if operation in results},
+        "errors": errors,
+    }
+
+
+async def run_stages(stages: dict, deadline: float = None):
+    """
+    Runs independent pipeline stages concurrently under one combined deadline.
+
+    A stage that raises does not affect the others: like a stage that misses the
+    deadline, it is left out of the results and the other results are still returned.
+
+    Args:
+        stages (dict): Maps a stage name to the coroutine that computes it.
+        deadline (float): Seconds to wait for all stages together; None waits indefinitely.
+
+    Returns:
+        tuple: (results, timings, timed_out, errors) where `results` holds the value of
+        every stage that finished, `timings` its wall-clock duration in seconds,
+        `timed_out` the names of the stages that were cancelled at the deadline and
+        `errors` maps the name of every stage that raised to its exception.
+    """
+    started = time.perf_counter()
+    timings = {}
+
+    async def timed(name, coro):
+        try:
+            return await coro
+        finally:
+            timings[name] = round(time.perf_counter() - started, 3)
+
+    tasks = {name: asyncio.create_task(timed(name, coro)) for name, coro in stages.items()}
+    if not tasks:
+        return {}, timings, [], {}
+
+    done, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    results = {}
+    timed_out = []
+    errors = {}
+    for name, task in tasks.items():
+        if task not in done:
+            timed_out.append(name)
+            timings.pop(name, None)
+        elif task.exception() is not None:
+            errors[name] = task.exception()
+        else:
+            results[name] = task.result()
+    return results, timings, timed_out, errors
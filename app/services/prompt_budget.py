@@ -0,0 +1,182 @@
+# backend/app/services/prompt_budget.py
+"""
+Token-aware prompt budgeting.
+
+Document text goes into prompts by token budget instead of a fixed character slice:
+`estimate_tokens` approximates the model tokenizer locally, `fit_text` packs whole
+sentences up to a budget and `split_text` cuts long text into budget-sized chunks.
+Budgets are configured per model, optionally per prompt purpose, with
+PROMPT_TOKEN_BUDGETS, so cheap long-context models can be given more text than
+expensive ones.
+
+The estimator counts word pieces, so dense text, numbers and non-Latin scripts are not
+undercounted the way a characters-per-token rule undercounts them. It is calibrated
+against the prompt token counts the provider reports: each model keeps a running ratio
+of reported to estimated tokens, which scales later estimates.
+"""
+import math
+import re
+import threading
+
+from ..config import PROMPT_TOKEN_BUDGETS
+from ..utils.text_cleaner import iter_sentences
+
+# Runs of letters, runs of digits, or single other symbols
+_PIECE = re.compile(r"[^\W\d_]+|\d+|[^\w\s]|_")
+_CJK = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯]")
+
+# Upper bound on characters per token, for sizing the text extracted before packing
+MAX_CHARS_PER_TOKEN = 8
+
+# Weight of each new observation in the calibration ratio, and the smallest prompt
+# (in estimated tokens) worth calibrating on
+CALIBRATION_WEIGHT = 0.2
+MIN_CALIBRATION_TOKENS = 50
+
+_ratios = {}
+_ratios_lock = threading.Lock()
+
+
+def _parse_budgets(spec: str) -> dict:
+    """Parses "gemini-2.0-flash=4000,quiz:gemini-1.5-pro=1500" into a dict."""
+    budgets = {}
+    for entry in spec.split(","):
+        name, separator, value = entry.partition("=")
+        if separator and name.strip() and value.strip().isdigit():
+            budgets[name.strip()] = int(value)
+    return budgets
+
+
+_budgets = _parse_budgets(PROMPT_TOKEN_BUDGETS)
+
+
+def token_budget(purpose: str, model: str, default: int) -> int:
+    """
+    Returns the document-text token budget for a prompt.
+
+    Args:
+        purpose (str): The prompt's purpose, e.g. "quiz", "summary" or "vocabulary".
+        model (str): The model the prompt is sent to.
+        default (int): The budget when PROMPT_TOKEN_BUDGETS names neither.
+
+    Returns:
+        int: The "purpose:model" budget if configured, else the model's, else `default`.
+    """
+    return _budgets.get(f"{purpose}:{model}", _budgets.get(model, default))
+
+
+def window_chars(max_tokens: int) -> int:
+    """The most characters `max_tokens` tokens can hold; extract this much text before packing."""
+    return max_tokens * MAX_CHARS_PER_TOKEN
+
+
+def _piece_tokens(piece: str) -> int:
+    if piece.isascii():
+        if piece.isdigit():
+            return (len(piece) + 2) // 3
+        # Common words are one token; long words split into a few subword pieces
+        return 1 + len(piece) // 8
+    cjk = len(_CJK.findall(piece))
+    return cjk + math.ceil((len(piece) - cjk) / 3)
+
+
+def _raw_tokens(text: str) -> int:
+    return sum(_piece_tokens(piece) for piece in _PIECE.findall(text))
+
+
+def _ratio(model: str) -> float:
+    return _ratios.get(model, 1.0) if model else 1.0
+
+
+def estimate_tokens(text: str, model: str = None) -> int:
+    """
+    Estimates the tokens `text` takes, calibrated for `model` when it has reported counts.
+    """
+    if not text:
+        return 0
+    return math.ceil(_raw_tokens(text) * _ratio(model))
+
+
+def calibrate(model: str, prompt: str, actual_tokens: int) -> None:
+    """
+    Updates `model`'s calibration ratio from the prompt token count the provider reported.
+    """
+    estimated = _raw_tokens(prompt)
+    if estimated < MIN_CALIBRATION_TOKENS or actual_tokens <= 0:
+        return
+    ratio = min(2.0, max(0.5, actual_tokens / estimated))
+    with _ratios_lock:
+        previous = _ratios.get(model)
+        _ratios[model] = ratio if previous is None else previous + CALIBRATION_WEIGHT * (ratio - previous)
+
+
+def _take_words(text: str, max_tokens: int, ratio: float) -> str:
+    """The leading words of `text` that fit in `max_tokens`."""
+    words = []
+    used = 0
+    for word in text.split(" "):
+        tokens = math.ceil(_raw_tokens(word) * ratio)
+        if used + tokens > max_tokens:
+            break
+        words.append(word)
+        used += tokens
+    return " ".join(words)
+
+
+def fit_text(text: str, max_tokens: int, model: str = None) -> str:
+    """
+    Returns the longest run of whole leading sentences of `text` that fits in `max_tokens`.
+
+    A sentence is only cut (at a word boundary) when whole sentences would fill less than
+    half of the budget, e.g. slides or tables without sentence punctuation.
+
+    Args:
+        text (str): Whitespace-normalized text.
+        max_tokens (int): The token budget.
+        model (str): The model the text is for, to use its calibration.
+
+    Returns:
+        str: The packed text.
+    """
+    ratio = _ratio(model)
+    parts = []
+    used = 0
+    for sentence in iter_sentences(text):
+        tokens = math.ceil(_raw_tokens(sentence) * ratio)
+        if used + tokens > max_tokens:
+            if used < max_tokens // 2:
+                parts.append(_take_words(sentence, max_tokens - used, ratio))
+            break
+        parts.append(sentence)
+        used += tokens
+    return " ".join(part for part in parts if part)
+
+
+def split_text(text: str, max_tokens: int, model: str = None) -> list:
+    """
+    Packs whole sentences into chunks of at most `max_tokens` tokens each.
+    A sentence longer than the budget is split at word boundaries.
+
+    Returns:
+        list: The chunks, in document order.
+    """
+    ratio = _ratio(model)
+    chunks = []
+    current = []
+    used = 0
+    for sentence in iter_sentences(text):
+        tokens = math.ceil(_raw_tokens(sentence) * ratio)
+        if current and used + tokens > max_tokens:
+            chunks.append(" ".join(current))
+            current, used = [], 0
+        while tokens > max_tokens:
+            head = _take_words(sentence, max_tokens, ratio) or sentence.split(" ", 1)[0]
+            chunks.append(head)
+            sentence = sentence[len(head):].lstrip()
+            tokens = math.ceil(_raw_tokens(sentence) * ratio)
+        if sentence:
+            current.append(sentence)
+            used += tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
@@ -1,29 +1,36 @@
 # backend/app/services/question_gen.py
 
-from google.generativeai import GenerativeModel, configure
-import os
-import json
+import asyncio
+import math
 import re
-from dotenv import load_dotenv
 
-load_dotenv()
+from ..config import QUIZ_MAX_SEGMENTS
+from ..utils.json_stream import JSONArrayStreamParser, extract_json_objects
+from ..utils.log import get_logger
+from .llm_client import generate_content, stream_content
+from .metrics import LLM_RETRIES, stage
+from .prompt_budget import estimate_tokens, fit_text, split_text, token_budget, window_chars
+from .schemas import QUESTION_SCHEMAS, validate_items
 
-configure(api_key=os.getenv("GEMINI_API_KEY"))
 # Ensure you are using the correct, available model here
 # (e.g., 'gemini-1.5-pro' or 'gemini-1.0-pro')
-model = GenerativeModel('gemini-1.5-pro') # Using gemini-1.5-pro as an example
+MODEL_NAME = 'gemini-1.5-pro' # Using gemini-1.5-pro as an example
 
-def generate_quiz_questions(text: str, num_questions: int, question_type: str) -> list:
-    if not text:
-        return []
+# Tokens of document text included in the prompt, and the characters of text to extract
+# so that budget can be filled
+QUIZ_PROMPT_TOKENS = token_budget("quiz", MODEL_NAME, 2000)
+QUIZ_TEXT_CHARS = window_chars(QUIZ_PROMPT_TOKENS)
 
-    # Clean text to remove excessive whitespace which can confuse LLMs
-    cleaned_text = " ".join(text.split())
+QUESTION_TYPES = ("multiple_choice", "true_false")
 
-    # Adjust num_questions for the prompt to allow for some filtering
-    # Requesting slightly more questions to ensure we get enough valid ones after parsing/filtering.
-    prompt_num_questions = num_questions + 2 # Request 2 more than needed
+logger = get_logger(__name__)
 
+# Word-overlap (Jaccard) ratio above which two questions count as duplicates
+DUPLICATE_SIMILARITY = 0.8
+
+
+def _build_prompt(cleaned_text: str, prompt_num_questions: int, question_type: str, avoid_questions: list = None) -> str:
+    prompt_text = fit_text(cleaned_text, QUIZ_PROMPT_TOKENS, MODEL_NAME)
     if question_type == "multiple_choice":
         prompt = f"""
         Generate {prompt_num_questions} {question_type.replace('_', ' ')} questions about the following text.
@@ -50,9 +57,9 @@ def generate_quiz_questions(text: str, num_questions: int, question_type: str) -
         ]
 
         Text to generate questions from:
-        {cleaned_text[:8000]} # Limit text length for prompt to manage token count
+        {prompt_text}
         """
-    elif question_type == "true_false":
+    else:
         prompt = f"""
         Generate {prompt_num_questions} {question_type.replace('_', ' ')} questions about the following text.
         For each question, the answer should be either "True" or "False".
@@ -76,44 +83,221 @@ def generate_quiz_questions(text: str, num_questions: int, question_type: str) -
         ]
 
         Text to generate questions from:
-        {cleaned_text[:8000]} # Limit text length for prompt
+        {prompt_text}
         """
-    else:
-        raise ValueError("Unsupported question type. Only 'multiple_choice' and 'true_false' are supported.")
 
+    if avoid_questions:
+        avoid_list = "\n".join(f"- {q}" for q in avoid_questions)
+        prompt += f"""
+        Do NOT repeat or rephrase any of these existing questions:
+        {avoid_list}
+        """
+    return prompt
+
+
+def _validate_questions(questions_json, question_type: str) -> list:
+    """
+    Keeps only well-formed questions of the requested type.
+    Every question needs 'question', 'answer', 'type' and 'explanation'; multiple choice
+    questions also need exactly 4 options.
+    """
+    if not isinstance(questions_json, list):
+        logger.warning("Model response was not a list for questions: %.200s...", questions_json)
+        return []
+    return validate_items(questions_json, QUESTION_SCHEMAS[question_type])
+
+
+async def _request_questions(cleaned_text: str, num_questions: int, question_type: str, avoid_questions: list = None):
+    """
+    Asks the model for `num_questions` questions about `cleaned_text`.
+
+    Returns:
+        list | None: The valid questions, or None if the call failed or the reply held no JSON objects.
+    """
+    with stage("prompt_build"):
+        prompt = _build_prompt(cleaned_text, num_questions, question_type, avoid_questions)
     try:
-        response = model.generate_content(prompt)
-        # Assuming response.text might include markdown code block delimiters
-        json_string = response.text.strip()
-        if json_string.startswith("```json"):
-            json_string = json_string[len("```json"):].strip()
-        if json_string.endswith("```"):
-            json_string = json_string[:-len("```")].strip()
-
-        questions_json = json.loads(json_string)
-
-        if not isinstance(questions_json, list):
-            print(f"Warning: Gemini response was not a list for questions: {json_string[:200]}...")
-            return []
-
-        # Filter out questions that don't match the requested type or are malformed
-        # Ensure 'explanation' field is present during validation
-        filtered_questions = []
-        for q in questions_json:
-            if isinstance(q, dict) and q.get('question') and q.get('answer') and q.get('type') == question_type and q.get('explanation') is not None:
-                if question_type == 'multiple_choice':
-                    if isinstance(q.get('options'), list) and len(q['options']) == 4:
-                        filtered_questions.append(q)
-                else: # For true_false
-                    filtered_questions.append(q)
-            else:
-                print(f"Skipping malformed or mismatched question: {q}")
-        
-        # Return only up to the requested number of questions
-        return filtered_questions[:num_questions]
+        response_text = await generate_content(MODEL_NAME, prompt)
+        with stage("response_parsing"):
+            # Salvage every well-formed object, even if other parts of the reply are broken
+            items = extract_json_objects(response_text)
+            if not items:
+                logger.warning("No JSON objects found in quiz response: %.200s...", response_text)
+                return None
+            return _validate_questions(items, question_type)
 
     except Exception as e:
-        print(f"Error generating quiz questions: {e}")
-        if 'response' in locals() and hasattr(response, 'text'):
-            print(f"Raw Gemini response text (if available): {response.text}")
-        return []
\ No newline at end of file
+        logger.error("Error generating quiz questions: %s", e)
+        if 'response_text' in locals():
+            logger.debug("Raw model response text: %s", response_text)
+        return None
+
+
+def _question_words(question: dict) -> frozenset:
+    return frozenset(re.findall(r"[a-z0-9]+", question["question"].lower()))
+
+
+def _deduplicate(questions: list) -> list:
+    """
+    Drops questions whose normalized text matches, or mostly overlaps with, an earlier one.
+    """
+    unique = []
+    seen_words = []
+    for q in questions:
+        words = _question_words(q)
+        if not words:
+            continue
+        if any(len(words & other) / len(words | other) >= DUPLICATE_SIMILARITY for other in seen_words):
+            continue
+        unique.append(q)
+        seen_words.append(words)
+    return unique
+
+
+def _segment_text(cleaned_text: str, num_questions: int, coverage: bool) -> list:
+    """
+    Splits the document into the segments questions are drawn from. Without `coverage`,
+    or when the text fits in one prompt's token budget, the whole text is a single segment.
+    """
+    if not coverage:
+        return [cleaned_text]
+    total_tokens = estimate_tokens(cleaned_text, MODEL_NAME)
+    if total_tokens <= QUIZ_PROMPT_TOKENS:
+        return [cleaned_text]
+    num_segments = max(1, min(num_questions, math.ceil(total_tokens / QUIZ_PROMPT_TOKENS), QUIZ_MAX_SEGMENTS))
+    # Sentence-aligned pieces a fraction of a segment long are grouped by their position
+    # in the text, so there are never more than `num_segments` and the last one ends
+    # where the document does.
+    pieces = split_text(cleaned_text, max(1, total_tokens // (num_segments * 4)), MODEL_NAME)
+    piece_tokens = [estimate_tokens(piece, MODEL_NAME) for piece in pieces]
+    total_piece_tokens = max(1, sum(piece_tokens))
+    groups = [[] for _ in range(num_segments)]
+    done = 0
+    for piece, tokens in zip(pieces, piece_tokens):
+        index = min(num_segments - 1, (done + tokens // 2) * num_segments // total_piece_tokens)
+        groups[index].append(piece)
+        done += tokens
+    return [" ".join(group) for group in groups if group]
+
+
+async def generate_quiz_questions(text: str, num_questions: int, question_type: str, coverage: bool = False) -> list:
+    """
+    Generates quiz questions about the given text using Gemini API.
+
+    With `coverage`, long documents are split into segments, the questions are spread
+    evenly over them and the per-segment prompts run concurrently, so questions come from
+    the whole document rather than its opening pages. Results are merged and
+    de-duplicated. If validation leaves fewer than `num_questions`, one targeted top-up
+    call asks for the missing number.
+
+    Args:
+        text (str): The document text.
+        num_questions (int): The number of questions wanted.
+        question_type (str): "multiple_choice" or "true_false".
+        coverage (bool): Whether to draw questions from the whole document.
+
+    Returns:
+        list: Up to `num_questions` validated question dictionaries.
+    """
+    if not text:
+        return []
+
+    if question_type not in QUESTION_TYPES:
+        raise ValueError("Unsupported question type. Only 'multiple_choice' and 'true_false' are supported.")
+
+    # Clean text to remove excessive whitespace which can confuse LLMs
+    cleaned_text = " ".join(text.split())
+
+    segments = _segment_text(cleaned_text, num_questions, coverage)
+    base, remainder = divmod(num_questions, len(segments))
+    quotas = [base + (1 if i < remainder else 0) for i in range(len(segments))]
+    planned = [(segment, quota) for segment, quota in zip(segments, quotas) if quota > 0]
+
+    results = await asyncio.gather(*(_request_questions(segment, quota, question_type) for segment, quota in planned))
+    questions = _deduplicate([q for result in results if result for q in result])
+
+    # Top up only when some response parsed but validation or de-duplication dropped questions
+    missing = num_questions - len(questions)
+    if missing > 0 and any(result is not None for result in results):
+        shortfalls = [quota - len(result or []) for (_, quota), result in zip(planned, results)]
+        top_up_segment = planned[shortfalls.index(max(shortfalls))][0]
+        LLM_RETRIES.inc(model=MODEL_NAME, reason="quiz_topup")
+        extra = await _request_questions(top_up_segment, missing, question_type, [q["question"] for q in questions])
+        if extra:
+            questions = _deduplicate(questions + extra)
+
+    # Return only up to the requested number of questions
+    return questions[:num_questions]
+
+
+async def stream_quiz_questions(text: str, num_questions: int, question_type: str):
+    """
+    Generates quiz questions with a streamed Gemini response, yielding each question as
+    soon as it has been fully received and has passed validation.
+
+    If the stream ends with fewer than `num_questions` valid questions, one top-up call
+    asks for the missing number, as in `generate_quiz_questions`.
+
+    Args:
+        text (str): The document text.
+        num_questions (int): The number of questions wanted.
+        question_type (str): "multiple_choice" or "true_false".
+
+    Yields:
+        dict: One validated question at a time.
+
+    Raises:
+        Exception: Whatever the model call raised, if the stream fails; no top-up is
+            attempted then.
+    """
+    if not text:
+        return
+
+    if question_type not in QUESTION_TYPES:
+        raise ValueError("Unsupported question type. Only 'multiple_choice' and 'true_false' are supported.")
+
+    cleaned_text = " ".join(text.split())
+    with stage("prompt_build"):
+        prompt = _build_prompt(cleaned_text, num_questions, question_type)
+    parser = JSONArrayStreamParser()
+    emitted = []
+
+    try:
+        async for chunk in stream_content(MODEL_NAME, prompt):
+            with stage("response_parsing"):
+                items = parser.feed(chunk)
+            for item in items:
+                for q in _validate_questions([item], question_type):
+                    if len(_deduplicate(emitted + [q])) > len(emitted):
+                        emitted.append(q)
+                        yield q
+                if len(emitted) >= num_questions:
+                    return
+    except Exception as e:
+        # The caller reports the failure after the questions already yielded
+        logger.error("Error streaming quiz questions after %d questions: %s", len(emitted), e)
+        raise
+
+    missing = num_questions - len(emitted)
+    if missing > 0:
+        LLM_RETRIES.inc(model=MODEL_NAME, reason="quiz_topup")
+        extra = await _request_questions(cleaned_text, missing, question_type, [q["question"] for q in emitted])
+        for q in _deduplicate(emitted + (extra or []))[len(emitted):num_questions]:
+            yield q
+
+
+async def top_up_questions(text: str, questions: list, num_questions: int, question_type: str) -> list:
+    """
+    Completes `questions` with one call asking for the missing number of questions,
+    telling the model to avoid the ones already present.
+
+    Returns:
+        list: `questions` followed by the new, de-duplicated ones, at most `num_questions`.
+    """
+    missing = num_questions - len(questions)
+    if missing <= 0:
+        return questions[:num_questions]
+    cleaned_text = " ".join(text.split())
+    LLM_RETRIES.inc(model=MODEL_NAME, reason="quiz_topup")
+    extra = await _request_questions(cleaned_text, missing, question_type, [q["question"] for q in questions])
+    return _deduplicate(questions + (extra or []))[:num_questions]
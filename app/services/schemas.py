@@ -0,0 +1,66 @@
+# backend/app/services/schemas.py
+"""
+Typed schemas for the items the model returns. Items are validated one by one, so a
+malformed entry is dropped without discarding the well-formed ones around it.
+"""
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, Field, ValidationError
+
+from ..utils.log import get_logger
+
+logger = get_logger(__name__)
+
+NonEmptyStr = Annotated[str, Field(min_length=1)]
+
+
+class _Item(BaseModel):
+    # Whitespace-only strings count as empty; unknown keys are dropped
+    model_config = {"str_strip_whitespace": True, "extra": "ignore"}
+
+
+class MultipleChoiceQuestion(_Item):
+    question: NonEmptyStr
+    options: list[str] = Field(min_length=4, max_length=4)
+    answer: NonEmptyStr
+    type: Literal["multiple_choice"]
+    explanation: str
+
+
+class TrueFalseQuestion(_Item):
+    question: NonEmptyStr
+    answer: NonEmptyStr
+    type: Literal["true_false"]
+    explanation: str
+
+
+class VocabularyItem(_Item):
+    word: NonEmptyStr
+    definition: NonEmptyStr
+    part_of_speech: NonEmptyStr
+
+
+QUESTION_SCHEMAS = {
+    "multiple_choice": MultipleChoiceQuestion,
+    "true_false": TrueFalseQuestion,
+}
+
+
+def validate_items(items: list, schema: type) -> list:
+    """
+    Validates each item against `schema` and keeps the valid ones.
+
+    Args:
+        items (list): Decoded JSON values, usually from `extract_json_objects`.
+        schema (type): A pydantic model class from this module.
+
+    Returns:
+        list: The valid items as plain dictionaries, in order.
+    """
+    valid = []
+    for item in items:
+        try:
+            valid.append(schema.model_validate(item).model_dump())
+        except ValidationError as e:
+            logger.debug("Skipping item that does not match %s: %s (%s)", schema.__name__, item, e.errors()[0]["msg"])
+    return valid
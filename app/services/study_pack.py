@@ -0,0 +1,177 @@
+# backend/app/services/study_pack.py
+"""
+Combined study pack: quiz questions, vocabulary and a summary from a single model call.
+
+The prompt carries one copy of the document text and asks for every requested section
+in one JSON object, instead of re-sending overlapping text in three requests. Each
+section is salvaged and validated on its own with the rules of its service, so a broken
+section does not cost the others; the pipeline falls back to individual calls only for
+the sections that are missing.
+"""
+import json
+import re
+
+from ..config import STUDY_PACK_MODEL
+from ..utils.json_stream import extract_json_objects
+from ..utils.log import get_logger
+from .executors import run_cpu
+from .llm_client import generate_content
+from .metrics import stage
+from .prompt_budget import fit_text, token_budget, window_chars
+from .question_gen import QUESTION_TYPES, _deduplicate
+from .schemas import QUESTION_SCHEMAS, VocabularyItem, validate_items
+from .vocab_extractor import count_tokens, rank_candidates
+
+MODEL_NAME = STUDY_PACK_MODEL
+
+STUDY_PACK_SECTIONS = ("quiz", "vocabulary", "summary")
+
+# Tokens of document text included in the prompt (the largest budget of the three
+# services), and the characters of text to extract so that budget can be filled
+STUDY_PACK_PROMPT_TOKENS = token_budget("study_pack", MODEL_NAME, 2000)
+STUDY_PACK_TEXT_CHARS = window_chars(STUDY_PACK_PROMPT_TOKENS)
+
+logger = get_logger(__name__)
+
+# Reply key of each section
+_REPLY_KEYS = {"quiz": "questions", "vocabulary": "vocabulary", "summary": "summary"}
+
+_SECTION_KEY = re.compile(r'"(questions|vocabulary|summary)"\s*:')
+_JSON_STRING = re.compile(r'\s*"((?:[^"\\]|\\.)*)"', re.DOTALL)
+
+
+def _build_prompt(text: str, sections: list, num_questions: int, question_type: str, num_words: int, candidates: list, num_sentences: int) -> str:
+    parts = []
+    if "quiz" in sections:
+        if question_type == "multiple_choice":
+            fields = "'question' (string), 'options' (an array of 4 strings), 'answer' (the correct option string), 'type' (always 'multiple_choice'), and 'explanation' (a string)"
+        else:
+            fields = "'question' (string), 'answer' (\"True\" or \"False\" string), 'type' (always 'true_false'), and 'explanation' (a string)"
+        parts.append(
+            f'- "questions": an array of {num_questions} {question_type.replace("_", " ")} questions about the text. '
+            f"Each object MUST have {fields}. The explanation concisely says why the answer is correct."
+        )
+    if "vocabulary" in sections:
+        parts.append(
+            f'- "vocabulary": an array with the {num_words} most important and relevant vocabulary words from this list: {", ".join(candidates)}.\n'
+            "          Each object MUST have 'word', 'definition' (a concise definition) and 'part_of_speech' (all strings)."
+        )
+    if "summary" in sections:
+        parts.append(
+            f'- "summary": a concise summary of the text in approximately {num_sentences} sentences, as a single string. '
+            "Focus on the main points and key information."
+        )
+    section_list = "\n        ".join(parts)
+    return f"""
+        Create study material for the following text.
+        The output MUST be a single JSON object with exactly these keys:
+        {section_list}
+
+        Text to study:
+        {fit_text(text, STUDY_PACK_PROMPT_TOKENS, MODEL_NAME)}
+        """
+
+
+def parse_study_pack(response_text: str) -> dict:
+    """
+    Splits a combined reply into its raw sections, each salvaged on its own: a broken
+    question does not lose the vocabulary or the summary.
+
+    Returns:
+        dict: Reply key ("questions", "vocabulary", "summary") -> the decoded objects of
+        that array, or the summary string, for every section found.
+    """
+    sections = {}
+    matches = list(_SECTION_KEY.finditer(response_text))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(response_text)
+        body = response_text[match.end():end]
+        name = match.group(1)
+        if name in sections:
+            continue
+        if name == "summary":
+            string = _JSON_STRING.match(body)
+            if string:
+                try:
+                    sections[name] = json.loads(f'"{string.group(1)}"', strict=False)
+                except json.JSONDecodeError:
+                    logger.debug("Could not decode the study pack summary: %.200s", body)
+        else:
+            sections[name] = extract_json_objects(body)
+    return sections
+
+
+async def generate_study_pack(
+    text: str,
+    sections: list,
+    num_questions: int = 5,
+    question_type: str = "multiple_choice",
+    num_words: int = 10,
+    num_sentences: int = 3,
+    word_counts=None,
+) -> dict:
+    """
+    Generates several sections with one model call and keeps those that pass validation.
+
+    Args:
+        text (str): The document text. Only the leading sentences that fit in
+            STUDY_PACK_PROMPT_TOKENS are sent; vocabulary candidates are ranked over the
+            whole text.
+        sections (list): The sections wanted, a subset of STUDY_PACK_SECTIONS.
+        num_questions (int): The number of quiz questions wanted.
+        question_type (str): "multiple_choice" or "true_false".
+        num_words (int): The number of vocabulary words wanted.
+        num_sentences (int): The approximate summary length in sentences.
+        word_counts (Counter): Lemma frequencies from `count_tokens`, if already known.
+
+    Returns:
+        dict: Section -> validated result: "quiz" a list of questions (possibly fewer
+        than asked), "vocabulary" a list of words, "summary" a string. Sections that are
+        missing or invalid, or all of them if the call fails, are left out.
+    """
+    if not text or not sections:
+        return {}
+    if "quiz" in sections and question_type not in QUESTION_TYPES:
+        raise ValueError("Unsupported question type. Only 'multiple_choice' and 'true_false' are supported.")
+
+    cleaned_text = " ".join(text.split())
+    candidates = []
+    if "vocabulary" in sections:
+        if word_counts is None:
+            with stage("tokenization"):
+                word_counts = await run_cpu(count_tokens, cleaned_text)
+        candidates = rank_candidates(word_counts, num_words) if word_counts else []
+        if not candidates:
+            sections = [section for section in sections if section != "vocabulary"]
+            if not sections:
+                return {}
+
+    with stage("prompt_build"):
+        prompt = _build_prompt(cleaned_text, sections, num_questions, question_type, num_words, candidates, num_sentences)
+    try:
+        response_text = await generate_content(MODEL_NAME, prompt)
+    except Exception as e:
+        logger.error("Error generating study pack: %s", e)
+        return {}
+
+    with stage("response_parsing"):
+        raw = parse_study_pack(response_text)
+        pack = {}
+        if "quiz" in sections:
+            questions = _deduplicate(validate_items(raw.get("questions", []), QUESTION_SCHEMAS[question_type]))
+            if questions:
+                pack["quiz"] = questions[:num_questions]
+        if "vocabulary" in sections:
+            vocabulary = validate_items(raw.get("vocabulary", []), VocabularyItem)
+            if vocabulary:
+                pack["vocabulary"] = vocabulary[:num_words]
+        if "summary" in sections:
+            summary = raw.get("summary")
+            if isinstance(summary, str) and summary.strip():
+                pack["summary"] = summary.strip()
+
+    missing = [section for section in sections if section not in pack]
+    if missing:
+        logger.warning("Study pack reply lacked valid sections: %s", ", ".join(missing))
+        logger.debug("Raw study pack reply: %.500s", response_text)
+    return pack
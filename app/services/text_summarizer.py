@@ -1,30 +1,128 @@
 # backend/app/services/text_summarizer.py
-from google.generativeai import GenerativeModel, configure
-import os
-from dotenv import load_dotenv
+import asyncio
 
-load_dotenv()
+from ..config import SUMMARY_CHUNK_TOKENS, SUMMARY_MAX_CONCURRENCY
+from ..utils.log import get_logger
+from .cache import content_hash, get_cache, make_key
+from .llm_client import generate_content
+from .prompt_budget import estimate_tokens, fit_text, split_text, token_budget, window_chars
 
-configure(api_key=os.getenv("GEMINI_API_KEY"))
-model = GenerativeModel('gemini-2.0-flash')
+MODEL_NAME = 'gemini-2.0-flash'
 
-def summarize_text(text: str, num_sentences: int = 3) -> str:
+logger = get_logger(__name__)
+
+SUMMARY_FAILED_MESSAGE = "Failed to generate summary."
+
+# Tokens of document text included in a single-call prompt, and the characters of text
+# to extract so that budget can be filled
+SUMMARY_PROMPT_TOKENS = token_budget("summary", MODEL_NAME, 1000)
+SUMMARY_TEXT_CHARS = window_chars(SUMMARY_PROMPT_TOKENS)
+
+# "truncate" (the default) summarizes only the leading sentences that fit in
+# SUMMARY_PROMPT_TOKENS with a single call, "hierarchical" summarizes the whole document
+# map-reduce style with several calls, "auto" picks by the document's estimated token count.
+SUMMARY_MODES = ("auto", "truncate", "hierarchical")
+
+# Upper bound on reduce rounds, in case partial summaries stop shrinking
+MAX_REDUCE_ROUNDS = 3
+
+
+async def _summarize_prompt(prompt: str) -> str:
+    try:
+        response_text = await generate_content(MODEL_NAME, prompt)
+        return response_text.strip()
+    except Exception as e:
+        logger.error("Error summarizing text: %s", e)
+        # Log the raw response text for debugging
+        if 'response_text' in locals():
+            logger.debug("Raw model response text: %s", response_text)
+        return SUMMARY_FAILED_MESSAGE
+
+
+async def _summarize_chunk(chunk: str, semaphore: asyncio.Semaphore) -> str:
+    """
+    Summarizes one chunk of a long document. Results are cached by chunk hash, so an
+    edited document only re-summarizes the chunks that changed.
+    """
+    cache = get_cache()
+    chunk_key = make_key("summary-chunk", content_hash(chunk.encode("utf-8")), model=MODEL_NAME)
+    cached = await cache.aget(chunk_key)
+    if cached is not None:
+        return cached
+
+    prompt = f"""
+    Summarize the following section of a longer document in a few sentences.
+    Keep every main point, key term and fact that a reader of the full document would need.
+
+    Section to summarize:
+    {chunk}
+    """
+    async with semaphore:
+        summary = await _summarize_prompt(prompt)
+    if summary and summary != SUMMARY_FAILED_MESSAGE:
+        await cache.aset(chunk_key, summary)
+    return summary
+
+
+async def _summarize_hierarchical(text: str, num_sentences: int) -> str:
+    """
+    Map-reduce summarization: chunk the text, summarize the chunks concurrently, then
+    summarize the joined partial summaries into the final `num_sentences` summary.
+    """
+    semaphore = asyncio.Semaphore(SUMMARY_MAX_CONCURRENCY)
+
+    partial_text = text
+    for _ in range(MAX_REDUCE_ROUNDS):
+        if estimate_tokens(partial_text, MODEL_NAME) <= SUMMARY_CHUNK_TOKENS:
+            break
+        chunks = split_text(partial_text, SUMMARY_CHUNK_TOKENS, MODEL_NAME)
+        partials = await asyncio.gather(*(_summarize_chunk(chunk, semaphore) for chunk in chunks))
+        partials = [p for p in partials if p and p != SUMMARY_FAILED_MESSAGE]
+        if not partials:
+            return SUMMARY_FAILED_MESSAGE
+        partial_text = "\n\n".join(partials)
+
+    prompt = f"""
+    The following are summaries of consecutive sections of one document.
+    Combine them into a single concise summary of the whole document in approximately {num_sentences} sentences.
+    Focus on the main points and key information.
+
+    Section summaries:
+    {fit_text(partial_text, SUMMARY_CHUNK_TOKENS, MODEL_NAME)}
+    """
+    return await _summarize_prompt(prompt)
+
+
+def fits_single_prompt(text: str) -> bool:
+    """Whether "auto" mode summarizes `text` with a single call rather than hierarchically."""
+    return len(text) <= SUMMARY_TEXT_CHARS and estimate_tokens(text, MODEL_NAME) <= SUMMARY_PROMPT_TOKENS
+
+
+async def summarize_text(text: str, num_sentences: int = 3, mode: str = "truncate") -> str:
     """
     Summarizes the given text into a specified number of sentences using Gemini API.
 
     Args:
         text (str): The text content to summarize.
         num_sentences (int): The desired number of sentences for the summary.
+        mode (str): One of SUMMARY_MODES. "truncate" always uses a single call; "auto"
+            does too when the text fits the prompt window and summarizes hierarchically
+            otherwise.
 
     Returns:
         str: The generated summary.
     """
+    if mode not in SUMMARY_MODES:
+        raise ValueError(f"Unsupported summary mode. Supported modes: {', '.join(SUMMARY_MODES)}.")
+
     if not text:
         return ""
 
-    # Limit text length for the prompt to avoid token limits
-    # A typical prompt + 2000 chars should be safe for most models
-    text_for_prompt = text[:4000] # Adjust based on typical document length and model context window
+    if mode == "hierarchical" or (mode == "auto" and not fits_single_prompt(text)):
+        return await _summarize_hierarchical(text, num_sentences)
+
+    # Limit text length for the prompt to the token budget, in whole sentences
+    text_for_prompt = fit_text(text, SUMMARY_PROMPT_TOKENS, MODEL_NAME)
 
     prompt = f"""
     Summarize the following text concisely into approximately {num_sentences} sentences.
@@ -33,13 +131,4 @@ def summarize_text(text: str, num_sentences: int = 3) -> str:
     Text to summarize:
     {text_for_prompt}
     """
-    
-    try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
-    except Exception as e:
-        print(f"Error summarizing text: {e}")
-        # Print the raw response text for debugging
-        if 'response' in locals():
-            print(f"Raw Gemini response text (if available): {response.text}")
-        return "Failed to generate summary."
\ No newline at end of file
+    return await _summarize_prompt(prompt)
@@ -1,65 +1,93 @@
-import os
-import json
 import re
 from collections import Counter
-from dotenv import load_dotenv
-
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
-
-from google.generativeai import GenerativeModel, configure
-
-# Load environment variables
-load_dotenv()
-configure(api_key=os.getenv("GEMINI_API_KEY"))
-model = GenerativeModel('gemini-2.0-flash')
+from functools import lru_cache
+
+from ..config import LEMMA_CACHE_SIZE
+from ..utils.json_stream import extract_json_objects
+from ..utils.log import get_logger
+from .executors import run_cpu
+from .llm_client import generate_content
+from .metrics import stage
+from .nlp_resources import get_lemmatizer, get_stop_words
+from .prompt_budget import fit_text, token_budget
+from .schemas import VocabularyItem, validate_items
+
+MODEL_NAME = 'gemini-2.0-flash'
+
+logger = get_logger(__name__)
+
+# Tokens of document text included in the prompt; candidate words come from the full text
+VOCAB_PROMPT_TOKENS = token_budget("vocabulary", MODEL_NAME, 500)
+
+# Candidate words are runs of ASCII letters. Sentence boundaries don't matter for
+# frequency counting, so a compiled regex replaces the punkt tokenizer.
+_WORD_PATTERN = re.compile(r'[a-z]+')
+
+# Text is tokenized in windows of about this many characters, so the lowercased copy
+# and the match list never hold the whole document at once.
+_TOKENIZE_WINDOW_CHARS = 64 * 1024
+
+@lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def _lemmatize(word: str) -> str:
+    return get_lemmatizer().lemmatize(word)
+
+def _iter_windows(text: str):
+    """Yields consecutive slices of `text`, cut at whitespace so no word is split."""
+    start = 0
+    length = len(text)
+    while start < length:
+        end = start + _TOKENIZE_WINDOW_CHARS
+        if end < length:
+            split_at = text.rfind(" ", start, end)
+            if split_at > start:
+                end = split_at
+        yield text[start:end]
+        start = end
+
+def count_tokens(text: str) -> Counter:
+    """
+    Counts lemmatized candidate words in a single streaming pass.
 
-# Ensure required NLTK data is available
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+    Raw words are counted first; stopword filtering and lemmatization then run once per
+    distinct word instead of once per occurrence, and lemmas are memoized across calls.
 
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+    Args:
+        text (str): The document text.
 
-try:
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('wordnet')
+    Returns:
+        Counter: Lemma -> number of occurrences, in order of first occurrence.
+    """
+    raw_counts = Counter()
+    for window in _iter_windows(text):
+        raw_counts.update(_WORD_PATTERN.findall(window.lower()))
 
-# Prepare NLP tools
-stop_words = set(stopwords.words('english'))
-lemmatizer = WordNetLemmatizer()
+    stop_words = get_stop_words()
+    word_counts = Counter()
+    for word, count in raw_counts.items():
+        if len(word) > 2 and word not in stop_words:
+            word_counts[_lemmatize(word)] += count
+    return word_counts
 
 def clean_and_tokenize(text):
-    """Lowercase, remove punctuation/numbers, tokenize, filter stopwords, and lemmatize."""
-    text = text.lower()
-    text = re.sub(r'[^a-z\s]', '', text)
-    tokens = word_tokenize(text)
-    tokens = [lemmatizer.lemmatize(word) for word in tokens if word not in stop_words and len(word) > 2]
+    """Lowercase, drop non-letters, filter stopwords, and lemmatize; returns tokens in document order."""
+    stop_words = get_stop_words()
+    tokens = []
+    for window in _iter_windows(text):
+        tokens.extend(
+            _lemmatize(word) for word in _WORD_PATTERN.findall(window.lower())
+            if len(word) > 2 and word not in stop_words
+        )
     return tokens
 
-def extract_vocabulary(text: str, num_words: int = 10) -> list:
+def rank_candidates(word_counts: Counter, num_words: int) -> list:
     """
-    Extracts important vocabulary words from text using NLP + Gemini API.
-    Returns a list of dictionaries with word, definition, and part of speech.
+    Picks up to `num_words * 2` candidate words for the model: frequent enough to matter
+    (at least twice) but not so frequent they are filler (at most 5% of all tokens).
+    Falls back to the most common words when too few qualify.
     """
-    if not text:
-        return []
-
-    tokens = clean_and_tokenize(text)
-    if not tokens:
-        return []
-
-    word_counts = Counter(tokens)
     min_count = 2
     max_frequency_ratio = 0.05
-    total_tokens = len(tokens)
+    total_tokens = sum(word_counts.values())
 
     meaningful_words = [
         word for word, count in word_counts.most_common()
@@ -68,11 +96,10 @@ def extract_vocabulary(text: str, num_words: int = 10) -> list:
 
     if len(meaningful_words) < num_words:
         meaningful_words = [word for word, _ in word_counts.most_common(num_words * 2)]
+    return meaningful_words
 
-    if not meaningful_words:
-        return []
-
-    prompt = f"""
+def _vocabulary_prompt(text: str, num_words: int, meaningful_words: list) -> str:
+    return f"""
     Given the following text, identify the {num_words} most important and relevant vocabulary words from this list: {', '.join(meaningful_words)}.
     For each word, provide a concise definition and its part of speech.
 
@@ -87,37 +114,50 @@ def extract_vocabulary(text: str, num_words: int = 10) -> list:
     ]
 
     Text to analyze:
-    {text[:2000]}
+    {fit_text(text, VOCAB_PROMPT_TOKENS, MODEL_NAME)}
     """
 
-    try:
-        response = model.generate_content(prompt)
-        vocab_json_string = response.text.strip()
+def _parse_vocabulary(response_text: str, num_words: int) -> list:
+    """Keeps the well-formed entries of the model's JSON answer, salvaging them from a partly broken reply."""
+    items = extract_json_objects(response_text)
+    if not items:
+        logger.warning("No JSON objects found in vocabulary response: %.200s...", response_text)
+        return []
+    return validate_items(items, VocabularyItem)[:num_words]
+
+async def extract_vocabulary(text: str, num_words: int = 10, word_counts: Counter = None) -> list:
+    """
+    Extracts important vocabulary words from text using NLP + Gemini API.
+    Returns a list of dictionaries with word, definition, and part of speech.
+    Pass `word_counts` (from `count_tokens`, e.g. stored with the document) to skip tokenization.
+    """
+    if not text:
+        return []
 
-        # Remove markdown formatting if present
-        if vocab_json_string.startswith("```json"):
-            vocab_json_string = vocab_json_string[len("```json"):].strip()
-        if vocab_json_string.endswith("```"):
-            vocab_json_string = vocab_json_string[:-len("```")].strip()
+    if word_counts is None:
+        # Tokenizing and lemmatizing is CPU work; run it in a worker process so it neither
+        # blocks the event loop nor competes for its GIL while other LLM calls are in flight
+        # (e.g. quiz generation in /generate-quiz/).
+        with stage("tokenization"):
+            word_counts = await run_cpu(count_tokens, text)
+    if not word_counts:
+        return []
 
-        vocabulary = json.loads(vocab_json_string)
+    meaningful_words = rank_candidates(word_counts, num_words)
 
-        if not isinstance(vocabulary, list):
-            print(f"Warning: Expected list from Gemini but got: {type(vocabulary)}")
-            return []
+    if not meaningful_words:
+        return []
 
-        filtered = [
-            item for item in vocabulary
-            if isinstance(item, dict)
-            and item.get('word')
-            and item.get('definition')
-            and item.get('part_of_speech')
-        ]
+    with stage("prompt_build"):
+        prompt = _vocabulary_prompt(text, num_words, meaningful_words)
 
-        return filtered[:num_words]
+    try:
+        response_text = await generate_content(MODEL_NAME, prompt)
+        with stage("response_parsing"):
+            return _parse_vocabulary(response_text, num_words)
 
     except Exception as e:
-        print(f"Error extracting vocabulary: {e}")
-        if 'response' in locals():
-            print(f"Gemini response (if available): {response.text[:500]}")
+        logger.error("Error extracting vocabulary: %s", e)
+        if 'response_text' in locals():
+            logger.debug("Model response: %.500s", response_text)
         return []
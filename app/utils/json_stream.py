@@ -0,0 +1,113 @@
+# backend/app/utils/json_stream.py
+import json
+import re
+
+# A comma directly before a closing bracket, which JSON rejects but models often write
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+def _decode_object(text: str):
+    """Decodes one object, retrying once without trailing commas. Returns None if it is not valid JSON."""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    try:
+        return json.loads(_TRAILING_COMMA.sub(r"\1", text))
+    except json.JSONDecodeError:
+        return None
+
+
+def _unwrap(item) -> list:
+    """
+    Returns the items an object stands for: a wrapper such as {"questions": [...]}, whose
+    only value is a list of objects, stands for the objects in that list.
+    """
+    if isinstance(item, dict) and len(item) == 1:
+        (value,) = item.values()
+        if isinstance(value, list) and value and all(isinstance(v, dict) for v in value):
+            return value
+    return [item]
+
+
+class JSONArrayStreamParser:
+    """
+    Incrementally parses a JSON array of objects as its text arrives in chunks.
+
+    Text outside the JSON (a ```json fence, a sentence before or after the array) is
+    ignored, and objects written without an enclosing array are picked up as well. Each
+    top-level object is decoded and returned as soon as its closing brace arrives, so
+    callers can act on the first items long before the array is complete. Trailing commas
+    are tolerated; objects that still fail to decode are skipped without affecting the
+    others.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0 # Open brackets, counting an enclosing array
+        self._in_string = False
+        self._escape = False
+        self._item_start = None
+        self._item_depth = 0 # Depth just outside the open item
+
+    def feed(self, chunk: str) -> list:
+        """
+        Adds a chunk of text and returns the objects completed by it, in order.
+        """
+        self._buffer += chunk
+        items = []
+        buffer = self._buffer
+        i = self._pos
+        while i < len(buffer):
+            char = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                # Quotes in surrounding prose are not JSON strings
+                if self._depth >= 1:
+                    self._in_string = True
+            elif char in "[{":
+                if char == "{" and self._item_start is None:
+                    self._item_start = i
+                    self._item_depth = self._depth
+                self._depth += 1
+            elif char in "]}" and self._depth > 0:
+                self._depth -= 1
+                if self._item_start is not None and self._depth == self._item_depth:
+                    item = _decode_object(buffer[self._item_start:i + 1])
+                    if item is not None:
+                        items.extend(_unwrap(item))
+                    self._item_start = None
+            i += 1
+
+        # Drop text that can no longer be part of an item to keep the buffer small
+        if self._item_start is None:
+            self._buffer = ""
+            self._pos = 0
+        else:
+            self._buffer = buffer[self._item_start:]
+            self._pos = i - self._item_start
+            self._item_start = 0
+        return items
+
+
+def extract_json_objects(text: str) -> list:
+    """
+    Salvages every well-formed JSON object from a complete model response.
+
+    Unlike `json.loads`, a stray sentence, a code fence, a trailing comma or one broken
+    object does not lose the rest of the response.
+
+    Args:
+        text (str): The raw response text.
+
+    Returns:
+        list: The decoded top-level objects, in order.
+    """
+    return JSONArrayStreamParser().feed(text)
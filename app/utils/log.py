@@ -0,0 +1,35 @@
+# backend/app/utils/log.py
+import logging
+
+from ..config import LOG_LEVEL
+
+_ROOT_NAME = "app"
+_configured = False
+
+
+def _configure() -> None:
+    global _configured
+    root = logging.getLogger(_ROOT_NAME)
+    if LOG_LEVEL.upper() == "OFF":
+        # Above CRITICAL: every call returns after a single integer comparison
+        root.setLevel(logging.CRITICAL + 1)
+    else:
+        root.setLevel(LOG_LEVEL.upper())
+    if not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        root.addHandler(handler)
+    root.propagate = False
+    _configured = True
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Returns a logger under the "app" hierarchy, configured from LOG_LEVEL on first use.
+
+    Pass arguments separately (`logger.debug("got %s", value)`) rather than as an
+    f-string, so nothing is formatted for messages below the level.
+    """
+    if not _configured:
+        _configure()
+    return logging.getLogger(name if name.startswith(_ROOT_NAME) else f"{_ROOT_NAME}.{name}")
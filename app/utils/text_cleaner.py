@@ -1,5 +1,7 @@
 # backend/app/utils/text_cleaner.py
 import re
+import zlib
+from collections import Counter, deque
 
 def clean_text(text: str) -> str:
     """
@@ -21,4 +23,207 @@ def clean_text(text: str) -> str:
     # Optional: Convert to lowercase (can be done in subsequent steps as well)
     # cleaned_text = cleaned_text.lower()
 
-    return cleaned_text
\ No newline at end of file
+    return cleaned_text
+
+def normalize_whitespace(text: str) -> str:
+    """
+    Collapses every run of whitespace into a single space, as sent to the LLM.
+    """
+    return " ".join(text.split())
+
+
+def iter_clean_pages(pages):
+    """
+    Lazily whitespace-normalizes a stream of page texts, skipping empty pages.
+
+    Args:
+        pages: An iterable of raw page texts, e.g. `pdf_reader.iter_page_texts(...)`.
+
+    Yields:
+        str: The normalized text of each non-empty page.
+    """
+    for page in pages:
+        cleaned = normalize_whitespace(page)
+        if cleaned:
+            yield cleaned
+
+
+def take_chars(pages, max_chars: int = None) -> str:
+    """
+    Joins cleaned pages with single spaces, pulling only as many as `max_chars` needs.
+
+    Args:
+        pages: An iterable of cleaned page texts.
+        max_chars (int): The character budget; None drains the whole stream.
+
+    Returns:
+        str: The joined text, at most `max_chars` characters long.
+    """
+    if max_chars is None:
+        return " ".join(pages)
+
+    parts = []
+    collected = 0
+    for page in pages:
+        parts.append(page)
+        collected += len(page) + 1
+        if collected > max_chars:
+            break
+    return " ".join(parts)[:max_chars]
+
+
+# Header/footer detection: a line of at most EDGE_LINE_MAX_CHARS characters among the
+# first or last EDGE_LINES lines of a page is boilerplate once the same line, ignoring
+# case and numbers, has been at the edge of REPEATED_LINE_MIN_PAGES pages. Pages are held
+# back DEDUP_LOOKAHEAD_PAGES pages, so the headers of the first pages are recognized too.
+EDGE_LINES = 2
+EDGE_LINE_MAX_CHARS = 80
+REPEATED_LINE_MIN_PAGES = 3
+DEDUP_LOOKAHEAD_PAGES = 8
+
+# Near-duplicate pages: words per shingle, MinHash signature length, LSH bands the
+# signature is split into, and the estimated Jaccard similarity of shingle sets at which
+# a page counts as a repeat of an earlier one
+SHINGLE_WORDS = 3
+MINHASH_BUCKETS = 32
+LSH_BANDS = 8
+NEAR_DUPLICATE_SIMILARITY = 0.9
+
+_DIGITS = re.compile(r'\d+')
+
+
+def _line_key(line: str) -> str:
+    """Page numbers and dates change from page to page; the rest of a header does not."""
+    return _DIGITS.sub("#", line.lower())
+
+
+def _minhash(words: list) -> list:
+    """
+    One-permutation MinHash of the page's word shingles: each shingle is hashed once,
+    the hash picks a bucket and each bucket keeps its smallest value. Empty buckets
+    borrow from the next non-empty one, so short pages still compare fairly.
+    """
+    if len(words) <= SHINGLE_WORDS:
+        shingles = [" ".join(words)]
+    else:
+        shingles = (" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1))
+    signature = [None] * MINHASH_BUCKETS
+    for shingle in shingles:
+        # crc32 is stable across processes, unlike hash()
+        bucket, value = divmod(zlib.crc32(shingle.encode("utf-8")), MINHASH_BUCKETS)[::-1]
+        if signature[bucket] is None or value < signature[bucket]:
+            signature[bucket] = value
+    dense = list(signature)
+    for i, value in enumerate(signature):
+        if value is None:
+            for step in range(1, MINHASH_BUCKETS):
+                borrowed = signature[(i + step) % MINHASH_BUCKETS]
+                if borrowed is not None:
+                    dense[i] = borrowed + (step << 32)
+                    break
+    return dense
+
+
+def iter_distinct_pages(pages):
+    """
+    Strips repeated header and footer lines and drops near-duplicate pages, in a single
+    pass over a stream of raw page texts.
+
+    A short line among the top or bottom EDGE_LINES of a page is dropped once it (ignoring
+    case and numbers, so "Page 3 of 40" matches "Page 4 of 40") has appeared at the edge
+    of REPEATED_LINE_MIN_PAGES pages. A page whose remaining text has a shingle set at least
+    NEAR_DUPLICATE_SIMILARITY similar to an earlier page's, estimated with MinHash and
+    found through LSH buckets, is dropped. Time is linear in the text length.
+
+    Args:
+        pages: An iterable of raw page texts, with their line breaks.
+
+    Yields:
+        str: The remaining lines of each page joined by newlines, or "" for a page that
+        is empty or repeats an earlier one, so page positions are kept.
+    """
+    edge_counts = Counter()
+    buckets = {}
+    rows = MINHASH_BUCKETS // LSH_BANDS
+
+    def emit(lines: list, edges: set) -> str:
+        kept = [
+            line for i, line in enumerate(lines)
+            if i not in edges or edge_counts[_line_key(line)] < REPEATED_LINE_MIN_PAGES
+        ]
+        words = " ".join(kept).lower().split()
+        if not words:
+            return ""
+        signature = _minhash(words)
+        bands = [(band, tuple(signature[band * rows:(band + 1) * rows])) for band in range(LSH_BANDS)]
+        seen = set()
+        for band in bands:
+            for earlier in buckets.get(band, ()):
+                if id(earlier) in seen:
+                    continue
+                seen.add(id(earlier))
+                matches = sum(a == b for a, b in zip(signature, earlier))
+                if matches >= NEAR_DUPLICATE_SIMILARITY * MINHASH_BUCKETS:
+                    return ""
+        for band in bands:
+            buckets.setdefault(band, []).append(signature)
+        return "\n".join(kept)
+
+    window = deque()
+    for page in pages:
+        lines = [line for line in (normalize_whitespace(line) for line in page.splitlines()) if line]
+        # At least one middle line is never an edge line, so a short page keeps its body
+        depth = min(EDGE_LINES, (len(lines) - 1) // 2)
+        edges = {
+            i for i in (*range(depth), *range(len(lines) - depth, len(lines)))
+            if len(lines[i]) <= EDGE_LINE_MAX_CHARS
+        }
+        edge_counts.update({_line_key(lines[i]) for i in edges})
+        window.append((lines, edges))
+        if len(window) > DEDUP_LOOKAHEAD_PAGES:
+            yield emit(*window.popleft())
+    while window:
+        yield emit(*window.popleft())
+
+
+def preprocess_pages(pages, dedupe: bool = True):
+    """
+    Applies the page preprocessing stage to a stream of raw page texts: `iter_distinct_pages`
+    when `dedupe` is set, otherwise the pages unchanged.
+    """
+    return iter_distinct_pages(pages) if dedupe else iter(pages)
+
+
+def sample_page_numbers(page_count: int, max_pages: int) -> list:
+    """
+    Picks a representative subset of a long document's pages: the document is cut into
+    `max_pages` equal runs and the middle page of each is kept, so every part of the
+    document contributes and nothing past the sample needs to be extracted.
+
+    Args:
+        page_count (int): The number of pages in the document.
+        max_pages (int): The sample size; 0 or a count at least `page_count` keeps every page.
+
+    Returns:
+        list: Zero-based page numbers, in order.
+    """
+    if max_pages <= 0 or page_count <= max_pages:
+        return list(range(page_count))
+    return [int((i + 0.5) * page_count / max_pages) for i in range(max_pages)]
+
+
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+
+def iter_sentences(text: str):
+    """
+    Lazily yields the sentences of normalized text, split on terminal punctuation
+    followed by whitespace, so a caller that stops early never splits the rest.
+    """
+    start = 0
+    for match in _SENTENCE_BOUNDARY.finditer(text):
+        if match.start() > start:
+            yield text[start:match.start()]
+        start = match.end()
+    if start < len(text):
+        yield text[start:]
@@ -0,0 +1,156 @@
+# backend/benchmarks/bench_load.py
+"""
+HTTP load test of the full FastAPI app with the stub LLM provider: no network, no API key.
+
+Starts uvicorn in a subprocess with LLM_PROVIDER=stub (and the result cache disabled by
+default, so every request does the full work), drives each endpoint with a fixed number
+of concurrent clients, and reports p50/p95/p99 latency, requests per second, errors and
+the peak RSS of the server process and of its CPU worker processes.
+
+Usage:
+    python -m benchmarks.bench_load [--pages 10] [--concurrency 8] [--requests 200]
+        [--endpoints quiz vocabulary summary] [--stub-latency 0.5] [--output results.json]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from .common import percentile, tree_peak_rss_bytes, write_results
+from .corpus import make_pdf
+
+ENDPOINTS = {
+    "quiz": ("/api/generate-quiz/", {"num_questions": "5", "question_type": "multiple_choice"}),
+    "vocabulary": ("/api/extract-vocabulary/", {"num_words": "10"}),
+    "summary": ("/api/summarize-text/", {"num_sentences": "3"}),
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, args) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        LLM_PROVIDER="stub",
+        LLM_STUB_LATENCY_SECONDS=str(args.stub_latency),
+        LLM_STUB_JITTER_SECONDS=str(args.stub_jitter),
+        LLM_STUB_FAILURE_RATE=str(args.stub_failure_rate),
+        CACHE_BACKEND=args.cache,
+    )
+    command = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+    return subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_ready(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/api/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"Server did not become ready within {timeout} seconds.")
+
+
+async def drive(base_url: str, path: str, form: dict, pdf: bytes, concurrency: int, total: int) -> dict:
+    """Sends `total` requests with `concurrency` clients in flight; returns latency stats."""
+    latencies = []
+    status_counts = {}
+    remaining = iter(range(total))
+
+    async def client_loop(client):
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                response = await client.post(path, data=form, files={"file": ("bench.pdf", pdf, "application/pdf")})
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            status_counts[status] = status_counts.get(status, 0) + 1
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=300.0) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "requests_per_second": total / elapsed,
+        "errors": total - status_counts.get("200", 0),
+        "status_counts": status_counts,
+        "latency_seconds": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": max(latencies),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=10, help="Size of the uploaded PDF")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--endpoints", nargs="+", choices=list(ENDPOINTS), default=list(ENDPOINTS))
+    parser.add_argument("--stub-latency", type=float, default=0.5, help="Simulated seconds per model call")
+    parser.add_argument("--stub-jitter", type=float, default=0.1)
+    parser.add_argument("--stub-failure-rate", type=float, default=0.0)
+    parser.add_argument("--cache", default="none", help="CACHE_BACKEND for the server (default: none)")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/load-<timestamp>.json)")
+    args = parser.parse_args()
+
+    pdf = make_pdf(args.pages)
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_server(port, args)
+    try:
+        wait_until_ready(base_url)
+        endpoints = {}
+        for name in args.endpoints:
+            path, form = ENDPOINTS[name]
+            result = asyncio.run(drive(base_url, path, form, pdf, args.concurrency, args.requests))
+            endpoints[name] = result
+            latency = result["latency_seconds"]
+            print(
+                f"{name:>10}: {result['requests_per_second']:.1f} req/s  "
+                f"p50 {latency['p50'] * 1000:.0f}ms  p95 {latency['p95'] * 1000:.0f}ms  p99 {latency['p99'] * 1000:.0f}ms  "
+                f"errors {result['errors']}"
+            )
+        # Read before terminating: the worker processes are gone once the server exits
+        peak_rss = tree_peak_rss_bytes(server.pid)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    if peak_rss["server"] is not None:
+        print(f"server peak RSS: {peak_rss['server'] / 2**20:.0f} MiB")
+    if peak_rss["workers"] is not None:
+        total = peak_rss["server"] + peak_rss["workers"]
+        print(f"worker peak RSS: {peak_rss['workers'] / 2**20:.0f} MiB across {peak_rss['worker_count']} processes (total {total / 2**20:.0f} MiB)")
+    results = {
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "server_peak_rss_bytes": peak_rss["server"],
+        "worker_peak_rss_bytes": peak_rss["workers"],
+        "worker_processes": peak_rss["worker_count"],
+        "endpoints": endpoints,
+    }
+    path = write_results("load", results, args.output)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# backend/benchmarks/bench_stages.py
+"""
+Times each stage of the document pipeline separately on the generated PDF corpus:
+upload ingestion, PyMuPDF extraction and cleaning on the CPU workers, tokenization, vocabulary ranking,
+prompt construction and JSON parsing of a model response. No model is called.
+
+Usage:
+    python -m benchmarks.bench_stages [--pages 1 10 50 200 500] [--repeat 5] [--output results.json]
+
+Tokenization and ranking need the NLTK stopwords and wordnet data; without them those
+stages are reported as skipped.
+"""
+import argparse
+import asyncio
+import io
+import time
+
+from starlette.datastructures import UploadFile
+
+from app.services import question_gen, vocab_extractor
+from app.services.llm_stub import STREAM_CHUNK_CHARS, respond
+from app.services.pdf_ingest import read_upload
+from app.services.executors import shutdown_executors, warm_up
+from app.services.pdf_reader import extract_clean_text_in_pool
+from app.utils.json_stream import JSONArrayStreamParser, extract_json_objects
+
+from .common import peak_rss_bytes, summarize, write_results
+from .corpus import DEFAULT_PAGE_COUNTS, make_pdf
+
+# Questions in the model response used for the JSON parsing stages
+RESPONSE_QUESTIONS = 20
+
+
+def _ingest(data: bytes):
+    upload = UploadFile(file=io.BytesIO(data), size=len(data), filename="bench.pdf")
+    return asyncio.run(read_upload(upload))
+
+
+def _extract(upload) -> str:
+    return asyncio.run(extract_clean_text_in_pool(upload.data, upload.page_count))
+
+
+def _parse_response(response_text: str) -> list:
+    return question_gen._validate_questions(extract_json_objects(response_text), "multiple_choice")
+
+
+def _parse_streamed(response_text: str) -> list:
+    parser = JSONArrayStreamParser()
+    items = []
+    for i in range(0, len(response_text), STREAM_CHUNK_CHARS):
+        items.extend(parser.feed(response_text[i:i + STREAM_CHUNK_CHARS]))
+    return items
+
+
+def time_stage(fn, arg, repeat: int):
+    """Runs `fn(arg)` `repeat` times; returns (timing summary in seconds, last result)."""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(arg)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples), result
+
+
+def bench_document(pages: int, repeat: int) -> dict:
+    data = make_pdf(pages)
+    stages = {}
+
+    stages["ingestion"], upload = time_stage(_ingest, data, repeat)
+    stages["extraction"], cleaned = time_stage(_extract, upload, repeat)
+
+    try:
+        vocab_extractor._lemmatize.cache_clear()
+        stages["tokenization"], word_counts = time_stage(vocab_extractor.count_tokens, cleaned, repeat)
+        stages["vocabulary_ranking"], _ = time_stage(lambda counts: vocab_extractor.rank_candidates(counts, 10), word_counts, repeat)
+    except LookupError as e:
+        stages["tokenization"] = stages["vocabulary_ranking"] = {"skipped": f"NLTK data missing: {str(e).splitlines()[0]}"}
+
+    stages["prompt_construction"], prompt = time_stage(lambda t: question_gen._build_prompt(t, RESPONSE_QUESTIONS, "multiple_choice"), cleaned, repeat)
+    response_text = respond(prompt)
+    stages["json_parsing"], _ = time_stage(_parse_response, response_text, repeat)
+    stages["json_stream_parsing"], _ = time_stage(_parse_streamed, response_text, repeat)
+
+    return {
+        "pages": pages,
+        "pdf_bytes": len(data),
+        "text_chars": len(cleaned),
+        "stages": stages,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=list(DEFAULT_PAGE_COUNTS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/stages-<timestamp>.json)")
+    args = parser.parse_args()
+
+    documents = []
+    try:
+        # Worker start-up is not part of the extraction stage
+        asyncio.run(warm_up())
+        for pages in args.pages:
+            result = bench_document(pages, args.repeat)
+            documents.append(result)
+            medians = ", ".join(
+                f"{name} {stats['median'] * 1000:.1f}ms" for name, stats in result["stages"].items() if "median" in stats
+            )
+            print(f"{pages:>4} pages: {medians}")
+    finally:
+        shutdown_executors()
+
+    path = write_results("stages", {"repeat": args.repeat, "peak_rss_bytes": peak_rss_bytes(), "documents": documents}, args.output)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
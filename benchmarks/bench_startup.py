@@ -0,0 +1,61 @@
+# backend/benchmarks/bench_startup.py
+"""
+Measures cold import time of `app.main` and the time spent in the FastAPI startup
+handlers, each in a fresh interpreter. Fails when a budget is exceeded, so it can
+guard against import-time regressions in CI.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--max-import-seconds 1.5] [--max-startup-seconds 2.0]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+asyncio.run(app.main.app.router.startup())
+ready = time.perf_counter()
+print(json.dumps({"import_seconds": imported - started, "startup_seconds": ready - imported}))
+"""
+
+
+def run_probe() -> dict:
+    result = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-seconds", type=float, default=None)
+    parser.add_argument("--max-startup-seconds", type=float, default=None)
+    args = parser.parse_args()
+
+    samples = [run_probe() for _ in range(args.runs)]
+    report = {
+        stage: {
+            "median": statistics.median(s[stage] for s in samples),
+            "min": min(s[stage] for s in samples),
+            "max": max(s[stage] for s in samples),
+        }
+        for stage in ("import_seconds", "startup_seconds")
+    }
+    print(json.dumps(report, indent=2))
+
+    failures = []
+    if args.max_import_seconds is not None and report["import_seconds"]["median"] > args.max_import_seconds:
+        failures.append(f"import took {report['import_seconds']['median']:.3f}s (budget {args.max_import_seconds}s)")
+    if args.max_startup_seconds is not None and report["startup_seconds"]["median"] > args.max_startup_seconds:
+        failures.append(f"startup took {report['startup_seconds']['median']:.3f}s (budget {args.max_startup_seconds}s)")
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
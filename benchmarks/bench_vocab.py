@@ -0,0 +1,88 @@
+# backend/benchmarks/bench_vocab.py
+"""
+Compares vocabulary candidate extraction throughput before and after the
+single-pass tokenizer + memoized lemmatizer rewrite.
+
+Usage:
+    python -m benchmarks.bench_vocab [--pages 300] [--pdf path/to/book.pdf]
+
+The "before" pipeline needs the NLTK punkt data (`punkt_tab`); both need wordnet.
+"""
+import argparse
+import re
+import time
+from collections import Counter
+
+import fitz # PyMuPDF
+
+from app.services import vocab_extractor
+from app.services.nlp_resources import get_lemmatizer, get_stop_words
+from app.utils.text_cleaner import normalize_whitespace
+
+SAMPLE_PARAGRAPH = (
+    "Photosynthesis is the process by which green plants and certain other organisms "
+    "transform light energy into chemical energy. During photosynthesis in green plants, "
+    "light energy is captured and used to convert water, carbon dioxide, and minerals into "
+    "oxygen and energy-rich organic compounds. The mitochondria, often called the powerhouse "
+    "of the cell, then release that stored energy through cellular respiration. "
+)
+
+
+def legacy_clean_and_tokenize(text):
+    """The original implementation: full-text regex, punkt tokenization, one lemmatize call per token."""
+    from nltk.tokenize import word_tokenize
+
+    text = text.lower()
+    text = re.sub(r'[^a-z\s]', '', text)
+    tokens = word_tokenize(text)
+    lemmatizer = get_lemmatizer()
+    stop_words = get_stop_words()
+    return [lemmatizer.lemmatize(word) for word in tokens if word not in stop_words and len(word) > 2]
+
+
+def load_text(args) -> str:
+    if args.pdf:
+        doc = fitz.open(args.pdf)
+        text = "".join(page.get_text() for page in doc)
+        doc.close()
+    else:
+        text = SAMPLE_PARAGRAPH * 8 * args.pages # roughly one page per 8 paragraphs
+    return normalize_whitespace(text)
+
+
+def time_it(fn, text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(text)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300, help="Synthetic document size when no --pdf is given")
+    parser.add_argument("--pdf", help="Benchmark the text of this PDF instead")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    text = load_text(args)
+    num_words = len(text.split())
+    print(f"Document: {len(text):,} characters, {num_words:,} whitespace-separated words")
+
+    try:
+        legacy_seconds, legacy_tokens = time_it(lambda t: Counter(legacy_clean_and_tokenize(t)), text, args.repeat)
+        print(f"before: {legacy_seconds:.3f}s  {num_words / legacy_seconds:,.0f} tokens/s")
+    except LookupError:
+        legacy_seconds = None
+        print("before: skipped, NLTK punkt_tab/wordnet data is not installed")
+
+    vocab_extractor._lemmatize.cache_clear()
+    new_seconds, new_counts = time_it(vocab_extractor.count_tokens, text, args.repeat)
+    print(f"after:  {new_seconds:.3f}s  {num_words / new_seconds:,.0f} tokens/s  (lemma cache: {vocab_extractor._lemmatize.cache_info()})")
+    if legacy_seconds:
+        print(f"speedup: {legacy_seconds / new_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# backend/benchmarks/common.py
+"""
+Shared helpers for the benchmark scripts: summary statistics and JSON result files.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Returns the `pct` percentile (0-100) of `samples` by linear interpolation."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples: list) -> dict:
+    """Summary statistics, in the samples' unit, for a list of timings."""
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "p95": percentile(samples, 95),
+        "max": max(samples),
+    }
+
+
+def environment() -> dict:
+    """Describes the machine and code version, so result files can be compared fairly."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_results(name: str, results: dict, output: str = None) -> str:
+    """
+    Writes `results` with environment metadata as JSON and returns the file path.
+    Without `output`, the file goes to benchmarks/results/<name>-<timestamp>.json.
+    """
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, "w") as f:
+        json.dump({"benchmark": name, "environment": environment(), "results": results}, f, indent=2)
+    return output
+
+
+def peak_rss_bytes(pid: int = None) -> int:
+    """
+    Returns the peak resident set size of a process (this one by default), or None
+    where /proc is not available.
+    """
+    try:
+        with open(f"/proc/{pid or 'self'}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if pid is None:
+        import resource
+
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+    return None
+
+
+def descendant_pids(pid: int) -> list:
+    """
+    Returns the pids of all child processes of `pid`, recursively, or an empty list
+    where /proc is not available.
+    """
+    pids = []
+    try:
+        tasks = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return pids
+    for tid in tasks:
+        try:
+            with open(f"/proc/{pid}/task/{tid}/children") as f:
+                children = [int(child) for child in f.read().split()]
+        except OSError:
+            continue
+        for child in children:
+            pids.append(child)
+            pids.extend(descendant_pids(child))
+    return pids
+
+
+def tree_peak_rss_bytes(pid: int) -> dict:
+    """
+    Returns the peak RSS of `pid` and the summed peak RSS of its child processes (the
+    CPU worker pool), read while they are still running. Values are None where /proc
+    is not available.
+    """
+    children = [peak_rss_bytes(child) for child in descendant_pids(pid)]
+    children = [rss for rss in children if rss is not None]
+    return {"server": peak_rss_bytes(pid), "workers": sum(children) if children else None, "worker_count": len(children)}
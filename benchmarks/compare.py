@@ -0,0 +1,62 @@
+# backend/benchmarks/compare.py
+"""
+Compares two benchmark result files of the same kind and prints the relative change of
+every timing, throughput and memory figure they share.
+
+Usage:
+    python -m benchmarks.compare baseline.json candidate.json [--threshold 5]
+"""
+import argparse
+import json
+
+# Leaf names whose value is better when larger; everything else is better when smaller
+HIGHER_IS_BETTER = {"requests_per_second"}
+
+# Leaves that describe the run rather than measure it
+SKIPPED_LEAVES = {"count", "requests", "concurrency", "pages", "pdf_bytes", "text_chars", "repeat"}
+
+
+def flatten(value, prefix: str = "") -> dict:
+    """Maps "a.b.c" paths to the numeric leaves of nested dicts; list items use their index or pages."""
+    leaves = {}
+    if isinstance(value, dict):
+        for key, item in value.items():
+            leaves.update(flatten(item, f"{prefix}{key}."))
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            label = item.get("pages", index) if isinstance(item, dict) else index
+            leaves.update(flatten(item, f"{prefix}{label}."))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        leaves[prefix.rstrip(".")] = value
+    return leaves
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=5.0, help="Only show changes of at least this many percent")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    if baseline.get("benchmark") != candidate.get("benchmark"):
+        parser.error(f"cannot compare a '{baseline.get('benchmark')}' result with a '{candidate.get('benchmark')}' result")
+
+    before = flatten(baseline["results"])
+    after = flatten(candidate["results"])
+    for path in sorted(before.keys() & after.keys()):
+        leaf = path.rsplit(".", 1)[-1]
+        if leaf in SKIPPED_LEAVES or not before[path]:
+            continue
+        change = (after[path] - before[path]) / before[path] * 100
+        if abs(change) < args.threshold:
+            continue
+        improved = change > 0 if leaf in HIGHER_IS_BETTER else change < 0
+        print(f"{'better' if improved else 'worse ':>6} {change:+7.1f}%  {path}: {before[path]:.6g} -> {after[path]:.6g}")
+
+
+if __name__ == "__main__":
+    main()
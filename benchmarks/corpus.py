@@ -0,0 +1,76 @@
+# backend/benchmarks/corpus.py
+"""
+Generates the benchmark PDF corpus: synthetic, reproducible documents from 1 to 500 pages.
+
+Every page holds a few paragraphs of varied, sentence-shaped text drawn from a fixed
+vocabulary with a seeded random generator, so the same size always yields the same bytes.
+
+Usage:
+    python -m benchmarks.corpus [--out benchmarks/corpus] [--pages 1 10 50 200 500]
+"""
+import argparse
+import os
+import random
+
+import fitz # PyMuPDF
+
+DEFAULT_PAGE_COUNTS = (1, 10, 50, 200, 500)
+
+_TOPIC_WORDS = (
+    "photosynthesis chlorophyll respiration mitochondria enzyme membrane nucleus protein "
+    "molecule carbon oxygen glucose energy organism ecosystem population species habitat "
+    "evolution adaptation mutation inheritance chromosome genome bacteria virus immunity "
+    "climate atmosphere erosion sediment volcano earthquake continent ocean current tide "
+    "economy market inflation currency revenue policy government parliament election treaty "
+    "algorithm function variable compiler network protocol database encryption processor"
+).split()
+_GLUE_WORDS = "the a of and in to is that for with as by on from which this are its".split()
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(_TOPIC_WORDS if rng.random() < 0.45 else _GLUE_WORDS) for _ in range(rng.randint(8, 18))]
+    return " ".join(words).capitalize() + "."
+
+
+def page_text(rng: random.Random) -> str:
+    """One page of text: a handful of paragraphs of random sentences."""
+    paragraphs = [" ".join(_sentence(rng) for _ in range(rng.randint(3, 6))) for _ in range(4)]
+    return "\n\n".join(paragraphs)
+
+
+def make_pdf(pages: int, seed: int = 0) -> bytes:
+    """Builds a `pages`-page PDF in memory."""
+    rng = random.Random(seed * 100003 + pages)
+    doc = fitz.open()
+    try:
+        for page_number in range(pages):
+            page = doc.new_page()
+            page.insert_textbox(fitz.Rect(54, 54, page.rect.width - 54, page.rect.height - 54), page_text(rng), fontsize=10)
+            page.insert_text((54, page.rect.height - 30), f"Page {page_number + 1}", fontsize=8)
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+
+def build_corpus(page_counts=DEFAULT_PAGE_COUNTS, seed: int = 0) -> dict:
+    """Returns {"<pages>p.pdf": pdf_bytes} for every page count."""
+    return {f"{pages}p.pdf": make_pdf(pages, seed) for pages in page_counts}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=os.path.join(os.path.dirname(__file__), "corpus"))
+    parser.add_argument("--pages", type=int, nargs="+", default=list(DEFAULT_PAGE_COUNTS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for name, data in build_corpus(args.pages, args.seed).items():
+        path = os.path.join(args.out, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        print(f"{path}: {len(data):,} bytes")
+
+
+if __name__ == "__main__":
+    main()
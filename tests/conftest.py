@@ -0,0 +1,38 @@
+import os
+
+import fitz # PyMuPDF
+import pytest
+
+# Run every test against the local stub model: no network, no API key, reproducible output.
+# Must be set before app.config is imported.
+os.environ.setdefault("LLM_PROVIDER", "stub")
+# Start the CPU worker processes on first use rather than with every TestClient
+os.environ.setdefault("EXECUTOR_WARMUP", "false")
+
+
+def _make_pdf(pages) -> bytes:
+    """A PDF with one page per text in `pages` ("" for a blank page), or `pages` numbered pages."""
+    if isinstance(pages, int):
+        pages = [f"Page {i + 1} text." for i in range(pages)]
+    doc = fitz.open()
+    for text in pages:
+        page = doc.new_page()
+        if text:
+            page.insert_text((72, 72), text)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _make_question(text: str) -> dict:
+    return {"question": text, "options": ["a", "b", "c", "d"], "answer": "a", "type": "multiple_choice", "explanation": "e"}
+
+
+@pytest.fixture
+def make_pdf():
+    return _make_pdf
+
+
+@pytest.fixture
+def make_question():
+    return _make_question
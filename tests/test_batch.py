@@ -0,0 +1,75 @@
+import asyncio
+
+from app.services import batch, pipeline
+from app.services.batch import BatchItem, run_batch
+from app.services.pdf_ingest import IngestedUpload
+
+PARAMS = {"num_questions": 2, "question_type": "multiple_choice", "coverage": False, "num_words": 5, "num_sentences": 3, "summary_mode": "auto"}
+
+
+def make_upload(filename, sha256):
+    return IngestedUpload(filename=filename, data=b"%PDF", sha256=sha256, page_count=1)
+
+
+def test_run_batch_processes_duplicate_files_once(monkeypatch):
+    calls = {"prepare": 0, "quiz": 0, "summary": 0}
+
+    async def fake_prepare(upload):
+        calls["prepare"] += 1
+
+    async def fake_quiz(upload, num_questions, question_type, coverage):
+        calls["quiz"] += 1
+        return [{"question": f"{upload.sha256}?"}] * num_questions
+
+    async def failing_summary(upload, num_sentences, mode):
+        calls["summary"] += 1
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(batch, "prepare_text", fake_prepare)
+    monkeypatch.setattr(pipeline, "quiz_for", fake_quiz)
+    monkeypatch.setattr(pipeline, "summary_for", failing_summary)
+
+    items = [
+        BatchItem(filename="a.pdf", operations=["quiz"], upload=make_upload("a.pdf", "aaa")),
+        BatchItem(filename="copy-of-a.pdf", operations=["quiz", "summary"], upload=make_upload("copy-of-a.pdf", "aaa")),
+        BatchItem(filename="b.pdf", operations=["summary"], upload=make_upload("b.pdf", "bbb")),
+        BatchItem(filename="broken.pdf", operations=["quiz"], error="Could not open the uploaded file as a PDF"),
+    ]
+
+    async def run():
+        return [result async for result in run_batch(items, PARAMS, max_concurrency=2)]
+
+    results = {result["filename"]: result for result in asyncio.run(run())}
+    assert calls == {"prepare": 2, "quiz": 1, "summary": 2}
+    assert results["a.pdf"]["results"] == {"quiz": [{"question": "aaa?"}] * 2}
+    assert results["a.pdf"]["errors"] == {}
+    assert results["copy-of-a.pdf"]["duplicate_of"] == "a.pdf"
+    assert results["copy-of-a.pdf"]["status"] == "completed"
+    assert results["copy-of-a.pdf"]["errors"] == {"summary": "model unavailable"}
+    assert results["b.pdf"]["status"] == "failed"
+    assert results["broken.pdf"]["status"] == "failed"
+    assert results["broken.pdf"]["errors"] == {"upload": "Could not open the uploaded file as a PDF"}
+
+
+def test_run_batch_limits_concurrent_documents(monkeypatch):
+    running = {"now": 0, "peak": 0}
+
+    async def fake_prepare(upload):
+        running["now"] += 1
+        running["peak"] = max(running["peak"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+
+    async def fake_vocabulary(upload, num_words):
+        return []
+
+    monkeypatch.setattr(batch, "prepare_text", fake_prepare)
+    monkeypatch.setattr(pipeline, "vocabulary_for", fake_vocabulary)
+
+    items = [BatchItem(filename=f"{i}.pdf", operations=["vocabulary"], upload=make_upload(f"{i}.pdf", str(i))) for i in range(6)]
+
+    async def run():
+        return [result async for result in run_batch(items, PARAMS, max_concurrency=2)]
+
+    assert len(asyncio.run(run())) == 6
+    assert running["peak"] == 2
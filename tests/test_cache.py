@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+from app.services.cache import MemoryCache, SQLiteCache, content_hash, make_key
+from app.services.executors import shutdown_executors
+
+
+def test_make_key_is_order_independent():
+    digest = content_hash(b"%PDF-1.4 test")
+    assert make_key("quiz", digest, num_questions=5, model="m") == make_key("quiz", digest, model="m", num_questions=5)
+    assert make_key("quiz", digest, num_questions=5) != make_key("quiz", digest, num_questions=6)
+
+def test_memory_cache_lru_eviction_and_stats():
+    cache = MemoryCache(max_entries=2, max_bytes=1024, ttl_seconds=0)
+    cache.set("text:a", "alpha")
+    cache.set("text:b", "beta")
+    assert cache.get("text:a") == "alpha" # a is now most recently used
+    cache.set("text:c", "gamma")
+    assert cache.get("text:b") is None
+    assert cache.get("text:c") == "gamma"
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 1
+    assert stats["namespaces"]["text"] == {"hits": 2, "misses": 1}
+
+def test_memory_cache_ttl_expiry():
+    cache = MemoryCache(max_entries=10, max_bytes=1024, ttl_seconds=1)
+    cache.set("summary:a", "short")
+    cache._entries["summary:a"] = (time.monotonic() - 1, cache._entries["summary:a"][1])
+    assert cache.get("summary:a") is None
+
+def test_sqlite_cache_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    writer = SQLiteCache(path, max_entries=10, ttl_seconds=0)
+    writer.set("quiz:a", [{"question": "Q?", "answer": "A"}])
+    reader = SQLiteCache(path, max_entries=10, ttl_seconds=0)
+    assert reader.get("quiz:a") == [{"question": "Q?", "answer": "A"}]
+
+def test_sqlite_cache_async_calls_round_trip(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), max_entries=10, ttl_seconds=0)
+
+    async def run():
+        await cache.aset("summary:a", "Short.")
+        return await cache.aget("summary:a"), await cache.aget("summary:b"), await cache.astats()
+
+    try:
+        value, missing, stats = asyncio.run(run())
+    finally:
+        shutdown_executors()
+    assert (value, missing) == ("Short.", None)
+    assert stats["namespaces"]["summary"] == {"hits": 1, "misses": 1}
@@ -0,0 +1,115 @@
+import asyncio
+import sqlite3
+from collections import Counter
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import documents, pipeline
+from app.services.documents import DocumentNotFoundError, DocumentStore
+from app.services.pdf_ingest import IngestedUpload
+from app.services.executors import shutdown_executors
+
+
+def fake_count_tokens(text):
+    # Module level, so it can be sent to the CPU worker processes
+    return Counter({"rainforest": 4, "river": 2})
+
+
+def test_store_round_trip_keeps_pages_and_counts(tmp_path):
+    store = DocumentStore(str(tmp_path / "documents.sqlite3"), max_bytes=0)
+    counts = Counter({"zebra": 3, "apple": 3, "cell": 1})
+    store.put("doc1", "a.pdf", ["First page.", "", "Third page."], counts)
+
+    document = DocumentStore(str(tmp_path / "documents.sqlite3"), max_bytes=0).get("doc1")
+    assert document.text == "First page. Third page."
+    assert document.page_count == 3
+    assert [document.page_text(i) for i in range(3)] == ["First page.", "", "Third page."]
+    # insertion order survives, so ranking ties break the same way
+    assert list(document.token_counts.items()) == list(counts.items())
+    assert document.sha256 == "doc1"
+
+    assert store.delete("doc1")
+    with pytest.raises(DocumentNotFoundError):
+        store.get("doc1")
+
+
+def test_store_evicts_least_recently_used_over_budget(tmp_path):
+    store = DocumentStore(str(tmp_path / "documents.sqlite3"), max_bytes=0)
+    size = store.put("probe", "p.pdf", ["x" * 1000]).size_bytes
+    store.delete("probe")
+
+    store.max_bytes = size * 2
+    store.put("old", "old.pdf", ["x" * 1000])
+    store.put("recent", "recent.pdf", ["x" * 1000])
+    store.get("old") # "recent" is now the least recently used
+    store.put("new", "new.pdf", ["x" * 1000])
+    assert store.contains("old") and store.contains("new")
+    assert not store.contains("recent")
+    assert store.total_bytes() <= store.max_bytes
+
+
+def test_store_returns_evicted_pages_to_the_file_system(tmp_path):
+    path = str(tmp_path / "documents.sqlite3")
+    store = DocumentStore(path, max_bytes=0)
+    assert store._connection().execute("PRAGMA auto_vacuum").fetchone()[0] == 2 # incremental
+
+    store.max_bytes = 1
+    for i in range(20):
+        store.put(f"doc{i}", "a.pdf", [bytes(range(256)).hex() * 100 + str(i)])
+    assert store._connection().execute("PRAGMA freelist_count").fetchone()[0] == 0
+
+    # a store created before auto-vacuum was enabled is converted when opened
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA auto_vacuum=NONE")
+    conn.execute("VACUUM")
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+    conn.close()
+    reopened = DocumentStore(path, max_bytes=0)
+    assert reopened._connection().execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    assert reopened.contains("doc19")
+
+
+def test_stored_document_skips_extraction_and_tokenization(tmp_path, monkeypatch, make_pdf):
+    store = DocumentStore(str(tmp_path / "documents.sqlite3"), max_bytes=0)
+    monkeypatch.setattr(documents, "_document_store", store)
+    monkeypatch.setattr(pipeline, "count_tokens", fake_count_tokens)
+    data = make_pdf(["The rainforest is large.", "", "A river flows through the rainforest."])
+    upload = IngestedUpload(filename="forest.pdf", data=data, sha256="forest", page_count=3)
+
+    async def run():
+        document, created = await pipeline.ingest_document(upload)
+        again, created_again = await pipeline.ingest_document(upload)
+        return document, created, created_again
+
+    try:
+        document, created, created_again = asyncio.run(run())
+    finally:
+        shutdown_executors()
+    assert created and not created_again
+    assert document.text == "The rainforest is large. A river flows through the rainforest."
+
+    stored = store.get("forest")
+    monkeypatch.setattr(pipeline, "extract_clean_text_in_pool", lambda *args, **kwargs: pytest.fail("extracted again"))
+    monkeypatch.setattr(pipeline, "count_tokens", lambda text: pytest.fail("tokenized again"))
+    assert asyncio.run(pipeline.load_text(stored, 10)) == "The rainfo"
+    vocabulary = asyncio.run(pipeline.vocabulary_for(stored, 2))
+    assert [item["word"] for item in vocabulary] == ["rainforest", "river"]
+
+
+def test_operations_accept_a_document_id(tmp_path, monkeypatch):
+    store = DocumentStore(str(tmp_path / "documents.sqlite3"), max_bytes=0)
+    monkeypatch.setattr(documents, "_document_store", store)
+    store.put("abc", "notes.pdf", ["The Amazon river flows through the rainforest. It is very long."])
+
+    with TestClient(app) as client:
+        response = client.post("/api/summarize-text/", data={"document_id": "abc", "num_sentences": 1})
+        assert response.status_code == 200
+        assert response.json()["summary"] == "The Amazon river flows through the rainforest."
+
+        assert client.get("/api/documents/abc").json()["filename"] == "notes.pdf"
+        assert client.post("/api/summarize-text/", data={"document_id": "missing"}).status_code == 404
+        assert client.post("/api/summarize-text/", data={"num_sentences": 1}).status_code == 400
+        assert client.delete("/api/documents/abc").status_code == 204
+        assert client.get("/api/documents/abc").status_code == 404
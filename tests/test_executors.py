@@ -0,0 +1,70 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from app.services import executors
+from app.services.executors import ExecutorBusyError, ExecutorTimeoutError, _Pool, _thread_pool, run_cpu, run_io, shutdown_executors
+
+
+def test_pool_rejects_tasks_beyond_its_queue():
+    pool = _Pool("test", workers=1, max_queue=1, factory=_thread_pool)
+    release = threading.Event()
+    try:
+        running = pool.submit(release.wait)
+        queued = pool.submit(release.wait)
+        assert pool.stats() == {"workers": 1, "in_flight": 2, "queued": 1, "utilization": 1.0}
+        with pytest.raises(ExecutorBusyError):
+            pool.submit(release.wait)
+    finally:
+        release.set()
+    running.result(timeout=5)
+    queued.result(timeout=5)
+    # done callbacks may run just after result() returns
+    deadline = time.monotonic() + 5
+    while pool.stats()["in_flight"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert pool.stats()["in_flight"] == 0
+    pool.shutdown()
+
+def test_timed_out_task_raises_without_blocking_the_loop():
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        try:
+            with pytest.raises(ExecutorTimeoutError):
+                await run_io(time.sleep, 0.5, timeout=0.1)
+        finally:
+            task.cancel()
+        return ticks
+
+    assert asyncio.run(run()) >= 5
+    assert executors.executor_stats()["io"]["workers"] >= 1
+
+def test_cpu_tasks_run_in_worker_processes():
+    try:
+        assert asyncio.run(run_cpu(os.getpid)) != os.getpid()
+        assert executors.executor_stats()["cpu"]["in_flight"] == 0
+    finally:
+        shutdown_executors()
+
+def test_cpu_pool_recovers_after_a_worker_dies():
+    async def run():
+        with pytest.raises(ExecutorBusyError):
+            await run_cpu(os._exit, 1)
+        return await run_cpu(os.getpid)
+
+    try:
+        assert asyncio.run(run()) != os.getpid()
+        assert executors.executor_stats()["cpu"]["in_flight"] == 0
+    finally:
+        shutdown_executors()
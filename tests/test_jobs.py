@@ -0,0 +1,89 @@
+import asyncio
+import threading
+
+import pytest
+from app.services import jobs, pipeline
+from app.services.executors import shutdown_executors
+from app.services.jobs import InMemoryJobStore, JobQueue, QueueFullError, SQLiteJobStore
+from app.services.pdf_ingest import IngestedUpload
+
+UPLOAD = IngestedUpload(filename="test.pdf", data=b"%PDF", sha256="abc", page_count=1)
+PARAMS = {"num_questions": 2, "question_type": "multiple_choice", "coverage": False, "num_words": 5, "num_sentences": 3, "summary_mode": "auto"}
+
+
+def test_job_runs_operations_and_reports_progress(monkeypatch):
+    async def fake_quiz(upload, num_questions, question_type, coverage):
+        await asyncio.sleep(0.01)
+        return [{"question": "Q?"}] * num_questions
+
+    async def failing_summary(upload, num_sentences, mode):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(pipeline, "quiz_for", fake_quiz)
+    monkeypatch.setattr(pipeline, "summary_for", failing_summary)
+
+    async def run():
+        queue = JobQueue(InMemoryJobStore(retention_seconds=60), num_workers=1, max_depth=4)
+        job = await queue.submit(UPLOAD, ["quiz", "summary"], PARAMS)
+        assert queue.store.get(job.id).status == "queued"
+        await queue._queue.join()
+        await queue.stop()
+        return queue.store.get(job.id).to_dict()
+
+    job = asyncio.run(run())
+    assert job["status"] == "completed"
+    assert job["progress"] == 1.0
+    assert job["results"]["quiz"] == [{"question": "Q?"}] * 2
+    assert job["stages"]["summary"]["status"] == "failed"
+    assert job["errors"]["summary"] == "model unavailable"
+
+def test_submit_rejects_when_queue_is_full():
+    async def run():
+        queue = JobQueue(InMemoryJobStore(retention_seconds=60), num_workers=0, max_depth=1)
+        await queue.submit(UPLOAD, ["quiz"], PARAMS)
+        with pytest.raises(QueueFullError):
+            await queue.submit(UPLOAD, ["quiz"], PARAMS)
+        await queue.stop()
+
+    asyncio.run(run())
+
+def test_sqlite_job_store_round_trip(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"), retention_seconds=60)
+    job = jobs.Job(id="job1", operations=["summary"], params=PARAMS, stages={"summary": {"status": "queued", "seconds": None}})
+    store.save(job)
+    job.status = "completed"
+    job.results["summary"] = "Short."
+    store.save(job)
+    loaded = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"), retention_seconds=60).get("job1")
+    assert loaded.to_dict() == job.to_dict()
+    assert store.get("missing") is None
+
+def test_queue_with_sqlite_store_saves_off_the_event_loop(tmp_path, monkeypatch):
+    async def fake_vocabulary(upload, num_words):
+        return [{"word": "river"}]
+
+    monkeypatch.setattr(pipeline, "vocabulary_for", fake_vocabulary)
+    loop_thread = []
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"), retention_seconds=60)
+    save = store.save
+
+    def recording_save(job):
+        loop_thread.append(threading.current_thread() is threading.main_thread())
+        save(job)
+
+    monkeypatch.setattr(store, "save", recording_save)
+
+    async def run():
+        queue = JobQueue(store, num_workers=1, max_depth=4)
+        job = await queue.submit(UPLOAD, ["vocabulary"], PARAMS)
+        await queue._queue.join()
+        await queue.stop()
+        return await queue.get(job.id)
+
+    try:
+        job = asyncio.run(run())
+    finally:
+        shutdown_executors()
+    assert job.status == "completed"
+    assert job.results["vocabulary"] == [{"word": "river"}]
+    assert loop_thread and not any(loop_thread)
@@ -0,0 +1,37 @@
+from app.utils.json_stream import JSONArrayStreamParser, extract_json_objects
+
+
+def test_parser_emits_objects_as_soon_as_they_close():
+    text = '```json\n[{"question": "Is {this} a [brace]?", "answer": "True"}, {"question": "Quote \\" inside", "options": ["a", "b"]}, {"bad": }, {"q": 3}]\n```'
+    parser = JSONArrayStreamParser()
+    emitted = []
+    for i in range(0, len(text), 7):
+        emitted.append(parser.feed(text[i:i + 7]))
+    items = [item for batch in emitted for item in batch]
+    assert items == [
+        {"question": "Is {this} a [brace]?", "answer": "True"},
+        {"question": 'Quote " inside', "options": ["a", "b"]},
+        {"q": 3},
+    ]
+    # the first object is available before the whole array has arrived
+    first_batch = next(i for i, batch in enumerate(emitted) if batch)
+    assert first_batch < len(emitted) // 2
+
+
+def test_extract_salvages_objects_around_broken_json():
+    text = (
+        'Sure! Here are your questions:\n```json\n'
+        '[{"question": "One", "answer": "True",}, {"question": "Two" "answer": "False"}, '
+        '{"question": "Three", "options": ["a", "b",], "answer": "a"},\n'
+        '```\nLet me know if you need more.'
+    )
+    assert extract_json_objects(text) == [
+        {"question": "One", "answer": "True"},
+        {"question": "Three", "options": ["a", "b"], "answer": "a"},
+    ]
+
+
+def test_extract_accepts_bare_and_wrapped_objects():
+    assert extract_json_objects('{"word": "a"}\n{"word": "b"}') == [{"word": "a"}, {"word": "b"}]
+    assert extract_json_objects('{"questions": [{"q": 1}, {"q": 2}]}') == [{"q": 1}, {"q": 2}]
+    assert extract_json_objects("No JSON here.") == []
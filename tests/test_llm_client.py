@@ -0,0 +1,132 @@
+import asyncio
+import time
+
+import pytest
+from app.services import llm_client
+from app.services.llm_client import generate_content
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+class SlowModel:
+    def __init__(self, delay):
+        self.delay = delay
+
+    def generate_content(self, prompt, request_options=None):
+        time.sleep(self.delay)
+        return FakeResponse(f"echo: {prompt}")
+
+def test_generate_content_does_not_block_event_loop(monkeypatch):
+    monkeypatch.setitem(llm_client._models, "slow", SlowModel(0.2))
+
+    async def run():
+        started = time.perf_counter()
+        results = await asyncio.gather(*(generate_content("slow", f"p{i}") for i in range(5)))
+        return results, time.perf_counter() - started
+
+    results, elapsed = asyncio.run(run())
+    assert results == [f"echo: p{i}" for i in range(5)]
+    assert elapsed < 0.8 # calls overlap instead of running back to back
+
+def test_generate_content_timeout(monkeypatch):
+    monkeypatch.setitem(llm_client._models, "slower", SlowModel(0.5))
+    with pytest.raises(TimeoutError):
+        asyncio.run(generate_content("slower", "prompt", timeout=0.05))
+
+class StreamingModel:
+    def __init__(self, chunks, delay):
+        self.chunks = chunks
+        self.delay = delay
+
+    def generate_content(self, prompt, stream=False, request_options=None):
+        for chunk in self.chunks:
+            time.sleep(self.delay)
+            yield FakeResponse(chunk)
+
+def test_stream_content_yields_chunks_as_they_arrive(monkeypatch):
+    monkeypatch.setitem(llm_client._models, "streaming", StreamingModel(["[{", "}, ", "{}]"], 0.1))
+
+    async def run():
+        started = time.perf_counter()
+        arrivals = []
+        async for chunk in llm_client.stream_content("streaming", "prompt"):
+            arrivals.append((chunk, time.perf_counter() - started))
+        return arrivals
+
+    arrivals = asyncio.run(run())
+    assert [chunk for chunk, _ in arrivals] == ["[{", "}, ", "{}]"]
+    assert arrivals[0][1] < 0.25 # first chunk is delivered before the stream finishes
+
+class FlakyModel:
+    """Fails with a retryable error `failures` times, then answers."""
+
+    def __init__(self, failures, error):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def generate_content(self, prompt, request_options=None):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return FakeResponse("ok")
+
+class ProviderError(Exception):
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+def test_generate_content_retries_transient_errors(monkeypatch):
+    monkeypatch.setattr(llm_client, "LLM_BACKOFF_BASE_SECONDS", 0.01)
+    model = FlakyModel(2, ProviderError(429))
+    monkeypatch.setitem(llm_client._models, "flaky", model)
+    assert asyncio.run(generate_content("flaky", "prompt")) == "ok"
+    assert model.calls == 3
+
+def test_generate_content_does_not_retry_client_errors(monkeypatch):
+    model = FlakyModel(1, ProviderError(400))
+    monkeypatch.setitem(llm_client._models, "bad-request", model)
+    with pytest.raises(ProviderError):
+        asyncio.run(generate_content("bad-request", "prompt"))
+    assert model.calls == 1
+
+def test_circuit_breaker_fails_fast_while_provider_is_down(monkeypatch):
+    monkeypatch.setattr(llm_client, "LLM_MAX_RETRIES", 0)
+    monkeypatch.setattr(llm_client, "_breakers", {})
+    monkeypatch.setattr(llm_client, "LLM_BREAKER_FAILURE_THRESHOLD", 2)
+    model = FlakyModel(100, ProviderError(503))
+    monkeypatch.setitem(llm_client._models, "down", model)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(ProviderError):
+                await generate_content("down", "prompt")
+        with pytest.raises(llm_client.CircuitOpenError):
+            await generate_content("down", "prompt")
+
+    asyncio.run(run())
+    assert model.calls == 2
+
+def test_slow_call_is_hedged(monkeypatch):
+    monkeypatch.setattr(llm_client, "LLM_HEDGE_AFTER_SECONDS", 0.05)
+
+    class FirstCallSlow:
+        calls = 0
+
+        def generate_content(self, prompt, request_options=None):
+            FirstCallSlow.calls += 1
+            time.sleep(0.5 if FirstCallSlow.calls == 1 else 0.01)
+            return FakeResponse(f"call {FirstCallSlow.calls}")
+
+    monkeypatch.setitem(llm_client._models, "hedged", FirstCallSlow())
+
+    async def run():
+        started = time.perf_counter()
+        text = await generate_content("hedged", "prompt")
+        return text, time.perf_counter() - started
+
+    text, elapsed = asyncio.run(run())
+    assert text == "call 2"
+    assert elapsed < 0.3
@@ -0,0 +1,59 @@
+import asyncio
+import random
+import time
+
+import pytest
+from app.services.llm_resilience import CircuitBreaker, CircuitOpenError, TokenBucket, backoff_delay, is_retryable
+
+
+class CodedError(Exception):
+    def __init__(self, code):
+        self.code = code
+
+
+def test_is_retryable():
+    assert is_retryable(TimeoutError())
+    assert is_retryable(CodedError(429))
+    assert is_retryable(CodedError(503))
+    assert not is_retryable(CodedError(400))
+    assert not is_retryable(ValueError("bad json"))
+    assert not is_retryable(CircuitOpenError())
+
+
+def test_backoff_delay_is_capped_and_jittered():
+    rng = random.Random(0)
+    delays = [backoff_delay(attempt, base=0.5, cap=2.0, rng=rng) for attempt in range(10)]
+    assert all(0 <= d <= 2.0 for d in delays)
+    assert delays[0] <= 0.5
+    assert len(set(delays)) == len(delays)
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=20, capacity=2)
+
+    async def run():
+        started = time.monotonic()
+        for _ in range(4):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    # Two tokens are available at once; the other two take 1/20 s each
+    assert 0.08 <= asyncio.run(run()) < 0.5
+    assert not bucket.try_acquire()
+
+
+def test_circuit_breaker_opens_then_half_opens():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.05)
+    breaker.allow()
+    breaker.record_failure()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+    time.sleep(0.06)
+    breaker.allow() # the single half-open trial
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.allow()
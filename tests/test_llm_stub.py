@@ -0,0 +1,48 @@
+import asyncio
+import json
+
+import pytest
+from app.services import llm_client
+from app.services.llm_stub import StubFailureError, StubModel
+from app.services.question_gen import generate_quiz_questions
+from app.services.text_summarizer import summarize_text
+
+TEXT = "Volcanoes form where magma reaches the surface. Eruptions reshape landscapes. Ash clouds disrupt flights."
+
+
+def test_tests_run_against_the_stub_provider():
+    assert llm_client.LLM_PROVIDER == "stub"
+    assert isinstance(llm_client.get_model("gemini-2.0-flash"), StubModel)
+
+
+def test_stub_quiz_passes_validation():
+    questions = asyncio.run(generate_quiz_questions(TEXT * 5, num_questions=4, question_type="multiple_choice"))
+    assert len(questions) == 4
+    assert all(len(q["options"]) == 4 and q["answer"] in q["options"] for q in questions)
+
+
+def test_stub_summary_uses_requested_sentence_count():
+    summary = asyncio.run(summarize_text(TEXT, num_sentences=2, mode="truncate"))
+    assert summary == "Volcanoes form where magma reaches the surface. Eruptions reshape landscapes."
+
+
+def test_stub_vocabulary_returns_listed_words():
+    prompt = "identify the 2 most important and relevant vocabulary words from this list: magma, ash, eruption.\n"
+    vocabulary = json.loads(StubModel("m").generate_content(prompt).text)
+    assert [item["word"] for item in vocabulary] == ["magma", "ash"]
+    assert all(item["definition"] and item["part_of_speech"] for item in vocabulary)
+
+
+def test_stub_is_deterministic_and_streams_the_same_text():
+    model = StubModel("m")
+    prompt = f"Generate 3 true false questions about the following text.\nText to generate questions from:\n{TEXT}"
+    text = model.generate_content(prompt).text
+    assert text == StubModel("m").generate_content(prompt).text
+    assert "".join(chunk.text for chunk in model.generate_content(prompt, stream=True)) == text
+
+
+def test_stub_failure_injection_and_timeout():
+    with pytest.raises(StubFailureError):
+        StubModel("m", failure_rate=1.0).generate_content("Summarize this.")
+    with pytest.raises(TimeoutError):
+        StubModel("m", latency=0.2).generate_content("Summarize this.", request_options={"timeout": 0.01})
@@ -0,0 +1,49 @@
+from fastapi.testclient import TestClient
+
+from app.services.metrics import Counter, Histogram, render
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_seconds", "Test histogram.", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, stage="a")
+
+    lines = histogram.render()
+    assert 'test_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{stage="a",le="1.0"} 3' in lines
+    assert 'test_seconds_bucket{stage="a",le="+Inf"} 4' in lines
+    assert 'test_seconds_count{stage="a"} 4' in lines
+
+
+def test_counter_escapes_label_values():
+    counter = Counter("test_total", "Test counter.", ("name",))
+    counter.inc(name='say "hi"')
+    counter.inc(2, name='say "hi"')
+    assert 'test_total{name="say \\"hi\\""} 3' in counter.render()
+
+
+def test_render_includes_cache_ratios():
+    cache_stats = {"namespaces": {"quiz": {"hits": 3, "misses": 1}}, "entries": 4}
+    text = render(cache_stats)
+    assert 'cache_requests_total{namespace="quiz",result="hit"} 3' in text
+    assert 'cache_hit_ratio{namespace="quiz"} 0.75' in text
+
+
+def test_metrics_endpoint_reports_request_stage_and_llm_metrics(make_pdf):
+    from app.main import app
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/summarize-text/",
+            files={"file": ("a.pdf", make_pdf(["Metrics make slow stages visible."]), "application/pdf")},
+            data={"mode": "truncate"},
+        )
+        assert response.status_code == 200
+        text = client.get("/api/metrics").text
+
+    assert 'http_requests_total{endpoint="/api/summarize-text/",method="POST",status="200"}' in text
+    assert 'pipeline_stage_duration_seconds_count{stage="upload_read"}' in text
+    assert 'pipeline_stage_duration_seconds_count{stage="llm_call"}' in text
+    assert 'llm_calls_total{model="gemini-2.0-flash",outcome="ok"}' in text
+    assert 'llm_tokens_total{model="gemini-2.0-flash",direction="prompt"}' in text
+    assert "job_queue_depth 0" in text
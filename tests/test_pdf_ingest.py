@@ -0,0 +1,33 @@
+import asyncio
+import hashlib
+import io
+
+import pytest
+from fastapi import UploadFile
+from app.services.pdf_ingest import InvalidPDFError, UploadTooLargeError, read_upload
+
+
+def make_upload(data: bytes, size=None) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename="test.pdf", size=size)
+
+def test_read_upload_hashes_and_counts_pages(make_pdf):
+    data = make_pdf(3)
+    upload = asyncio.run(read_upload(make_upload(data)))
+    assert upload.data == data
+    assert upload.sha256 == hashlib.sha256(data).hexdigest()
+    assert upload.page_count == 3
+
+def test_read_upload_rejects_too_many_bytes(make_pdf):
+    data = make_pdf(1)
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(read_upload(make_upload(data), max_bytes=len(data) - 1))
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(read_upload(make_upload(b"", size=10_000), max_bytes=100)) # declared size checked before reading
+
+def test_read_upload_rejects_too_many_pages(make_pdf):
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(read_upload(make_upload(make_pdf(3)), max_pages=2))
+
+def test_read_upload_rejects_non_pdf():
+    with pytest.raises(InvalidPDFError):
+        asyncio.run(read_upload(make_upload(b"not a pdf at all")))
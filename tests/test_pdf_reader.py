@@ -0,0 +1,35 @@
+import asyncio
+
+from app.services import pdf_reader
+from app.services.executors import shutdown_executors
+from app.services.metrics import STAGE_SECONDS
+from app.services.pdf_reader import _split_range, extract_clean_text, extract_clean_text_in_pool
+
+
+def test_split_range_covers_all_pages():
+    ranges = _split_range(0, 10, 3)
+    assert ranges == [(0, 4), (4, 7), (7, 10)]
+    assert _split_range(2, 4, 8) == [(2, 3), (3, 4)]
+
+def test_extract_clean_text_pages_and_cutoff(make_pdf):
+    data = make_pdf(5)
+    assert extract_clean_text(data, page_numbers=[1, 2]) == "Page 2 text. Page 3 text."
+    assert extract_clean_text(data, max_chars=6) == "Page 1"
+
+def stage_count(name: str) -> int:
+    prefix = f'pipeline_stage_duration_seconds_count{{stage="{name}"}} '
+    return next((int(line[len(prefix):]) for line in STAGE_SECONDS.render() if line.startswith(prefix)), 0)
+
+
+def test_parallel_extraction_matches_sequential(monkeypatch, make_pdf):
+    data = make_pdf(6)
+    sequential = extract_clean_text(data)
+    monkeypatch.setattr(pdf_reader, "NUM_WORKERS", 2)
+    monkeypatch.setattr(pdf_reader, "PDF_PARALLEL_MIN_PAGES", 2)
+    cleaning_before = stage_count("text_cleaning")
+    try:
+        assert asyncio.run(extract_clean_text_in_pool(data, 6)) == sequential
+    finally:
+        shutdown_executors()
+    # The preprocessing task after a parallel extraction is timed on its own
+    assert stage_count("text_cleaning") == cleaning_before + 1
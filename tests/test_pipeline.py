@@ -0,0 +1,40 @@
+import asyncio
+
+from app.services.pipeline import run_stages
+
+
+def test_run_stages_cancels_stages_past_the_deadline():
+    cancelled = []
+
+    async def fast():
+        return "quiz"
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    results, timings, timed_out, errors = asyncio.run(run_stages({"fast": fast(), "slow": slow()}, deadline=0.1))
+    assert results == {"fast": "quiz"}
+    assert timed_out == ["slow"] and cancelled
+    assert set(timings) == {"fast"}
+    assert errors == {}
+
+def test_run_stages_keeps_other_results_when_a_stage_fails():
+    async def ok():
+        await asyncio.sleep(0.01)
+        return [1, 2]
+
+    async def failing():
+        raise LookupError("wordnet missing")
+
+    async def also_failing():
+        raise RuntimeError("model unavailable")
+
+    results, timings, timed_out, errors = asyncio.run(run_stages({"ok": ok(), "bad": failing(), "worse": also_failing()}))
+    assert results == {"ok": [1, 2]}
+    assert timed_out == []
+    assert {name: type(e) for name, e in errors.items()} == {"bad": LookupError, "worse": RuntimeError}
+    assert set(timings) == {"ok", "bad", "worse"}
@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routes import process
+from app.services import llm_client, question_gen
+
+
+def post_quiz(make_pdf, **data):
+    with TestClient(app) as client:
+        return client.post(
+            "/api/generate-quiz/",
+            files={"file": ("forest.pdf", make_pdf(["The rainforest is large. A river flows through it."]), "application/pdf")},
+            data=data,
+        )
+
+
+def stream_quiz(make_pdf, text, **data):
+    """Posts to the SSE route and returns its events as (event, data) pairs."""
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/generate-quiz/stream",
+            files={"file": ("forest.pdf", make_pdf([text]), "application/pdf")},
+            data=data,
+        )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        event_line, data_line = block.split("\n")
+        events.append((event_line.removeprefix("event: "), json.loads(data_line.removeprefix("data: "))))
+    return events
+
+
+def test_generate_quiz_returns_both_stages(monkeypatch, make_pdf, make_question):
+    async def fake_quiz(upload, num_questions, question_type, coverage):
+        return [make_question("Which river flows through the rainforest?")]
+
+    async def fake_vocabulary(upload, num_words):
+        return [{"word": "rainforest", "definition": "A dense forest.", "part_of_speech": "noun"}]
+
+    monkeypatch.setattr(process, "quiz_for", fake_quiz)
+    monkeypatch.setattr(process, "vocabulary_for", fake_vocabulary)
+    response = post_quiz(make_pdf, num_questions="1")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["questions"] == [make_question("Which river flows through the rainforest?")]
+    assert body["vocabulary"][0]["word"] == "rainforest"
+    assert body["timed_out"] == [] and body["errors"] == {}
+    assert set(body["timings"]) == {"questions", "vocabulary", "total"}
+
+def test_generate_quiz_returns_partial_results_on_failure_or_timeout(monkeypatch, make_pdf, make_question):
+    async def fake_quiz(upload, num_questions, question_type, coverage):
+        return [make_question("Which river flows through the rainforest?")]
+
+    async def failing_vocabulary(upload, num_words):
+        raise LookupError("wordnet missing")
+
+    async def slow_vocabulary(upload, num_words):
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(process, "quiz_for", fake_quiz)
+    monkeypatch.setattr(process, "vocabulary_for", failing_vocabulary)
+    body = post_quiz(make_pdf).json()
+    assert len(body["questions"]) == 1
+    assert body["vocabulary"] == []
+    assert body["errors"] == {"vocabulary": "wordnet missing"}
+
+    monkeypatch.setattr(process, "vocabulary_for", slow_vocabulary)
+    monkeypatch.setattr(process, "QUIZ_DEADLINE_SECONDS", 0.2)
+    body = post_quiz(make_pdf).json()
+    assert len(body["questions"]) == 1
+    assert body["vocabulary"] == []
+    assert body["timed_out"] == ["vocabulary"]
+
+def test_generate_quiz_rejects_unsupported_question_type(make_pdf):
+    response = post_quiz(make_pdf, question_type="short_answer")
+    assert response.status_code == 400
+
+
+def test_generate_quiz_stream_emits_questions_then_done(make_pdf):
+    events = stream_quiz(make_pdf, "Glaciers carve valleys. Meltwater feeds the lakes below.", num_questions="3")
+    names = [name for name, _ in events]
+    assert names == ["question", "question", "question", "done"]
+    assert all(data["type"] == "multiple_choice" for _, data in events[:3])
+    assert events[-1][1]["count"] == 3
+
+
+def test_generate_quiz_stream_emits_error_when_the_model_stream_fails(monkeypatch, make_pdf):
+    async def failing_stream(model_name, prompt, timeout=None):
+        # Enough of the stub's answer for the first question, then the connection drops
+        sent = ""
+        async for chunk in llm_client.stream_content(model_name, prompt, timeout):
+            sent += chunk
+            yield chunk
+            if sent.count("}") >= 1:
+                raise ConnectionError("stream reset")
+
+    monkeypatch.setattr(question_gen, "stream_content", failing_stream)
+    events = stream_quiz(make_pdf, "Volcanoes erupt lava. Ash clouds drift for miles.", num_questions="3")
+    names = [name for name, _ in events]
+    assert names[0] == "question"
+    assert names[-1] == "error" and "done" not in names
+    assert "stream reset" in events[-1][1]["detail"]
@@ -0,0 +1,46 @@
+from app.services import prompt_budget
+from app.services.prompt_budget import _parse_budgets, calibrate, estimate_tokens, fit_text, split_text
+
+
+def test_estimate_counts_dense_text_higher_than_prose():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("The river flows through the forest.") == 7
+    # numbers and non-Latin scripts take more tokens per character than English words
+    assert estimate_tokens("31415926535") > estimate_tokens("photosynthesis")
+    assert estimate_tokens("光合作用") == 4
+
+def test_fit_text_keeps_whole_sentences():
+    text = "The Amazon is a river. It flows through the rainforest. It is very long."
+    assert fit_text(text, 13) == "The Amazon is a river. It flows through the rainforest."
+    assert fit_text(text, 12) == "The Amazon is a river."
+    assert fit_text(text, 100) == text
+
+def test_fit_text_cuts_a_sentence_only_when_the_budget_would_stay_mostly_empty():
+    words = " ".join(f"word{i}" for i in range(100))
+    assert fit_text(words, 10) == " ".join(f"word{i}" for i in range(5))
+
+def test_split_text_respects_budget():
+    text = " ".join(f"Sentence number {i} is here." for i in range(50))
+    chunks = split_text(text, 30)
+    assert " ".join(chunks) == text
+    assert all(estimate_tokens(chunk) <= 30 for chunk in chunks)
+    assert all(chunk.endswith(".") for chunk in chunks)
+
+def test_budgets_prefer_purpose_then_model(monkeypatch):
+    budgets = _parse_budgets("gemini-2.0-flash=4000, quiz:gemini-1.5-pro=1500,broken,x=abc")
+    assert budgets == {"gemini-2.0-flash": 4000, "quiz:gemini-1.5-pro": 1500}
+    monkeypatch.setattr(prompt_budget, "_budgets", budgets)
+    assert prompt_budget.token_budget("quiz", "gemini-1.5-pro", 2000) == 1500
+    assert prompt_budget.token_budget("summary", "gemini-1.5-pro", 2000) == 2000
+    assert prompt_budget.token_budget("summary", "gemini-2.0-flash", 1000) == 4000
+
+def test_reported_counts_calibrate_estimates(monkeypatch):
+    monkeypatch.setattr(prompt_budget, "_ratios", {})
+    prompt = "The river flows through the forest. " * 20
+    estimated = estimate_tokens(prompt, "test-model")
+    calibrate("test-model", prompt, estimated * 3 // 2)
+    assert estimate_tokens(prompt, "test-model") == estimated * 3 // 2
+    assert estimate_tokens(prompt, "other-model") == estimated
+    # tiny prompts are dominated by overhead and are not used for calibration
+    calibrate("tiny-model", "Hello.", 50)
+    assert "tiny-model" not in prompt_budget._ratios
@@ -1,4 +1,7 @@
+import asyncio
+
 import pytest
+from app.services import question_gen
 from app.services.question_gen import generate_quiz_questions
 
 # Sample text for testing
@@ -10,14 +13,14 @@ Deforestation is a major threat to this unique ecosystem.
 """
 
 def test_generate_short_answer_questions():
-    questions = generate_quiz_questions(TEST_TEXT, num_questions=2, question_type="short_answer")
+    questions = asyncio.run(generate_quiz_questions(TEST_TEXT, num_questions=2, question_type="short_answer"))
     assert len(questions) <= 2 # Might generate less if text is too short
     if questions:
         assert all(q['type'] == 'short_answer' for q in questions)
         assert all('question' in q and 'answer' in q for q in questions)
 
 def test_generate_multiple_choice_questions():
-    questions = generate_quiz_questions(TEST_TEXT, num_questions=2, question_type="multiple_choice")
+    questions = asyncio.run(generate_quiz_questions(TEST_TEXT, num_questions=2, question_type="multiple_choice"))
     assert len(questions) <= 2
     if questions:
         assert all(q['type'] == 'multiple_choice' for q in questions)
@@ -25,7 +28,7 @@ def test_generate_multiple_choice_questions():
         assert all(len(q['options']) == 4 for q in questions) # Expect 4 options
 
 def test_generate_true_false_questions():
-    questions = generate_quiz_questions(TEST_TEXT, num_questions=2, question_type="true_false")
+    questions = asyncio.run(generate_quiz_questions(TEST_TEXT, num_questions=2, question_type="true_false"))
     assert len(questions) <= 2
     if questions:
         assert all(q['type'] == 'true_false' for q in questions)
@@ -33,9 +36,111 @@ def test_generate_true_false_questions():
         assert all(q['answer'] in ["True", "False"] for q in questions)
 
 def test_empty_text():
-    questions = generate_quiz_questions("", num_questions=1, question_type="short_answer")
+    questions = asyncio.run(generate_quiz_questions("", num_questions=1, question_type="short_answer"))
     assert questions == []
 
 def test_unsupported_question_type():
-    questions = generate_quiz_questions(TEST_TEXT, num_questions=1, question_type="unsupported")
-    assert questions == []
\ No newline at end of file
+    questions = asyncio.run(generate_quiz_questions(TEST_TEXT, num_questions=1, question_type="unsupported"))
+    assert questions == []
+
+def test_deduplicate_drops_near_identical_questions(make_question):
+    questions = [
+        make_question("What is the largest rainforest in the world?"),
+        make_question("What is the largest rainforest in the world"),
+        make_question("Which river flows through the rainforest?"),
+    ]
+    assert [q["question"] for q in question_gen._deduplicate(questions)] == [
+        "What is the largest rainforest in the world?",
+        "Which river flows through the rainforest?",
+    ]
+
+def test_coverage_spreads_questions_and_tops_up(monkeypatch, make_question):
+    calls = []
+
+    async def fake_request(segment, count, question_type, avoid_questions=None):
+        calls.append((segment[:12], count, avoid_questions))
+        if avoid_questions is not None: # top-up call
+            return [make_question(f"Top-up question {i}?") for i in range(count)]
+        # every segment answers with one question fewer than asked for
+        return [make_question(f"{segment[:12]} question {i}?") for i in range(count - 1)]
+
+    monkeypatch.setattr(question_gen, "_request_questions", fake_request)
+    text = " ".join(f"Segment{i:03d} sentence." for i in range(3000))
+    questions = asyncio.run(generate_quiz_questions(text, num_questions=12, question_type="multiple_choice", coverage=True))
+    assert len(questions) == 12
+    segment_calls = [c for c in calls if c[2] is None]
+    assert len(segment_calls) == 8 # min(num_questions, ceil(total_tokens / QUIZ_PROMPT_TOKENS), QUIZ_MAX_SEGMENTS) segments
+    assert len({segment for segment, _, _ in segment_calls}) == 8
+    assert len(calls) == 9 # a single top-up call for the dropped questions
+    assert calls[-1][1] == 8 # quotas 2,2,2,2,1,1,1,1 came back one short each
+
+def test_coverage_segments_reach_the_end_of_the_text():
+    text = " ".join(f"Sentence number {i} talks about topic {i % 97} in some detail." for i in range(20000))
+    segments = question_gen._segment_text(text, num_questions=8, coverage=True)
+    assert len(segments) == 8
+    assert " ".join(segments) == text
+    assert text.endswith(segments[-1])
+
+def test_stream_quiz_questions_yields_valid_questions_incrementally(monkeypatch):
+    chunks = [
+        'Here you go: [{"question": "What is the largest rainforest?", "options": ["a", "b", "c", "d"], ',
+        '"answer": "a", "type": "multiple_choice", "explanation": "e"}, {"question": "broken"}, ',
+        '{"question": "What is the largest rainforest", "options": ["a", "b", "c", "d"], "answer": "a", "type": "multiple_choice", "explanation": "e"}, ',
+        '{"question": "Which river flows through it?", "options": ["a", "b", "c", "d"], "answer": "b", "type": "multiple_choice", "explanation": "e"}]',
+    ]
+
+    async def fake_stream(model_name, prompt, timeout=None):
+        for chunk in chunks:
+            yield chunk
+
+    async def fake_request(*args, **kwargs):
+        raise AssertionError("no top-up expected")
+
+    monkeypatch.setattr(question_gen, "stream_content", fake_stream)
+    monkeypatch.setattr(question_gen, "_request_questions", fake_request)
+
+    async def run():
+        return [q async for q in question_gen.stream_quiz_questions(TEST_TEXT, 2, "multiple_choice")]
+
+    questions = asyncio.run(run())
+    assert [q["question"] for q in questions] == ["What is the largest rainforest?", "Which river flows through it?"]
+
+def test_stream_quiz_questions_raises_when_the_stream_fails(monkeypatch):
+    async def failing_stream(model_name, prompt, timeout=None):
+        yield '[{"question": "What is the largest rainforest?", "options": ["a", "b", "c", "d"], "answer": "a", "type": "multiple_choice", "explanation": "e"}, '
+        raise RuntimeError("connection reset")
+
+    async def fake_request(*args, **kwargs):
+        raise AssertionError("no top-up expected")
+
+    monkeypatch.setattr(question_gen, "stream_content", failing_stream)
+    monkeypatch.setattr(question_gen, "_request_questions", fake_request)
+    received = []
+
+    async def run():
+        async for q in question_gen.stream_quiz_questions(TEST_TEXT, 3, "multiple_choice"):
+            received.append(q)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+    assert [q["question"] for q in received] == ["What is the largest rainforest?"]
+
+def test_request_questions_keeps_valid_items_from_a_broken_reply(monkeypatch):
+    reply = (
+        "Here you go:\n"
+        + '[{"question": "Q1?", "options": ["a", "b", "c", "d"], "answer": "a", "type": "multiple_choice", "explanation": "e",},'
+        + ' {"question": "Q2?", "options": ["a", "b"], "answer": "a", "type": "multiple_choice", "explanation": "e"},'
+        + ' {"question": "Q3?", "options": ["a", "b", "c", "d"], "answer": "b", "type": "multiple_choice", "explanation": "e", "extra": 1},'
+        + ' {"question": "Q4?", "options": ['
+    )
+
+    async def fake_generate_content(model_name, prompt, timeout=None):
+        return reply
+
+    monkeypatch.setattr(question_gen, "generate_content", fake_generate_content)
+    questions = asyncio.run(question_gen._request_questions(TEST_TEXT, 4, "multiple_choice"))
+    assert [q["question"] for q in questions] == ["Q1?", "Q3?"]
+    assert "extra" not in questions[1]
+
+    reply = "I cannot help with that."
+    assert asyncio.run(question_gen._request_questions(TEST_TEXT, 1, "multiple_choice")) is None
@@ -0,0 +1,92 @@
+import asyncio
+import json
+from collections import Counter
+
+import pytest
+from app.services import llm_client, pipeline, question_gen, study_pack, text_summarizer, vocab_extractor
+from app.services.documents import DocumentStore
+from app.services.study_pack import parse_study_pack
+
+TEXT = "Volcanoes form where magma reaches the surface. Eruptions reshape landscapes. Ash clouds disrupt flights."
+PARAMS = {"num_questions": 2, "question_type": "multiple_choice", "coverage": False, "num_words": 2, "num_sentences": 2, "summary_mode": "auto"}
+COUNTS = Counter({"magma": 3, "eruption": 2, "ash": 2})
+
+
+def stored_document(tmp_path, document_id):
+    store = DocumentStore(str(tmp_path / "documents.sqlite3"), max_bytes=0)
+    return store.put(document_id, "volcanoes.pdf", [TEXT], COUNTS)
+
+
+def forbid_individual_calls(monkeypatch):
+    async def fail(*args, **kwargs):
+        pytest.fail("individual call made")
+
+    for module in (question_gen, vocab_extractor, text_summarizer):
+        monkeypatch.setattr(module, "generate_content", fail)
+
+
+def test_parse_study_pack_salvages_each_section():
+    reply = """```json
+    {"questions": [{"question": "Q1?", "answer": "a",}, {"question": "broken" "answer"}],
+     "vocabulary": [{"word": "magma", "definition": "Molten rock.", "part_of_speech": "noun"}],
+     "summary": "Volcanoes form where magma\\nreaches the surface."}
+    ```"""
+    sections = parse_study_pack(reply)
+    assert sections["questions"] == [{"question": "Q1?", "answer": "a"}]
+    assert sections["vocabulary"][0]["word"] == "magma"
+    assert sections["summary"] == "Volcanoes form where magma\nreaches the surface."
+
+
+def test_study_pack_uses_one_call_for_all_sections(tmp_path, monkeypatch):
+    calls = []
+
+    async def counting_generate_content(model_name, prompt, timeout=None):
+        calls.append(prompt)
+        return await llm_client.generate_content(model_name, prompt, timeout)
+
+    monkeypatch.setattr(study_pack, "generate_content", counting_generate_content)
+    forbid_individual_calls(monkeypatch)
+    document = stored_document(tmp_path, "pack-one-call")
+
+    outcome = asyncio.run(pipeline.study_pack_for(document, ["quiz", "vocabulary", "summary"], PARAMS))
+    assert len(calls) == 1
+    assert calls[0].count(TEXT) == 1
+    assert outcome["sources"] == {"quiz": "combined", "vocabulary": "combined", "summary": "combined"}
+    assert len(outcome["results"]["quiz"]) == 2
+    assert [item["word"] for item in outcome["results"]["vocabulary"]] == ["magma", "eruption"]
+    assert outcome["results"]["summary"] == "Volcanoes form where magma reaches the surface. Eruptions reshape landscapes."
+    assert outcome["errors"] == {}
+
+    # the sections are cached like the operations' own results
+    again = asyncio.run(pipeline.study_pack_for(document, ["quiz", "summary"], PARAMS))
+    assert len(calls) == 1
+    assert again["sources"] == {"quiz": "cache", "summary": "cache"}
+
+
+def test_study_pack_falls_back_only_for_missing_sections(tmp_path, monkeypatch, make_question):
+    async def partial_reply(model_name, prompt, timeout=None):
+        return json.dumps({
+            "questions": [make_question("How does magma reach the surface?"), {"question": "no options"}],
+            "vocabulary": [{"word": "magma", "definition": "Molten rock.", "part_of_speech": "noun"}],
+        })
+
+    requests = []
+
+    async def fake_request_questions(cleaned_text, num_questions, question_type, avoid_questions=None):
+        requests.append((num_questions, avoid_questions))
+        return [make_question("What do ash clouds disrupt?")]
+
+    async def fake_summarize(text, num_sentences, mode):
+        return "A summary."
+
+    monkeypatch.setattr(study_pack, "generate_content", partial_reply)
+    forbid_individual_calls(monkeypatch)
+    monkeypatch.setattr(question_gen, "_request_questions", fake_request_questions)
+    monkeypatch.setattr(pipeline, "summarize_text", fake_summarize)
+    document = stored_document(tmp_path, "pack-fallback")
+
+    outcome = asyncio.run(pipeline.study_pack_for(document, ["quiz", "vocabulary", "summary"], PARAMS))
+    assert requests == [(1, ["How does magma reach the surface?"])]
+    assert [q["question"] for q in outcome["results"]["quiz"]] == ["How does magma reach the surface?", "What do ash clouds disrupt?"]
+    assert outcome["results"]["summary"] == "A summary."
+    assert outcome["sources"] == {"quiz": "combined", "vocabulary": "combined", "summary": "individual"}
@@ -0,0 +1,40 @@
+from app.utils.text_cleaner import iter_clean_pages, iter_distinct_pages, normalize_whitespace, sample_page_numbers, take_chars
+
+
+def test_normalize_whitespace():
+    assert normalize_whitespace("  The  Amazon\n\nrainforest\t") == "The Amazon rainforest"
+
+def test_take_chars_stops_pulling_pages_at_budget():
+    pulled = []
+
+    def pages():
+        for i in range(100):
+            pulled.append(i)
+            yield f"page {i}\n  text"
+
+    text = take_chars(iter_clean_pages(pages()), 30)
+    assert text == "page 0 text page 1 text page 2"
+    assert len(pulled) == 3
+
+def test_take_chars_drains_stream_without_budget():
+    assert take_chars(iter_clean_pages(["a  b", "   ", "c"])) == "a b c"
+
+def test_repeated_headers_and_footers_are_stripped():
+    pages = [
+        f"Biology Handbook\nChapter {i} covers topic {i} and its many details in depth.\nPage {i + 1}"
+        for i in range(5)
+    ]
+    cleaned = list(iter_distinct_pages(pages))
+    assert cleaned == [f"Chapter {i} covers topic {i} and its many details in depth." for i in range(5)]
+
+def test_near_duplicate_pages_are_dropped():
+    body = " ".join(f"word{i}" for i in range(200))
+    pages = [body, "A different page about rivers and forests.", body + " extra", body]
+    cleaned = list(iter_distinct_pages(pages))
+    assert cleaned == [body, "A different page about rivers and forests.", "", ""]
+
+def test_sample_page_numbers_spreads_over_document():
+    assert sample_page_numbers(5, 10) == [0, 1, 2, 3, 4]
+    sample = sample_page_numbers(100, 4)
+    assert sample == sorted(sample) and len(sample) == 4
+    assert sample[0] < 25 <= sample[1] < 50 <= sample[2] < 75 <= sample[3]
@@ -0,0 +1,72 @@
+import asyncio
+
+from app.services import llm_client, text_summarizer
+from app.services.cache import MemoryCache
+from app.services.text_summarizer import summarize_text
+
+TEXT = " ".join(f"Sentence {i} explains how the river delta changes in season {i}." for i in range(60))
+
+
+def record_calls(monkeypatch, chunk_tokens=200, max_concurrency=4):
+    """Gives the summarizer a fresh cache and small chunks, and records its stub model calls."""
+    calls = {"prompts": [], "in_flight": 0, "max_in_flight": 0}
+
+    async def recording_generate_content(model_name, prompt, timeout=None):
+        calls["prompts"].append(prompt)
+        calls["in_flight"] += 1
+        calls["max_in_flight"] = max(calls["max_in_flight"], calls["in_flight"])
+        try:
+            await asyncio.sleep(0.01)
+            return await llm_client.generate_content(model_name, prompt, timeout)
+        finally:
+            calls["in_flight"] -= 1
+
+    cache = MemoryCache(max_entries=100, max_bytes=1024 * 1024, ttl_seconds=0)
+    monkeypatch.setattr(text_summarizer, "get_cache", lambda: cache)
+    monkeypatch.setattr(text_summarizer, "generate_content", recording_generate_content)
+    monkeypatch.setattr(text_summarizer, "SUMMARY_CHUNK_TOKENS", chunk_tokens)
+    monkeypatch.setattr(text_summarizer, "SUMMARY_MAX_CONCURRENCY", max_concurrency)
+    return calls
+
+
+def chunk_calls(prompts):
+    return [p for p in prompts if "Section to summarize:" in p]
+
+
+def test_auto_mode_goes_hierarchical_only_above_the_prompt_budget(monkeypatch):
+    calls = record_calls(monkeypatch)
+    short = "Sentence 1 explains the delta. Sentence 2 explains the river."
+    asyncio.run(summarize_text(short, 2, mode="auto"))
+    assert len(calls["prompts"]) == 1 and not chunk_calls(calls["prompts"])
+
+    calls["prompts"].clear()
+    long_text = TEXT * 3
+    assert not text_summarizer.fits_single_prompt(long_text)
+    summary = asyncio.run(summarize_text(long_text, 2, mode="auto"))
+    assert len(chunk_calls(calls["prompts"])) > 1
+    assert "Section summaries:" in calls["prompts"][-1]
+    assert summary.startswith("Sentence 0 explains")
+
+
+def test_editing_one_section_resummarizes_only_its_chunk(monkeypatch):
+    calls = record_calls(monkeypatch)
+    asyncio.run(summarize_text(TEXT, 3, mode="hierarchical"))
+    first_chunks = chunk_calls(calls["prompts"])
+    assert len(first_chunks) > 2
+    assert len(calls["prompts"]) == len(first_chunks) + 1 # one reduce step
+
+    # same length and past the sentences the stub keeps, so only that chunk changes
+    edited = TEXT.replace("in season 35.", "in winter 35.")
+    assert edited != TEXT and len(edited) == len(TEXT)
+    calls["prompts"].clear()
+    asyncio.run(summarize_text(edited, 3, mode="hierarchical"))
+    assert len(chunk_calls(calls["prompts"])) == 1
+    assert "in winter 35." in chunk_calls(calls["prompts"])[0]
+    assert len(calls["prompts"]) == 2
+
+
+def test_chunk_calls_respect_the_concurrency_cap(monkeypatch):
+    calls = record_calls(monkeypatch, chunk_tokens=60, max_concurrency=2)
+    asyncio.run(summarize_text(TEXT, 3, mode="hierarchical"))
+    assert len(chunk_calls(calls["prompts"])) > 4
+    assert calls["max_in_flight"] == 2
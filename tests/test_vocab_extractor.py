@@ -0,0 +1,46 @@
+from app.services import vocab_extractor
+from app.services.vocab_extractor import clean_and_tokenize, count_tokens
+
+
+class SuffixLemmatizer:
+    """Stands in for WordNet: strips a plural 's' and counts calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def lemmatize(self, word):
+        self.calls += 1
+        return word[:-1] if word.endswith("s") else word
+
+def test_count_tokens_lemmatizes_each_distinct_word_once(monkeypatch):
+    lemmatizer = SuffixLemmatizer()
+    monkeypatch.setattr(vocab_extractor, "get_lemmatizer", lambda: lemmatizer)
+    monkeypatch.setattr(vocab_extractor, "get_stop_words", lambda: {"the", "and"})
+    vocab_extractor._lemmatize.cache_clear()
+
+    text = "The Cells and the cell, CELLS! 42 cell-walls ox " * 100
+    counts = count_tokens(text)
+    assert counts == {"cell": 400, "wall": 100}
+    assert lemmatizer.calls == 3 # "cells", "cell", "walls"
+    assert sorted(set(clean_and_tokenize(text))) == ["cell", "wall"]
+    vocab_extractor._lemmatize.cache_clear()
+
+def test_count_tokens_windows_do_not_split_words(monkeypatch):
+    lemmatizer = SuffixLemmatizer()
+    monkeypatch.setattr(vocab_extractor, "get_lemmatizer", lambda: lemmatizer)
+    monkeypatch.setattr(vocab_extractor, "get_stop_words", set)
+    monkeypatch.setattr(vocab_extractor, "_TOKENIZE_WINDOW_CHARS", 10)
+    vocab_extractor._lemmatize.cache_clear()
+    assert count_tokens("alpha bravo charlie delta") == {"alpha": 1, "bravo": 1, "charlie": 1, "delta": 1}
+    vocab_extractor._lemmatize.cache_clear()
+
+def test_parse_vocabulary_validates_each_item():
+    reply = """```json
+    [
+      {"word": "cell", "definition": "The basic unit of life.", "part_of_speech": "noun"},
+      {"word": "wall", "definition": "  ", "part_of_speech": "noun"},
+      {"word": "divide", "definition": "To split into parts.", "part_of_speech": "verb"},
+    ]
+    ```"""
+    assert [item["word"] for item in vocab_extractor._parse_vocabulary(reply, 10)] == ["cell", "divide"]
+    assert len(vocab_extractor._parse_vocabulary(reply, 1)) == 1